@@ -0,0 +1,163 @@
+############################################################################################################
+# Description: This file contains the detection of bursts of messages in the per minute counts of the nodes
+# The counts of every message of every node are the rows of a matrix with a column per minute, so the baseline
+# of all of them is computed at once with NumPy. The baseline of a minute is the mean and standard deviation
+# of the counts of the BURST_BASELINE_MINUTES minutes before it, from the cumulative sums of the counts and of
+# their squares. A minute is a burst if its count is at least MIN_BURST_COUNT and BURST_SCORE standard deviations
+# (at least MIN_BURST_SIGMA) above the mean
+# Bursts on any node less than INCIDENT_GAP_MINUTES apart are one incident window, and the windows are ranked by
+# the number of messages above the baselines in them
+# NumPy is optional, the bursts are not detected without it
+############################################################################################################
+import html
+
+import tabulate
+
+from analyzer_time import minuteKeyToTime
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Number of minutes before a minute its baseline is computed from
+BURST_BASELINE_MINUTES = 60
+# Number of minutes of baseline a minute needs to be checked for a burst
+MIN_BASELINE_MINUTES = 10
+# Number of standard deviations above the baseline mean of a burst
+BURST_SCORE = 6
+# Smallest standard deviation a score is computed with, so a message which was never seen before isn't a burst at once
+MIN_BURST_SIGMA = 1.0
+# Smallest count of a burst
+MIN_BURST_COUNT = 10
+# Bursts less than this many minutes apart are one incident window
+INCIDENT_GAP_MINUTES = 5
+# Number of incident windows reported
+NUM_INCIDENT_WINDOWS = 10
+# Number of cells of the count matrix computed at a time, rows are taken till the matrix has this many cells
+BURST_CHUNK_CELLS = 1 << 20
+
+# Function to check if the bursts can be detected
+def isBurstDetectionAvailable():
+    return numpy is not None
+
+# Function to get the bursts of the rows of a count matrix, returns the row and column of every burst with its
+# count, baseline mean and score. Only the minutes with MIN_BURST_COUNT can be bursts, so the baselines are only
+# computed for them, from the cumulative sums of the rows they are in
+def getBursts(counts):
+    isCandidate = counts >= MIN_BURST_COUNT
+    isCandidate[:, :MIN_BASELINE_MINUTES] = False
+    # flatnonzero of the whole matrix is faster than nonzero of a slice of it
+    rows, columns = numpy.divmod(numpy.flatnonzero(isCandidate), counts.shape[1])
+    if not len(rows):
+        return rows, columns, numpy.zeros(0), numpy.zeros(0), numpy.zeros(0)
+    candidateRows, rowIndexes = numpy.unique(rows, return_inverse=True)
+    counts = counts[candidateRows]
+    burstCounts = counts[rowIndexes, columns]
+    # Cumulative sums with a leading zero, the sum of the baseline minutes start to m - 1 of the minute m is sums[m] - sums[start]
+    baselineStarts = numpy.maximum(columns - BURST_BASELINE_MINUTES, 0)
+    baselineLengths = columns - baselineStarts
+    sums = numpy.zeros((len(candidateRows), counts.shape[1] + 1))
+    numpy.cumsum(counts, axis=1, out=sums[:, 1:])
+    means = (sums[rowIndexes, columns] - sums[rowIndexes, baselineStarts]) / baselineLengths
+    numpy.cumsum(numpy.square(counts, out=counts), axis=1, out=sums[:, 1:])
+    variances = (sums[rowIndexes, columns] - sums[rowIndexes, baselineStarts]) / baselineLengths - means * means
+    # The variance can be a little below zero from rounding
+    sigmas = numpy.maximum(numpy.sqrt(numpy.maximum(variances, 0)), MIN_BURST_SIGMA)
+    scores = (burstCounts - means) / sigmas
+    isBurst = scores >= BURST_SCORE
+    return rows[isBurst], columns[isBurst], burstCounts[isBurst], means[isBurst], scores[isBurst]
+
+# Function to detect the bursts in the MinuteSeries of each node, returns the node and message of the rows and the
+# bursts as arrays of row, minute key, count, baseline mean and score
+def detectBursts(nodeSeries):
+    rows = [(node, message) for node, series in sorted(nodeSeries.items()) for message in series.counts]
+    if not rows:
+        return rows, None
+    startMinuteKey = min(series.startMinuteKey for series in nodeSeries.values())
+    endMinuteKey = max(series.startMinuteKey + len(messageCounts) for series in nodeSeries.values() for messageCounts in series.counts.values())
+    numMinutes = endMinuteKey - startMinuteKey
+    rowsPerChunk = max(1, BURST_CHUNK_CELLS // numMinutes)
+    bursts = []
+    for chunkStart in range(0, len(rows), rowsPerChunk):
+        chunkRows = rows[chunkStart:chunkStart + rowsPerChunk]
+        counts = numpy.zeros((len(chunkRows), numMinutes))
+        for index, (node, message) in enumerate(chunkRows):
+            series = nodeSeries[node]
+            messageCounts = numpy.frombuffer(series.counts[message], dtype=numpy.uint32)
+            offset = series.startMinuteKey - startMinuteKey
+            counts[index, offset:offset + len(messageCounts)] = messageCounts
+        burstRows, columns, burstCounts, means, scores = getBursts(counts)
+        bursts.append((burstRows + chunkStart, columns + startMinuteKey, burstCounts, means, scores))
+    return rows, [numpy.concatenate(column) for column in zip(*bursts)]
+
+# Function to get the incident windows of the bursts, the windows with the most messages above the baselines first
+# Each window has its start and end minute keys, excess messages, peak score, nodes and its messages by excess
+def getIncidentWindows(rows, bursts, limit=NUM_INCIDENT_WINDOWS):
+    if bursts is None or not len(bursts[0]):
+        return []
+    order = numpy.argsort(bursts[1], kind="stable")
+    burstRows, minuteKeys, counts, means, scores = [column[order] for column in bursts]
+    excesses = counts - means
+    # A window starts at every burst more than the gap after the one before it
+    isWindowStart = numpy.concatenate(([True], numpy.diff(minuteKeys) > INCIDENT_GAP_MINUTES))
+    windowIds = numpy.cumsum(isWindowStart) - 1
+    windowStarts = numpy.flatnonzero(isWindowStart)
+    windowExcesses = numpy.bincount(windowIds, weights=excesses)
+    windowPeaks = numpy.maximum.reduceat(scores, windowStarts)
+    windowEnds = numpy.append(windowStarts[1:], len(minuteKeys))
+    windows = []
+    for windowId in numpy.argsort(-windowExcesses, kind="stable")[:limit]:
+        start, end = windowStarts[windowId], windowEnds[windowId]
+        messageExcesses = {}
+        messageNodes = {}
+        for row, excess in zip(burstRows[start:end].tolist(), excesses[start:end].tolist()):
+            node, message = rows[row]
+            messageExcesses[message] = messageExcesses.get(message, 0) + excess
+            messageNodes.setdefault(message, set()).add(node)
+        windows.append({
+            "startMinuteKey": int(minuteKeys[start]),
+            "endMinuteKey": int(minuteKeys[end - 1]),
+            "excess": float(windowExcesses[windowId]),
+            "peakScore": float(windowPeaks[windowId]),
+            "nodes": sorted(set().union(*messageNodes.values())),
+            "messages": [(message, messageExcesses[message], sorted(messageNodes[message])) for message in sorted(messageExcesses, key=messageExcesses.get, reverse=True)],
+        })
+    return windows
+
+# Function to get the incident window table rows, with the top messages of each window and the nodes they burst on
+def getIncidentWindowTable(windows, numMessages=3):
+    table = []
+    for rank, window in enumerate(windows, 1):
+        messages = ["{} (+{:.0f} on {})".format(message, excess, ", ".join(nodes)) for message, excess, nodes in window["messages"][:numMessages]]
+        if len(window["messages"]) > numMessages:
+            messages.append("and {} more messages".format(len(window["messages"]) - numMessages))
+        table.append([rank, minuteKeyToTime(window["startMinuteKey"]), minuteKeyToTime(window["endMinuteKey"]), len(window["nodes"]), messages, round(window["excess"]), round(window["peakScore"], 1)])
+    return table
+
+INCIDENT_WINDOW_HEADERS = ["Rank", "From", "To", "Nodes", "Top Messages", "Messages above Baseline", "Peak Score"]
+
+# Function to get the incident windows as HTML. The section is written after the analysis, a script moves it above
+# the bar chart at the top of the report
+def getIncidentWindowsHTML(windows):
+    content = "<div id=incident-windows><h2 id=incidents> Incident Windows </h2>"
+    content += "<p> Times when messages burst to more than {} standard deviations above their mean of the {} minutes before, on any node. Messages above baseline is the number of messages over those means </p>".format(BURST_SCORE, BURST_BASELINE_MINUTES)
+    content += "<table class='sortable' id='incident-table'><tr>" + "".join("<th>" + header + "</th>" for header in INCIDENT_WINDOW_HEADERS) + "</tr>"
+    for row in getIncidentWindowTable(windows):
+        content += "<tr>" + "".join("<td>" + ("<br>".join(html.escape(message) for message in value) if isinstance(value, list) else str(value)) + "</td>" for value in row) + "</tr>"
+    content += "</table></div>"
+    content += """<script>
+    (function() {
+        var chartContainer = document.querySelector(".chart-container");
+        chartContainer.parentNode.insertBefore(document.getElementById("incident-windows"), chartContainer);
+    })();
+</script>"""
+    return content
+
+# Function to get the incident windows as markdown
+def getIncidentWindowsMarkdown(windows):
+    table = [row[:4] + ["\n".join(row[4])] + row[5:] for row in getIncidentWindowTable(windows)]
+    content = "\n\n\n# Incident Windows\n\n"
+    content += "Times when messages burst to more than {} standard deviations above their mean of the {} minutes before, on any node\n\n".format(BURST_SCORE, BURST_BASELINE_MINUTES)
+    content += tabulate.tabulate(table, headers=INCIDENT_WINDOW_HEADERS, tablefmt="simple_grid") + "\n"
+    return content
@@ -0,0 +1,53 @@
+############################################################################################################
+# Description: This file contains the JSON cache of the values computed from the files of a bundle
+# Values are cached per absolute path, size and mtime of the file, so a value is computed again only
+# when the file changes. The cache files are saved next to analyzer.log
+############################################################################################################
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+class JsonFileCache:
+    def __init__(self, cacheFile=None):
+        self.cacheFile = cacheFile
+        self.entries = {}
+        self.changed = False
+        self.load()
+
+    # Function to load the cache file, a missing or corrupt cache file is an empty cache
+    def load(self):
+        if not self.cacheFile or not os.path.isfile(self.cacheFile):
+            return
+        try:
+            with open(self.cacheFile, "r") as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            logger.debug("Ignoring the cache file {}: {}".format(self.cacheFile, e))
+            self.entries = {}
+
+    # Function to save the cache file if values were added since it was loaded
+    def save(self):
+        if not self.cacheFile or not self.changed:
+            return
+        try:
+            temporaryFile = self.cacheFile + ".tmp"
+            with open(temporaryFile, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(temporaryFile, self.cacheFile)
+            self.changed = False
+        except Exception as e:
+            logger.warning("Could not write the cache file {}: {}".format(self.cacheFile, e))
+
+    # Function to get the cached value of the file, None if the file changed since it was cached
+    def get(self, file, stat):
+        entry = self.entries.get(os.path.abspath(file))
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime_ns:
+            return entry.get("value")
+        return None
+
+    # Function to cache the value of the file
+    def put(self, file, stat, value):
+        self.entries[os.path.abspath(file)] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "value": value}
+        self.changed = True
@@ -13,6 +13,12 @@
 #   - Solution should be in markdown format
 #       - You can use http://demo.showdownjs.com/ for markdown preview
 #   - Please do not use <variable> in the solution as it will be considered as html tags and will not be displayed rather use $variable
+# pattern_severities is a dictionary of log messages and the severities they are logged at, for --severity_filter
+# Where:
+#   The key is the log message
+#   The value is the list of glog severities (I, W, E, F) or postgres levels (LOG, ERROR, FATAL, ...) the message can appear at
+#   A message which is not in pattern_severities is matched on the lines of every severity. Only add a message
+#   when you are sure of its severities, as the lines of other severities are not matched with it
 ############################################################################################################
 
 universe_regex_patterns = {
@@ -156,3 +162,13 @@ pg_solutions = {
 """
 # Add more solutions here
 }
+
+pattern_severities = {
+"Long wait for safe op id": ["W", "E", "F"],
+"Operation memory consumption has exceeded its limit": ["W", "E", "F"],
+"Stopping writes because we have immutable memtables": ["W", "E", "F"],
+"UpdateConsensus requests dropped due to backpressure": ["W", "E", "F"],
+"latch already owned by": ["ERROR", "FATAL", "PANIC"],
+"database system is ready to accept connections": ["LOG"]
+# Add more log messages here
+}
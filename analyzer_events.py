@@ -0,0 +1,127 @@
+############################################################################################################
+# Description: This file contains the export of the matched log lines as events into a SQLite file
+# The scanner collects the events of a scan in compact arrays, one entry per message matched on a line:
+#   minuteKeys: minute key of the line
+#   messageIds: index of the message in the regex patterns the file was scanned with
+#   severities: index of the glog severity or postgres level of the line in SEVERITIES, 0 if the line has none
+#   offsets: byte offset of the line in the log file, in the decompressed data of gzip compressed log files
+# EventStore writes the events of the scan results into the tables, in a temporary file which replaces the
+# export file when it is closed:
+#   files: id, path, node and process type (master, tserver or postgres) of every log file
+#   messages: id and message of every message
+#   events: fileId, minuteKey, messageId, severity and offset of every event, the severity is its index in SEVERITIES
+# query_events.py answers questions like the counts by node by hour of a message from the file
+############################################################################################################
+from array import array
+import logging
+import os
+import sqlite3
+
+from analyzer_time import MINUTE_KEY_EPOCH
+
+logger = logging.getLogger(__name__)
+
+# Severities of the events, the glog severities and the postgres levels
+SEVERITIES = [None, "I", "W", "E", "F", "DEBUG5", "DEBUG4", "DEBUG3", "DEBUG2", "DEBUG1", "INFO", "NOTICE", "WARNING", "ERROR", "LOG", "FATAL", "PANIC"]
+SEVERITY_INDEXES = {severity: index for index, severity in enumerate(SEVERITIES)}
+
+# Function to get empty events
+def getEvents():
+    return {
+        "minuteKeys": array("l"),
+        "messageIds": array("H"),
+        "severities": array("B"),
+        "offsets": array("q"),
+    }
+
+# Function to append the events of consecutive ranges of a log file
+def extendEvents(events, moreEvents):
+    for column, values in moreEvents.items():
+        events[column].extend(values)
+    return events
+
+# Function to get the events between the start and end minute keys
+def getEventsInTimeRange(events, startMinuteKey, endMinuteKey):
+    minuteKeys = events["minuteKeys"]
+    if not minuteKeys or startMinuteKey <= min(minuteKeys) and max(minuteKeys) <= endMinuteKey:
+        return events
+    selected = getEvents()
+    for index, minuteKey in enumerate(events["minuteKeys"]):
+        if startMinuteKey <= minuteKey <= endMinuteKey:
+            for column, values in events.items():
+                selected[column].append(values[index])
+    return selected
+
+# Function to get the node and the process type of a log file from its path in the support bundle
+# Log files are in node/master/logs and node/tserver/logs, postgres logs are in the tserver logs
+def getLogFileOrigin(logFile):
+    parts = os.path.normpath(logFile).split(os.sep)
+    fileName = parts[-1]
+    node = "-"
+    processType = "-"
+    for index in range(len(parts) - 2, 0, -1):
+        if parts[index] in ("master", "tserver"):
+            node = parts[index - 1]
+            processType = parts[index]
+            break
+    if "postgres" in fileName:
+        processType = "postgres"
+    elif "yb-master" in fileName:
+        processType = "master"
+    elif "yb-tserver" in fileName:
+        processType = "tserver"
+    return node, processType
+
+# Function to check if the file is an events file written by EventStore, which can be replaced by a new export
+def isEventsFile(file):
+    try:
+        connection = sqlite3.connect("file:{}?mode=ro".format(file), uri=True)
+        try:
+            return connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events'").fetchone() is not None
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return False
+
+class EventStore:
+    def __init__(self, exportFile):
+        self.exportFile = exportFile
+        self.temporaryFile = exportFile + ".tmp"
+        self.numEvents = 0
+        self.messageIds = {}
+        # Every run writes a new file, the events of different runs and time ranges are not mixed
+        if os.path.exists(self.temporaryFile):
+            os.remove(self.temporaryFile)
+        self.connection = sqlite3.connect(self.temporaryFile)
+        self.connection.execute("CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, node TEXT, processType TEXT)")
+        self.connection.execute("CREATE TABLE messages (id INTEGER PRIMARY KEY, message TEXT UNIQUE)")
+        self.connection.execute("CREATE TABLE events (fileId INTEGER, minuteKey INTEGER, messageId INTEGER, severity INTEGER, offset INTEGER)")
+        self.connection.execute("CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)")
+        self.connection.execute("INSERT INTO metadata VALUES ('minuteKeyEpoch', ?)", (MINUTE_KEY_EPOCH.isoformat(),))
+
+    # Function to get the id of the message in the messages table
+    def getMessageId(self, message):
+        if message not in self.messageIds:
+            cursor = self.connection.execute("INSERT INTO messages (message) VALUES (?)", (message,))
+            self.messageIds[message] = cursor.lastrowid
+        return self.messageIds[message]
+
+    # Function to add the events of the scan result of a log file
+    def addScanResult(self, scanResult, regex_patterns):
+        events = scanResult.get("events")
+        if not events:
+            return
+        node, processType = getLogFileOrigin(scanResult["logFile"])
+        fileId = self.connection.execute("INSERT INTO files (path, node, processType) VALUES (?, ?, ?)", (scanResult["logFile"], node, processType)).lastrowid
+        messageIds = [self.getMessageId(message) for message in regex_patterns]
+        self.connection.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?)",
+            ((fileId, minuteKey, messageIds[messageIndex], severityIndex, offset)
+             for minuteKey, messageIndex, severityIndex, offset in zip(events["minuteKeys"], events["messageIds"], events["severities"], events["offsets"])))
+        self.numEvents += len(events["minuteKeys"])
+
+    def close(self):
+        self.connection.execute("CREATE INDEX eventsByMessage ON events (messageId, minuteKey)")
+        self.connection.commit()
+        self.connection.close()
+        os.replace(self.temporaryFile, self.exportFile)
+        logger.info("Exported {} events to {}".format(self.numEvents, self.exportFile))
@@ -0,0 +1,103 @@
+############################################################################################################
+# Description: This file contains the helpers to extract the support bundle archives
+# Archives are extracted on a pool of threads. Nested archives, like the per node tarballs of a support
+# bundle, are found while the members of their parent archive are extracted and are handed to the pool
+# as soon as they are written, so the extracted tree is never walked again
+############################################################################################################
+from concurrent.futures import ThreadPoolExecutor, wait
+import logging
+import os
+import tarfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Function to check if the file is a tar archive
+def isArchiveFile(file):
+    return file.endswith(".tar.gz") or file.endswith(".tgz")
+
+# Function to get all the tar files
+def getArchiveFiles(logDirectory):
+    archievedFiles = []
+    for root, dirs, files in os.walk(logDirectory):
+        for file in files:
+            if isArchiveFile(file):
+                archievedFiles.append(os.path.join(root,file))
+    return archievedFiles
+
+class ArchiveExtractor:
+    def __init__(self, numWorkers):
+        self.executor = ThreadPoolExecutor(max_workers=numWorkers)
+        self.lock = threading.Lock()
+        self.processedArchives = set()
+        self.futures = []
+        self.extractedBytes = 0
+        self.extractedMembers = 0
+
+    # Function to queue an archive for extraction, archives are extracted only once
+    def submit(self, file):
+        file = os.path.normpath(file)
+        with self.lock:
+            if file in self.processedArchives:
+                return
+            self.processedArchives.add(file)
+            self.futures.append(self.executor.submit(self.extractArchive, file))
+
+    # Function to extract the archive next to it
+    def extractArchive(self, file):
+        logger.info("Extracting file {}".format(file))
+        with tarfile.open(file, "r:gz") as tar:
+            try:
+                tar.extractall(os.path.dirname(file), members=self.getMembers(tar, os.path.dirname(file)))
+            except EOFError:
+                logger.warning("Got EOF Exception while extracting file {}, File might have still extracted".format(file))
+                logger.error("EOF Exception while extracting file {}".format(file))
+
+    # Function to get the members of the archive for extraction
+    # extractall asks for the next member only after the previous one is written, which is when a
+    # nested archive can be queued for extraction
+    def getMembers(self, tar, destination):
+        nestedArchive = None
+        for member in tar:
+            if nestedArchive:
+                self.submit(nestedArchive)
+                nestedArchive = None
+            with self.lock:
+                self.extractedBytes += member.size
+                self.extractedMembers += 1
+            yield member
+            if member.isfile() and isArchiveFile(member.name):
+                nestedArchive = os.path.join(destination, member.name)
+        if nestedArchive:
+            self.submit(nestedArchive)
+
+    # Function to wait till all the queued archives, including the nested ones, are extracted
+    def wait(self):
+        while True:
+            with self.lock:
+                pending = [future for future in self.futures if not future.done()]
+            if not pending:
+                break
+            wait(pending)
+        for future in self.futures:
+            future.result()
+
+# Function to extract the archives and all the archives nested in them
+def extractAllTarFiles(archives, numWorkers):
+    startTime = time.time()
+    extractor = ArchiveExtractor(numWorkers)
+    # An archive can be a member of a less nested one, extracting them together could read an archive
+    # while it is being written. So extract one level of nesting at a time, the archives which are
+    # members of the previous levels are already extracted by then.
+    levels = {}
+    for file in archives:
+        levels.setdefault(os.path.normpath(file).count(os.sep), []).append(file)
+    for level in sorted(levels):
+        for file in levels[level]:
+            extractor.submit(file)
+        extractor.wait()
+    extractor.executor.shutdown()
+    elapsedTime = max(time.time() - startTime, 0.001)
+    logger.info("Extracted {} archives, {} files, {:.1f} MB in {:.1f} seconds ({:.1f} MB/s)".format(len(extractor.processedArchives), extractor.extractedMembers, extractor.extractedBytes / 1024 / 1024, elapsedTime, extractor.extractedBytes / 1024 / 1024 / elapsedTime))
+    return extractor.processedArchives
@@ -0,0 +1,124 @@
+############################################################################################################
+# Description: This file contains the index of the gzip compressed log files
+# A gzip file can only be read from the beginning, so the index is built by decompressing the file once
+# and is saved in a JSON cache file next to analyzer.log. Runs over the same bundle read the index from
+# the cache instead of decompressing the files again just to find their first and last lines.
+# The index of a log file has:
+#   version: GZIP_INDEX_VERSION, indexes of older versions in the cache are built again
+#   uncompressedSize: size of the decompressed log file in bytes
+#   isText: false if the first or last lines of the file can't be decoded
+#   firstMinuteKey, lastMinuteKey: minute keys of the first and the last lines, as skipFileBasedOnTime reads them
+#   checkpoints: list of uncompressed offset and minute key of a line with time about every
+#                GZIP_CHECKPOINT_INTERVAL_MB, the first checkpoint is the beginning of the file
+# zlib in Python can't resume decompression from the middle of a deflate stream like zran does, so reading
+# from a checkpoint still decompresses the data before it. But that data is skipped without splitting
+# and parsing its lines, which is several times faster than analyzing it, so the checkpoints are used to
+# start reading at the start time. Splitting a file into N ranges decompresses about N * (N + 1) / 2 ranges
+# in total, so a file is only split when there are fewer log files than workers, into at most MAX_GZIP_RANGES
+############################################################################################################
+import codecs
+import gzip
+import logging
+import os
+
+from analyzer_cache import JsonFileCache
+from analyzer_io import iterLogBlocks
+from analyzer_time import LogTimeParser, isLineWithTime, timeToMinuteKey
+
+logger = logging.getLogger(__name__)
+
+# Name of the cache file of the gzip indexes
+GZIP_INDEX_CACHE_FILE = "analyzer_gzip_index.json"
+# Uncompressed size between two checkpoints in MB
+GZIP_CHECKPOINT_INTERVAL_MB = 16
+# Version of the index, 2 fixed isText of the files with a character cut at the end of the first bytes checked
+GZIP_INDEX_VERSION = 2
+# Number of ranges a compressed file is split into at most, 4 ranges decompress the file 2.5 times
+MAX_GZIP_RANGES = 4
+
+# Function to check that the bytes can be decoded, from the first complete line if it is not the beginning of the file
+# A character cut at the end of the bytes is not an error unless they are the end of the file
+def isTextBlock(block, isFileStart, isFileEnd):
+    if not isFileStart:
+        block = block[block.find(b"\n") + 1:]
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(block, final=isFileEnd)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+# Function to build the index of a gzip compressed log file, None if the file can't be decompressed
+def buildGzipIndex(logFile):
+    index = {
+        "version": GZIP_INDEX_VERSION,
+        "uncompressedSize": 0,
+        "isText": True,
+        "firstMinuteKey": None,
+        "lastMinuteKey": None,
+        "checkpoints": [],
+    }
+    lastBlock = b""
+    try:
+        with gzip.GzipFile(logFile, "rb") as logs:
+            for block in iterLogBlocks(logs, GZIP_CHECKPOINT_INTERVAL_MB, isLineWithTime):
+                firstLine = block[:block.find(b"\n") + 1] or block
+                if index["uncompressedSize"] == 0:
+                    index["isText"] = isTextBlock(block[:8192], True, False)
+                    index["firstMinuteKey"] = LogTimeParser(timeToMinuteKey('0101 00:00')).getMinuteKey(firstLine.decode(errors="replace"))
+                # Blocks without a line with time are cut at any line, which can't be a checkpoint
+                if index["uncompressedSize"] == 0 or isLineWithTime(firstLine):
+                    index["checkpoints"].append([index["uncompressedSize"], LogTimeParser().getMinuteKey(firstLine.decode(errors="replace"))])
+                index["uncompressedSize"] += len(block)
+                lastBlock = block
+    except Exception as e:
+        logger.warning("Could not index file {}: {}".format(logFile, e))
+        return None
+    if lastBlock:
+        tail = lastBlock[-4096:]
+        index["isText"] = index["isText"] and isTextBlock(tail, len(tail) == index["uncompressedSize"], True)
+        lastLine = tail[tail.rfind(b"\n", 0, len(tail) - 1) + 1:]
+        index["lastMinuteKey"] = LogTimeParser(timeToMinuteKey('1231 23:59')).getMinuteKey(lastLine.decode(errors="replace"))
+    return index
+
+# Function to get the indexes of the gzip compressed log files, the indexes which are not in the cache are built on the pool
+def getGzipIndexes(logFiles, cacheFile, pool):
+    cache = JsonFileCache(cacheFile)
+    indexes = {}
+    missingFiles = []
+    for logFile in logFiles:
+        if not logFile.endswith(".gz"):
+            continue
+        index = cache.get(logFile, os.stat(logFile))
+        if index is None or index.get("version") != GZIP_INDEX_VERSION:
+            missingFiles.append(logFile)
+        else:
+            indexes[logFile] = index
+    if missingFiles:
+        logger.info("Indexing {} compressed files, {} found in the cache".format(len(missingFiles), len(indexes)))
+        for logFile, index in zip(missingFiles, pool.map(buildGzipIndex, missingFiles, chunksize=1)):
+            if index is not None:
+                indexes[logFile] = index
+                cache.put(logFile, os.stat(logFile), index)
+        cache.save()
+    return indexes
+
+# Function to get the uncompressed offset of the last checkpoint before the start time
+# The lines from there to the start time are skipped while reading
+def getGzipStartOffset(index, startMinuteKey):
+    startOffset = 0
+    for checkpointOffset, minuteKey in index["checkpoints"]:
+        if minuteKey >= startMinuteKey:
+            break
+        startOffset = checkpointOffset
+    return startOffset
+
+# Function to split a gzip compressed log file into at most maxRanges uncompressed ranges of at least rangeSizeMB
+# The ranges start at the checkpoints, which are lines with time
+def getGzipRanges(index, rangeSizeMB, maxRanges=MAX_GZIP_RANGES):
+    rangeSize = max(rangeSizeMB * 1024 * 1024, -(-index["uncompressedSize"] // maxRanges))
+    offsets = [0]
+    for checkpointOffset, minuteKey in index["checkpoints"][1:]:
+        if checkpointOffset - offsets[-1] >= rangeSize:
+            offsets.append(checkpointOffset)
+    offsets.append(index["uncompressedSize"])
+    return list(zip(offsets[:-1], offsets[1:]))
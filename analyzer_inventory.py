@@ -0,0 +1,70 @@
+############################################################################################################
+# Description: This file contains the inventory of the files in the support bundle
+# BundleInventory walks the bundle directories once and indexes everything the node discovery needs:
+#   instanceFiles: paths of the instance files of the tservers and masters
+#   nodeDirectories: name and path of every directory, the first one found for a name wins
+#   confFiles: paths of the server.conf files
+#   tabletMetaDirectories: path of every tablet-meta directory and the number of entries in it
+#   logFiles: paths of the log files to analyze
+#   deploymentType: "vm" if server.conf files are found, "k8s" if gflags directories are found
+# Paths are built the same way os.walk builds them, so they can be compared with os.path.join results
+############################################################################################################
+import os
+
+from analyzer_io import isLogFileName
+
+class BundleInventory:
+    def __init__(self, dirPaths):
+        self.dirPaths = list(dirPaths)
+        self.instanceFiles = []
+        self.nodeDirectories = {}
+        self.confFiles = []
+        self.tabletMetaDirectories = {}
+        self.logFiles = []
+        self.logFilesByDirPath = {}
+        self.deploymentType = "Unknown"
+        self.directories = set()
+        self.files = set()
+        for dirPath in self.dirPaths:
+            self.logFilesByDirPath[dirPath] = []
+            self.walk(dirPath)
+
+    # Function to index the files in the directory
+    def walk(self, dirPath):
+        for root, dirs, files in os.walk(dirPath):
+            self.directories.add(root)
+            for dir in dirs:
+                self.nodeDirectories.setdefault(dir, os.path.join(root, dir))
+            if self.deploymentType == "Unknown":
+                if "server.conf" in files:
+                    self.deploymentType = "vm"
+                elif "gflags" in dirs:
+                    self.deploymentType = "k8s"
+            if os.path.basename(root) == "tablet-meta":
+                self.tabletMetaDirectories[root] = len(dirs) + len(files)
+            for file in files:
+                if file == "instance":
+                    self.instanceFiles.append(os.path.join(root, file))
+                    self.files.add(os.path.join(root, file))
+                elif file == "server.conf":
+                    self.confFiles.append(os.path.join(root, file))
+                    self.files.add(os.path.join(root, file))
+                if isLogFileName(file):
+                    self.logFiles.append(os.path.join(root, file))
+                    self.logFilesByDirPath[dirPath].append(os.path.join(root, file))
+
+    # Function to check if the directory exists in the bundle
+    def isDirectory(self, path):
+        return path in self.directories
+
+    # Function to check if the instance or server.conf file exists in the bundle
+    def isFile(self, path):
+        return path in self.files
+
+    # Function to get the directory of the node
+    def getNodeDirectory(self, node):
+        return self.nodeDirectories.get(node)
+
+    # Function to get the number of entries in the tablet-meta directory
+    def getNumTablets(self, tabletMeta):
+        return self.tabletMetaDirectories.get(tabletMeta, 0)
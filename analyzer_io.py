@@ -0,0 +1,176 @@
+############################################################################################################
+# Description: This file contains the helpers to read the log files
+# Log files are read line by line through a buffer of a fixed size, so the memory used by a worker
+# doesn't depend on the size of the log file
+# Large uncompressed log files can be split into byte ranges which start at the beginning of a line,
+# so that each range can be read by a different worker. Log files which can't be seeked, like the members
+# of a tar archive, are read in blocks of lines instead
+# Uncompressed log files are sorted by time, so the first line of a time range is found with a binary
+# search over the byte offsets instead of reading the lines before it
+############################################################################################################
+import gzip
+import io
+import os
+
+# Default size of the read buffer in KB
+DEFAULT_BUFFER_SIZE_KB = 1024
+# Size of the reads which skip the decompressed data before a range of a gzip compressed file
+SKIP_SIZE = 1024 * 1024
+# Number of blocks read without a block start line after which iterLogBlocks cuts the block at the end of a line
+MAX_PENDING_BLOCKS = 4
+
+# Function to check if the file is a log file to analyze
+def isLogFileName(file):
+    return file.__contains__("INFO") or file.__contains__("postgres") and file[0] != "."
+
+# Class to read the bytes of a file between two offsets
+# Offsets of a gzip compressed file are offsets in the decompressed data, the data before the start offset
+# is decompressed and dropped without splitting it into lines
+class FileRangeReader(io.RawIOBase):
+    def __init__(self, logFile, startOffset, endOffset):
+        if logFile.endswith(".gz"):
+            self.file = gzip.GzipFile(logFile, "rb")
+            skipped = 0
+            while skipped < startOffset:
+                data = self.file.read(min(startOffset - skipped, SKIP_SIZE))
+                if not data:
+                    break
+                skipped += len(data)
+        else:
+            self.file = open(logFile, "rb", buffering=0)
+            self.file.seek(startOffset)
+        self.remaining = endOffset - startOffset
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        numBytes = self.file.readinto(memoryview(buffer)[:size])
+        self.remaining -= numBytes
+        return numBytes
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+# Function to open a plain or gzip compressed log file for streaming
+# startOffset and endOffset limit the reading to a byte range of the log file, endOffset None is the end of the file
+# The line endings are not translated, so the lines encode back to the bytes they were read from
+def openLogFile(logFile, bufferSizeKB=DEFAULT_BUFFER_SIZE_KB, startOffset=0, endOffset=None):
+    bufferSize = bufferSizeKB * 1024
+    if startOffset or endOffset is not None:
+        if endOffset is None:
+            endOffset = float("inf") if logFile.endswith(".gz") else os.path.getsize(logFile)
+        return io.TextIOWrapper(io.BufferedReader(FileRangeReader(logFile, startOffset, endOffset), buffer_size=bufferSize), newline="")
+    if logFile.endswith(".gz"):
+        return io.TextIOWrapper(io.BufferedReader(gzip.GzipFile(logFile, "rb"), buffer_size=bufferSize), newline="")
+    return open(logFile, "r", buffering=bufferSize, newline="")
+
+# Function to split an uncompressed log file into byte ranges of about rangeSizeMB each
+# Each range starts at the beginning of a line for which isRangeStart(line) is true, so a range
+# never starts in the middle of a multi line message
+def getLineAlignedRanges(logFile, rangeSizeMB, isRangeStart=lambda line: True):
+    fileSize = os.path.getsize(logFile)
+    rangeSize = rangeSizeMB * 1024 * 1024
+    offsets = [0]
+    with open(logFile, "rb") as logs:
+        position = rangeSize
+        while position < fileSize:
+            # Move to the beginning of the first line at or after the position
+            logs.seek(position - 1)
+            logs.readline()
+            while True:
+                lineStart = logs.tell()
+                line = logs.readline()
+                if not line or isRangeStart(line):
+                    break
+            if lineStart >= fileSize:
+                break
+            if lineStart > offsets[-1]:
+                offsets.append(lineStart)
+            position = lineStart + rangeSize
+    offsets.append(fileSize)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+# Function to get the first line at or after the offset for which isProbeLine(line) is true
+# Returns the offset and the line, or None and None if no such line starts before endOffset
+def getNextProbeLine(logs, offset, startOffset, endOffset, isProbeLine):
+    if offset > startOffset:
+        # Move to the beginning of the first line at or after the offset
+        logs.seek(offset - 1)
+        logs.readline()
+    else:
+        logs.seek(offset)
+    while True:
+        lineStart = logs.tell()
+        if lineStart >= endOffset:
+            return None, None
+        line = logs.readline()
+        if not line:
+            return None, None
+        if isProbeLine(line):
+            return lineStart, line
+
+# Function to find the offset of the first line between startOffset and endOffset of an uncompressed log
+# file for which isProbeLine(line) is true and isBefore(line) is false, with a binary search over the
+# byte offsets. The lines must be sorted, so that all the lines for which isBefore(line) is true come first.
+# Returns endOffset if there is no such line
+def findFirstLineOffset(logFile, isBefore, isProbeLine=lambda line: True, startOffset=0, endOffset=None):
+    if endOffset is None:
+        endOffset = os.path.getsize(logFile)
+    firstLineOffset = endOffset
+    low = startOffset
+    high = endOffset
+    with open(logFile, "rb") as logs:
+        while low < high:
+            middle = (low + high) // 2
+            lineStart, line = getNextProbeLine(logs, middle, startOffset, high, isProbeLine)
+            if lineStart is None:
+                high = middle
+            elif isBefore(line):
+                low = lineStart + len(line)
+            else:
+                firstLineOffset = lineStart
+                high = middle
+    return firstLineOffset
+
+# Function to get the offset of the last line in the block for which isBlockStart(line) is true
+# Returns 0 if there is no such line after the first line of the block. The lines which start before
+# searchStart were checked already, so the search stops at them
+def getLastBlockStart(block, isBlockStart, searchStart=0):
+    lineEnd = block.rfind(b"\n")
+    while lineEnd > 0:
+        lineStart = block.rfind(b"\n", 0, lineEnd) + 1
+        if lineStart == 0 or lineStart < searchStart:
+            return 0
+        if isBlockStart(block[lineStart:lineEnd + 1]):
+            return lineStart
+        lineEnd = lineStart - 1
+    return 0
+
+# Function to read a binary stream in blocks of about blockSizeMB, each block except the first one
+# starts at the beginning of a line for which isBlockStart(line) is true
+# Only the lines of the data read last are checked, and data without such a line, like a file with no
+# timestamped lines, is cut at the end of a line once MAX_PENDING_BLOCKS blocks are pending, so the
+# memory and the time don't grow with the size of the data
+def iterLogBlocks(logs, blockSizeMB, isBlockStart=lambda line: True):
+    blockSize = blockSizeMB * 1024 * 1024
+    pending = b""
+    while True:
+        data = logs.read(blockSize)
+        if not data:
+            break
+        # The last line of the pending data wasn't complete, so it wasn't checked
+        searchStart = pending.rfind(b"\n") + 1
+        pending += data
+        blockEnd = getLastBlockStart(pending, isBlockStart, searchStart)
+        if not blockEnd and len(pending) >= MAX_PENDING_BLOCKS * blockSize:
+            blockEnd = pending.rfind(b"\n") + 1 or len(pending)
+        if blockEnd:
+            yield pending[:blockEnd]
+            pending = pending[blockEnd:]
+    if pending:
+        yield pending
@@ -0,0 +1,222 @@
+############################################################################################################
+# Description: This file contains the lazy HTML report, for bundles with too many log files for one page
+# The report page is a shell with the version, node details and GFlags. The per file tables, the series
+# of the bar chart and the troubleshooting tips of the messages found are written into a data file next to it:
+#   <report>.data.js: var reportData = "<base64 of the gzip compressed JSON>";
+# A script file is used instead of a JSON file because browsers don't fetch files next to a page opened
+# from file://. The page decompresses the data with DecompressionStream, draws the bar chart and adds the
+# sections of the log files as the user scrolls to them. The table of a log file is only rendered when its
+# section is expanded, a page of rows at a time
+############################################################################################################
+import base64
+import gzip
+import json
+import os
+
+from analyzer_lib import htmlHeader1, htmlHeader2, barChartCode
+
+# Number of rows in a page of a log file table
+LAZY_PAGE_SIZE = 50
+# Number of log file sections added each time the user scrolls to the end of the list
+LAZY_FILE_SECTIONS = 25
+
+# Function to get the data file of the report file, the page finds it by its own name
+def getDataFile(outputFile):
+    return os.path.splitext(outputFile)[0] + ".data.js"
+
+class LazyReport:
+    def __init__(self, outputFile):
+        self.dataFile = getDataFile(outputFile)
+        self.files = []
+
+    # Function to add the table rows of a log file, in the order of the report
+    def addFile(self, logFile, table):
+        self.files.append({"logFile": logFile, "rows": table})
+
+    # Function to write the data file with the series of the bar chart and the troubleshooting tips
+    def writeData(self, seriesJSON, tips):
+        data = {"files": self.files, "series": seriesJSON, "tips": tips, "pageSize": LAZY_PAGE_SIZE, "fileSections": LAZY_FILE_SECTIONS}
+        # mtime 0 writes the same data file for the same results
+        compressed = gzip.compress(json.dumps(data, separators=(",", ":")).encode(), mtime=0)
+        with open(self.dataFile, "w") as f:
+            f.write('var reportData = "' + base64.b64encode(compressed).decode() + '";\n')
+        return os.path.getsize(self.dataFile)
+
+# Header of the lazy report, the solutions of the messages found are added from the data file
+lazyHtmlHeader = htmlHeader1 + "{}" + htmlHeader2
+
+# Placeholder of the log file sections, written where the tables of the log files are in the full report
+lazyFilesSection = """
+	<h2 id=log-files> Log Files </h2>
+	<div id="lazy-loading"> Loading the analysis... </div>
+	<div id="lazy-files"></div>
+	<div id="lazy-files-end"></div>
+"""
+
+# Placeholder of the troubleshooting tips
+lazyTipsSection = """
+	<h2 id=troubleshooting-tips> Troubleshooting Tips </h2>
+	<div id="lazy-tips"></div>
+"""
+
+lazyReportScript = """
+<script>
+	// Function to draw the bar chart of the series
+	function drawBarChart(series) {""" + barChartCode + """	}
+
+	// Function to decompress the base64 gzip compressed report data
+	function decodeReportData(encoded) {
+		var bytes = Uint8Array.from(atob(encoded), function (c) { return c.charCodeAt(0); });
+		var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"));
+		return new Response(stream).json();
+	}
+
+	// Function to render a page of the rows of a log file into its table, the header sorts all the rows
+	function renderFilePage(section, file, page) {
+		var pageSize = reportData.pageSize;
+		var numPages = Math.max(1, Math.ceil(file.rows.length / pageSize));
+		page = Math.min(Math.max(page, 0), numPages - 1);
+		var table = document.createElement("table");
+		table.className = "lazy-table";
+		var header = table.insertRow();
+		["Occurrences", "Message", "First Occurrence", "Last Occurrence"].forEach(function (title, column) {
+			var th = document.createElement("th");
+			th.textContent = title;
+			th.style.cursor = "pointer";
+			th.addEventListener("click", function () {
+				var descending = file.sortedBy === column && !file.descending;
+				file.rows.sort(function (a, b) {
+					var order = a[column] < b[column] ? -1 : a[column] > b[column] ? 1 : 0;
+					return descending ? -order : order;
+				});
+				file.sortedBy = column;
+				file.descending = descending;
+				renderFilePage(section, file, 0);
+			});
+			header.appendChild(th);
+		});
+		file.rows.slice(page * pageSize, (page + 1) * pageSize).forEach(function (row) {
+			var tr = table.insertRow();
+			row.forEach(function (value) {
+				tr.insertCell().textContent = value;
+			});
+			tr.addEventListener("click", function () {
+				var solution = solutions[row[1]];
+				if (solution) {
+					showSolutionPopup(row[1], solution);
+				}
+			});
+		});
+		var pager = document.createElement("div");
+		if (numPages > 1) {
+			[["Previous", page - 1], ["Next", page + 1]].forEach(function (button) {
+				var link = document.createElement("button");
+				link.textContent = button[0];
+				link.disabled = button[1] < 0 || button[1] >= numPages;
+				link.addEventListener("click", function () {
+					renderFilePage(section, file, button[1]);
+				});
+				pager.appendChild(link);
+			});
+			pager.appendChild(document.createTextNode(" Page " + (page + 1) + " of " + numPages + " (" + file.rows.length + " messages)"));
+		}
+		var content = section.querySelector(".lazy-content");
+		content.replaceChildren(table, pager);
+	}
+
+	// Function to add the collapsed sections of the next log files, the table is rendered when a section is expanded
+	function addFileSections(count) {
+		var container = document.getElementById("lazy-files");
+		var end = Math.min(reportData.files.length, container.children.length + count);
+		for (var i = container.children.length; i < end; i++) {
+			var file = reportData.files[i];
+			var section = document.createElement("details");
+			section.id = "lazy-file-" + i;
+			var summary = document.createElement("summary");
+			summary.innerHTML = "<b></b>";
+			summary.firstChild.textContent = file.logFile + " (" + file.rows.length + " messages)";
+			section.appendChild(summary);
+			var content = document.createElement("div");
+			content.className = "lazy-content";
+			section.appendChild(content);
+			section.addEventListener("toggle", function (section, file) {
+				return function () {
+					if (section.open && !section.querySelector(".lazy-content").hasChildNodes()) {
+						renderFilePage(section, file, 0);
+					}
+				};
+			}(section, file));
+			container.appendChild(section);
+		}
+	}
+
+	// Function to open the section of a log file from the table of contents, the sections before it are added first
+	function showFileSection(index) {
+		var container = document.getElementById("lazy-files");
+		if (index >= container.children.length) {
+			addFileSections(index + 1 - container.children.length);
+		}
+		var section = document.getElementById("lazy-file-" + index);
+		section.open = true;
+		section.scrollIntoView();
+	}
+
+	// Function to render the table of contents, the tips and the bar chart once the data is loaded
+	function renderReport(data) {
+		reportData = data;
+		document.getElementById("lazy-loading").remove();
+		// The header rebuilds the table of contents from the headings on load, so the log files are listed after it
+		var toc = document.createElement("ul");
+		var headingToc = document.getElementById("toc");
+		headingToc.parentNode.insertBefore(toc, headingToc.nextSibling);
+		data.files.forEach(function (file, index) {
+			var anchor = document.createElement("a");
+			anchor.href = "#lazy-file-" + index;
+			anchor.textContent = file.logFile;
+			anchor.addEventListener("click", function (event) {
+				event.preventDefault();
+				showFileSection(index);
+			});
+			var li = document.createElement("li");
+			li.appendChild(anchor);
+			toc.appendChild(li);
+		});
+		// Add more log file sections when the end of the list is scrolled into view. The end is observed again
+		// after the sections are added, so more are added while it stays in view
+		var filesEnd = document.getElementById("lazy-files-end");
+		var observer = new IntersectionObserver(function (entries) {
+			if (entries[0].isIntersecting && document.getElementById("lazy-files").children.length < data.files.length) {
+				addFileSections(data.fileSections);
+				observer.unobserve(filesEnd);
+				observer.observe(filesEnd);
+			}
+		});
+		observer.observe(filesEnd);
+		var tips = document.getElementById("lazy-tips");
+		var markdown = "";
+		data.tips.forEach(function (tip) {
+			solutions[tip[0]] = tip[1];
+			markdown += "### " + tip[0] + "\\n" + tip[1] + "  \\n\\n---\\n\\n";
+		});
+		if (tips) {
+			tips.innerHTML = htmlGenerator.makeHtml(markdown);
+		}
+		if (data.series.resolutions.length) {
+			drawBarChart(data.series);
+		}
+	}
+
+	// The data file is named like the report, so the report and its data file can be copied under another name together
+	document.addEventListener("DOMContentLoaded", function () {
+		var script = document.createElement("script");
+		script.src = decodeURIComponent(location.pathname.split("/").pop()).replace(/\\.[^.]*$/, "") + ".data.js";
+		script.onload = function () {
+			decodeReportData(reportData).then(renderReport);
+		};
+		script.onerror = function () {
+			document.getElementById("lazy-loading").textContent = "Can't load " + script.src + ", it has to be in the directory of the report";
+		};
+		document.head.appendChild(script);
+	});
+</script>
+"""
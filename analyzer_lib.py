@@ -1,6 +1,6 @@
 from analyzer_dict import universe_solutions, pg_solutions
 solutions = {**universe_solutions, **pg_solutions}
-htmlHeader = """
+htmlHeader1 = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -12,7 +12,9 @@ htmlHeader = """
  	<meta charset="utf-8">
 	<title>Log Analysis Results</title>
 	<script type="text/javascript">
-		var solutions =""" + str(solutions) + """ ;
+		var solutions ="""
+
+htmlHeader2 = """ ;
 		htmlGenerator = new showdown.Converter();
 		window.onload = function () {
 			var toc = document.getElementById("toc");
@@ -52,38 +54,7 @@ htmlHeader = """
 					var solution = solutions[message];
 					// If solution is found, show popup
 					if (solution) {
-						var popup = document.getElementById("solutionPopup");
-						var popupTitle = document.getElementById("solutionTitle");
-						var popupContent = document.getElementById("solutionContent");
-						var closeButton = document.getElementById("closeButton");
-						popup.className = "popup";
-						popup.style.display = "block";
-						popup.style.zIndex = "1";
-						popup.style.position = "fixed";
-						popup.style.top = "50%";
-						popup.style.left = "50%";
-						popup.style.transform = "translate(-50%, -50%)";
-						popup.style.backgroundColor = "white";
-						popup.style.padding = "20px";
-						popup.style.boxShadow = "0 0 10px rgba(0, 0, 0, 0.3)";
-						popup.style.borderCollapse = "collapse";
-						popup.style.borderRadius = "10px";
-						popup.style.transition = "transform 0.2s ease-in-out";
-						popup.style.overflow = "auto";
-						popup.style.backgroundColor = "#eaeaea"
-
-						// Change the size of the popup when user hovers over it
-						popup.addEventListener("mouseover", function () {
-							popup.style.transform = "translate(-50%, -50%) scale(1.1)";
-						});
-						popup.addEventListener("mouseout", function () {
-							popup.style.transform = "translate(-50%, -50%)";
-						});
-						popupTitle.textContent = message;
-						popupContent.innerHTML = htmlGenerator.makeHtml(solution);
-						closeButton.addEventListener("click", function () {
-							popup.style.display = "none";
-						});
+						showSolutionPopup(message, solution);
 					}
 				});
 			}
@@ -120,6 +91,42 @@ htmlHeader = """
 		    }
 		}
 
+		// Function to show the troubleshooting tip of the message in a popup
+		function showSolutionPopup(message, solution) {
+			var popup = document.getElementById("solutionPopup");
+			var popupTitle = document.getElementById("solutionTitle");
+			var popupContent = document.getElementById("solutionContent");
+			var closeButton = document.getElementById("closeButton");
+			popup.className = "popup";
+			popup.style.display = "block";
+			popup.style.zIndex = "1";
+			popup.style.position = "fixed";
+			popup.style.top = "50%";
+			popup.style.left = "50%";
+			popup.style.transform = "translate(-50%, -50%)";
+			popup.style.backgroundColor = "white";
+			popup.style.padding = "20px";
+			popup.style.boxShadow = "0 0 10px rgba(0, 0, 0, 0.3)";
+			popup.style.borderCollapse = "collapse";
+			popup.style.borderRadius = "10px";
+			popup.style.transition = "transform 0.2s ease-in-out";
+			popup.style.overflow = "auto";
+			popup.style.backgroundColor = "#eaeaea"
+
+			// Change the size of the popup when user hovers over it
+			popup.addEventListener("mouseover", function () {
+				popup.style.transform = "translate(-50%, -50%) scale(1.1)";
+			});
+			popup.addEventListener("mouseout", function () {
+				popup.style.transform = "translate(-50%, -50%)";
+			});
+			popupTitle.textContent = message;
+			popupContent.innerHTML = htmlGenerator.makeHtml(solution);
+			closeButton.addEventListener("click", function () {
+				popup.style.display = "none";
+			});
+		}
+
 		function closeHelpPopup() {
    			document.getElementById("helpPopup").style.display = "none";
   		}
@@ -290,7 +297,8 @@ htmlHeader = """
 		<b> Chart Section </b>
 		<p>In the Chart section, you can analyze the log data using interactive charts.<br>
 			&nbsp;&nbsp;&nbsp;&nbsp;- To zoom in on a specific area, click and drag the cursor to select the desired region.<br>
-			&nbsp;&nbsp;&nbsp;&nbsp;- To reset the zoom level, simply double-click on the chart </p>
+			&nbsp;&nbsp;&nbsp;&nbsp;- To reset the zoom level, simply double-click on the chart <br>
+			&nbsp;&nbsp;&nbsp;&nbsp;- To count the events per minute, 10 minutes, hour or day, click the buttons above the chart </p>
 		<b> Filtering </b>
 		<p> Filtering allows you to focus on specific data in the charts.<br>
 			&nbsp;&nbsp;&nbsp;&nbsp;- To filter the data, click on the legends corresponding to the data series you want
@@ -328,12 +336,42 @@ htmlHeader = """
 	</div>
 """   # Thanks bing for beautifying the HTML report https://tinyurl.com/2l3hskkl :)
 
+# The lazy report loads the solutions of the messages found with its data, instead of all of them in the header
+htmlHeader = htmlHeader1 + str(solutions) + htmlHeader2
+
 barChart1= """
     <script>
         document.addEventListener("DOMContentLoaded", function() {
-            var data ="""
+            var series ="""
+
+# Code which draws the bar chart of the series, see analyzer_series.py. The lazy report calls it once its data is loaded
+barChartCode = """
+            // Function to convert a minute key, minutes since 1900-01-01, to "MMDD HH:MM"
+            function minuteKeyToTime(minuteKey) {
+                var time = new Date(Date.UTC(1900, 0, 1) + minuteKey * 60000);
+                var pad = function(value) { return String(value).padStart(2, "0"); };
+                return pad(time.getUTCMonth() + 1) + pad(time.getUTCDate()) + " " + pad(time.getUTCHours()) + ":" + pad(time.getUTCMinutes());
+            }
 
-barChart2 = """
+            // Function to get the counts of each message per bucket of the resolution, labelled "MMDD" for days and "MMDD HH" for hours
+            function getResolutionData(resolution) {
+                var labelLength = resolution.minutes >= 1440 ? 4 : resolution.minutes >= 60 ? 7 : 10;
+                var data = {};
+                Object.keys(resolution.series).forEach(function(category) {
+                    var buckets = resolution.series[category][0];
+                    var counts = resolution.series[category][1];
+                    var bucket = Math.floor(series.start / resolution.minutes);
+                    var categoryData = data[category] = {};
+                    buckets.forEach(function(difference, i) {
+                        bucket += difference;
+                        categoryData[minuteKeyToTime(bucket * resolution.minutes).slice(0, labelLength)] = counts[i];
+                    });
+                });
+                return data;
+            }
+
+            var resolutions = series.resolutions;
+            var data = getResolutionData(resolutions.find(function(resolution) { return resolution.name === series.defaultResolution; }) || resolutions[0]);
             var categories = Object.keys(data);
             var allHours = Object.values(data).flatMap(Object.keys);
             var hours = [...new Set(allHours)].sort();
@@ -439,7 +477,32 @@ barChart2 = """
     chartContainer.addEventListener('dblclick', function () {
         myChart.resetZoom();
     });
-});
+
+    // Buttons to switch the chart between the resolutions, the counts of each are in the series already
+    var resolutionButtons = document.createElement("div");
+    resolutionButtons.className = "chart-resolutions";
+    resolutions.forEach(function(resolution) {
+        var button = document.createElement("button");
+        button.textContent = resolution.name;
+        button.disabled = resolution.name === series.defaultResolution;
+        button.addEventListener("click", function() {
+            var data = getResolutionData(resolution);
+            var labels = [...new Set(Object.values(data).flatMap(Object.keys))].sort();
+            myChart.data.labels = labels;
+            myChart.data.datasets.forEach(function(dataset) {
+                dataset.data = labels.map(function(label) { return data[dataset.label][label] || 0; });
+            });
+            myChart.resetZoom();
+            myChart.update();
+            resolutionButtons.querySelectorAll("button").forEach(function(other) {
+                other.disabled = other === button;
+            });
+        });
+        resolutionButtons.appendChild(button);
+    });
+    chartContainer.parentNode.insertBefore(resolutionButtons, chartContainer);
+"""
+barChart2 = barChartCode + """});
 </script>
 """
 htmlFooter = """
@@ -0,0 +1,223 @@
+############################################################################################################
+# Description: This file contains the pattern matching engine used by log_analyzer.py
+# PatternMatcher compiles a dictionary of log messages and their regex patterns once and matches them
+# against a log line in a single pass
+# Where:
+#   The literals required by every pattern, like "memory consumption" for "Operation failed.*memory
+#   consumption", are searched case sensitively in the lower cased text. str.find searches a literal much
+#   faster than an IGNORECASE regex, and faster than a regex alternation of the literals
+#   getCandidates searches every literal over a whole batch of lines and returns the lines which have a
+#   literal in them, most lines have none and are never looked at again
+#   All the patterns are combined into one alternation of named groups, which is only searched in the
+#   candidate lines
+#   Only the lines which match the combined regex are checked against the individual patterns
+# SeverityPatternMatcher matches a candidate line only with the patterns which can appear at the severity of
+# the line, the glog severity in its first byte or the postgres level after the process id. Lines without a
+# known severity, like the continuation lines of a multi line message, are matched with all the patterns
+# InstrumentedPatternMatcher searches every pattern on its own and records, per pattern, the number of
+# lines it was evaluated on, the number of lines it matched and the time spent searching it. It is used
+# instead of PatternMatcher once enableInstrumentation is called, to find the patterns that dominate the scan
+############################################################################################################
+from bisect import bisect_right
+from itertools import accumulate
+import re
+import time
+
+from analyzer_regex import getRequiredLiterals
+
+class PatternMatcher:
+    def __init__(self, regex_patterns):
+        self.messages = list(regex_patterns.keys())
+        self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in regex_patterns.values()]
+        self.combined = self.compileCombinedPattern()
+        self.literals = self.getPrefilterLiterals()
+
+    # Function to combine all the patterns into one named group alternation
+    def compileCombinedPattern(self):
+        # Patterns with their own groups can use back references, which would break once the groups
+        # are renumbered in the alternation. Fall back to the individual patterns for such pattern sets.
+        if not self.patterns or any(pattern.groups for pattern in self.patterns):
+            return None
+        alternation = "|".join("(?P<p{}>{})".format(index, pattern.pattern) for index, pattern in enumerate(self.patterns))
+        try:
+            return re.compile(alternation, re.IGNORECASE)
+        except re.error:
+            return None
+
+    # Function to get the literals of the prefilter, None if any of the patterns has no required literal
+    def getPrefilterLiterals(self):
+        literals = set()
+        for pattern in self.patterns:
+            requiredLiterals = getRequiredLiterals(pattern.pattern)
+            if not requiredLiterals:
+                return None
+            literals.update(requiredLiterals)
+        return sorted(literals) or None
+
+    # Function to check if the line can match any of the patterns
+    # IGNORECASE also folds a few non ASCII characters, so only ASCII lines can be prefiltered
+    def isCandidate(self, line):
+        if self.literals is None or not line.isascii():
+            return True
+        lowered = line.lower()
+        return any(literal in lowered for literal in self.literals)
+
+    # Function to get, for every line of the batch, if it can match any of the patterns
+    # Every literal is searched over the whole batch, from the start of the next line after every hit
+    def getCandidates(self, lines):
+        if self.literals is None:
+            return [True] * len(lines)
+        text = "".join(lines)
+        if not text.isascii():
+            return [self.isCandidate(line) for line in lines]
+        candidates = [False] * len(lines)
+        lineEnds = list(accumulate(map(len, lines)))
+        lowered = text.lower()
+        find = lowered.find
+        for literal in self.literals:
+            position = find(literal)
+            while position >= 0:
+                index = bisect_right(lineEnds, position)
+                candidates[index] = True
+                position = find(literal, lineEnds[index])
+        return candidates
+
+    # Function to get all the messages matching the line, in the same order as the regex patterns
+    def match(self, line):
+        if not self.isCandidate(line):
+            return []
+        return self.matchCandidate(line)
+
+    # Function to get all the messages matching a line which passed the prefilter
+    def matchCandidate(self, line):
+        if self.combined is None:
+            return [message for message, pattern in zip(self.messages, self.patterns) if pattern.search(line)]
+        match = self.combined.search(line)
+        if not match:
+            return []
+        # The combined regex only reports the leftmost match, other patterns may still match the line
+        firstMatch = int(match.lastgroup[1:])
+        return [message for index, (message, pattern) in enumerate(zip(self.messages, self.patterns)) if index == firstMatch or pattern.search(line)]
+
+# Severities of the glog lines and levels of the postgres lines
+GLOG_SEVERITIES = "IWEF"
+POSTGRES_LEVELS = {"DEBUG1", "DEBUG2", "DEBUG3", "DEBUG4", "DEBUG5", "INFO", "NOTICE", "WARNING", "ERROR", "LOG", "FATAL", "PANIC"}
+
+# Function to get the severity of the log line, None if the line has no known severity
+def getLineSeverity(line):
+    first = line[:1]
+    if first and first in GLOG_SEVERITIES and line[1:5].isdigit():
+        return first
+    if first.isdigit():
+        start = line.find("] ")
+        if start > 0:
+            level = line[start + 2:line.find(":", start + 2)]
+            if level in POSTGRES_LEVELS:
+                return level
+    return None
+
+class SeverityPatternMatcher(PatternMatcher):
+    def __init__(self, regex_patterns, severities):
+        super().__init__(regex_patterns)
+        self.regex_patterns = regex_patterns
+        self.severities = severities
+        self.severityMatchers = {None: self}
+
+    # Function to get the matcher of the patterns which can appear at the severity
+    def getSeverityMatcher(self, severity):
+        matcher = self.severityMatchers.get(severity)
+        if matcher is None:
+            patterns = {message: pattern for message, pattern in self.regex_patterns.items() if message not in self.severities or severity in self.severities[message]}
+            matcher = self if len(patterns) == len(self.regex_patterns) else PatternMatcher(patterns)
+            self.severityMatchers[severity] = matcher
+        return matcher
+
+    # Function to get all the messages matching a line which passed the prefilter, with the patterns of its severity
+    def matchCandidate(self, line):
+        matcher = self.getSeverityMatcher(getLineSeverity(line))
+        if matcher is self:
+            return super().matchCandidate(line)
+        return matcher.match(line)
+
+class InstrumentedPatternMatcher(PatternMatcher):
+    def __init__(self, regex_patterns):
+        super().__init__(regex_patterns)
+        self.stats = {}
+
+    # Function to get the candidate lines of the batch, the prefilter is counted as evaluated on every line
+    def getCandidates(self, lines):
+        startedAt = time.perf_counter()
+        candidates = super().getCandidates(lines)
+        self.addStats(PREFILTER_STATS, len(lines), sum(candidates), time.perf_counter() - startedAt)
+        return candidates
+
+    # Function to get all the messages matching a line which passed the prefilter, with every pattern
+    # searched and timed on its own
+    def matchCandidate(self, line):
+        messages = []
+        for message, pattern in zip(self.messages, self.patterns):
+            startedAt = time.perf_counter()
+            isMatch = pattern.search(line)
+            self.addStats(message, 1, 1 if isMatch else 0, time.perf_counter() - startedAt)
+            if isMatch:
+                messages.append(message)
+        return messages
+
+    # Function to add evaluations to the stats of the pattern
+    def addStats(self, message, evaluations, matches, seconds):
+        stats = self.stats.get(message)
+        if stats is None:
+            stats = self.stats[message] = [0, 0, 0.0]
+        stats[0] += evaluations
+        stats[1] += matches
+        stats[2] += seconds
+
+    # Function to get the stats recorded since the last call, as a dictionary of message and its
+    # evaluations, matches and seconds
+    def popStats(self):
+        stats = self.stats
+        self.stats = {}
+        return stats
+
+# Name of the stats of the literal prefilter in the pattern stats
+PREFILTER_STATS = "<literal prefilter>"
+
+# Cache of the compiled pattern matchers
+patternMatchers = {}
+# Set by enableInstrumentation and enableSeverityFilter, in the main process and in the initializer of the workers
+isInstrumented = False
+patternSeverities = None
+
+# Function to record the cost of every pattern in the pattern matchers created from now on
+def enableInstrumentation():
+    global isInstrumented
+    isInstrumented = True
+    patternMatchers.clear()
+
+# Function to match the lines only with the patterns of their severity in the pattern matchers created from now on
+def enableSeverityFilter(severities):
+    global patternSeverities
+    patternSeverities = severities
+    patternMatchers.clear()
+
+# Function to get the pattern matcher for the regex patterns
+# Instrumented matchers search every pattern on every candidate line, so they don't filter on the severity
+def getPatternMatcher(regex_patterns):
+    key = tuple(regex_patterns.items())
+    if key not in patternMatchers:
+        if isInstrumented:
+            patternMatchers[key] = InstrumentedPatternMatcher(regex_patterns)
+        elif patternSeverities:
+            patternMatchers[key] = SeverityPatternMatcher(regex_patterns, patternSeverities)
+        else:
+            patternMatchers[key] = PatternMatcher(regex_patterns)
+    return patternMatchers[key]
+
+# Function to add the pattern stats of a scan to the total pattern stats
+def mergePatternStats(totalStats, stats):
+    for message, (evaluations, matches, seconds) in stats.items():
+        total = totalStats.setdefault(message, [0, 0, 0.0])
+        total[0] += evaluations
+        total[1] += matches
+        total[2] += seconds
+    return totalStats
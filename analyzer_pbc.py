@@ -0,0 +1,63 @@
+############################################################################################################
+# Description: This file contains the helpers to decode the instance files with yb-pbc-dump
+# Instance files are decoded on a pool of threads. The output of yb-pbc-dump is memoised per path, size
+# and mtime of the instance file, and the memo is saved in a JSON cache file next to analyzer.log so that
+# re-running the analyzer on the same bundle doesn't spawn any yb-pbc-dump process
+############################################################################################################
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import subprocess
+import threading
+
+from analyzer_cache import JsonFileCache
+
+logger = logging.getLogger(__name__)
+
+# Name of the cache file of the decoded instance files
+INSTANCE_CACHE_FILE = "analyzer_instance_cache.json"
+
+class InstanceFileDecoder:
+    def __init__(self, cacheFile=None, numWorkers=5, command="yb-pbc-dump"):
+        self.cache = JsonFileCache(cacheFile)
+        self.numWorkers = max(numWorkers, 1)
+        self.command = command
+        self.lock = threading.Lock()
+
+    # Function to run yb-pbc-dump on the instance file
+    def runCommand(self, instanceFile, stat):
+        try:
+            process = subprocess.run([self.command, instanceFile], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+        except OSError as e:
+            logger.warning("Could not run {} on {}: {}".format(self.command, instanceFile, e))
+            return []
+        lines = process.stdout.splitlines(True)
+        # Failures are not cached, so they are retried on the next run
+        if process.returncode == 0:
+            with self.lock:
+                self.cache.put(instanceFile, stat, lines)
+        return lines
+
+    # Function to decode the instance files, returns a dictionary of instance file and output lines
+    def decode(self, instanceFiles):
+        decoded = {}
+        pending = []
+        for instanceFile in instanceFiles:
+            try:
+                stat = os.stat(instanceFile)
+            except OSError:
+                decoded[instanceFile] = []
+                continue
+            lines = self.cache.get(instanceFile, stat)
+            if lines is None:
+                pending.append((instanceFile, stat))
+            else:
+                decoded[instanceFile] = lines
+        if pending:
+            logger.debug("Decoding {} instance files, {} found in the cache".format(len(pending), len(decoded)))
+            with ThreadPoolExecutor(max_workers=min(self.numWorkers, len(pending))) as executor:
+                futures = [(instanceFile, executor.submit(self.runCommand, instanceFile, stat)) for instanceFile, stat in pending]
+                for instanceFile, future in futures:
+                    decoded[instanceFile] = future.result()
+            self.cache.save()
+        return decoded
@@ -0,0 +1,115 @@
+############################################################################################################
+# Description: This file contains the profiling of the analysis
+# StageTimer times the stages of the main process. A stage runs till the next one is started, and a nested
+# stage, like writing the report while the files are analyzed, is not counted in the stage it runs in
+# The analysis tasks run in the pool workers, so they are profiled with cProfile in the workers. Each task
+# dumps its stats into the profile directory and the stats of all the tasks are merged into the hot functions
+# The pattern costs are the stats of the instrumented pattern matchers of all the scans, most expensive first
+############################################################################################################
+from contextlib import contextmanager
+import cProfile
+import glob
+import os
+import pstats
+import time
+
+import tabulate
+
+# Number of hot functions reported
+NUM_HOT_FUNCTIONS = 20
+
+class StageTimer:
+    def __init__(self):
+        self.stageTimes = {}
+        self.currentStage = None
+        self.startedAt = time.perf_counter()
+        self.createdAt = self.startedAt
+
+    # Function to add the time since the current stage started to it
+    def chargeCurrentStage(self):
+        now = time.perf_counter()
+        if self.currentStage is not None:
+            self.stageTimes[self.currentStage] = self.stageTimes.get(self.currentStage, 0) + now - self.startedAt
+        self.startedAt = now
+
+    # Function to end the current stage and start the next one, None to stop timing
+    def start(self, stage):
+        self.chargeCurrentStage()
+        self.currentStage = stage
+
+    def stop(self):
+        self.start(None)
+
+    # Function to time a nested stage, the stage it runs in is continued after it
+    @contextmanager
+    def stage(self, stage):
+        previousStage = self.currentStage
+        self.start(stage)
+        try:
+            yield
+        finally:
+            self.start(previousStage)
+
+    # Function to get the stage timing table rows, in the order the stages were started
+    def getTable(self):
+        totalTime = max(time.perf_counter() - self.createdAt, 0.001)
+        table = [[stage, round(seconds, 3), round(seconds * 100 / totalTime, 1)] for stage, seconds in self.stageTimes.items()]
+        table.append(["Total", round(totalTime, 3), 100.0])
+        return table
+
+# Function to run the function with cProfile and dump its stats into the profile file
+def runProfiled(profileFile, function, *arguments):
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *arguments)
+    finally:
+        profiler.dump_stats(profileFile)
+
+# Function to merge the stats in the profile directory, returns the hot function table rows by own time
+def getHotFunctions(profileDirectory, limit=NUM_HOT_FUNCTIONS):
+    profileFiles = sorted(glob.glob(os.path.join(profileDirectory, "*.prof")))
+    if not profileFiles:
+        return []
+    stats = pstats.Stats(*profileFiles)
+    table = []
+    for (file, line, name), (primitiveCalls, calls, ownTime, cumulativeTime, callers) in stats.stats.items():
+        function = name if file == "~" else "{}:{}({})".format(os.path.basename(file), line, name)
+        table.append([function, calls, round(ownTime, 3), round(cumulativeTime, 3)])
+    table.sort(key=lambda row: row[2], reverse=True)
+    return table[:limit]
+
+# Function to get the pattern cost table rows from the pattern stats, most expensive first
+def getPatternCosts(patternStats):
+    totalSeconds = max(sum(seconds for evaluations, matches, seconds in patternStats.values()), 0.000001)
+    table = []
+    for message, (evaluations, matches, seconds) in patternStats.items():
+        table.append([message, evaluations, matches, round(seconds, 3), round(seconds * 1000000 / max(evaluations, 1), 2), round(seconds * 100 / totalSeconds, 1)])
+    table.sort(key=lambda row: row[3], reverse=True)
+    return table
+
+STAGE_HEADERS = ["Stage", "Seconds", "% of Total"]
+HOT_FUNCTION_HEADERS = ["Function", "Calls", "Own Seconds", "Cumulative Seconds"]
+PATTERN_COST_HEADERS = ["Pattern", "Evaluations", "Matches", "Seconds", "Microseconds per Evaluation", "% of Matching Time"]
+
+# Function to get the profile as text, for analyzer.log and the markdown report
+def getProfileText(stageTable, hotFunctionTable, patternCostTable, tablefmt="simple"):
+    content = "Stage timings:\n" + tabulate.tabulate(stageTable, headers=STAGE_HEADERS, tablefmt=tablefmt)
+    if hotFunctionTable:
+        content += "\n\nHot functions in the workers, merged over all the analysis tasks:\n" + tabulate.tabulate(hotFunctionTable, headers=HOT_FUNCTION_HEADERS, tablefmt=tablefmt)
+    if patternCostTable:
+        content += "\n\nPattern costs, every pattern searched on its own:\n" + tabulate.tabulate(patternCostTable, headers=PATTERN_COST_HEADERS, tablefmt=tablefmt)
+    return content
+
+# Function to get the profile as a collapsible HTML section, the tables are not headings so they stay out of the table of contents of the report
+def getProfileHTML(stageTable, hotFunctionTable, patternCostTable):
+    content = "<details id=profile><summary><b> Profile </b></summary>"
+    content += "<p><b> Stage Timings </b></p>"
+    content += tabulate.tabulate(stageTable, headers=STAGE_HEADERS, tablefmt="html").replace("<table>", "<table class='sortable'>")
+    if hotFunctionTable:
+        content += "<p><b> Hot Functions in the Workers </b></p>"
+        content += tabulate.tabulate(hotFunctionTable, headers=HOT_FUNCTION_HEADERS, tablefmt="html").replace("<table>", "<table class='sortable'>")
+    if patternCostTable:
+        content += "<p><b> Pattern Costs </b></p>"
+        content += tabulate.tabulate(patternCostTable, headers=PATTERN_COST_HEADERS, tablefmt="html").replace("<table>", "<table class='sortable'>")
+    content += "</details>"
+    return content
@@ -0,0 +1,82 @@
+############################################################################################################
+# Description: This file contains the progress reporting of the analysis
+# ProgressReporter counts the files and bytes done against the total planned for the analysis, and the
+# lines and bytes actually scanned, which are less than planned when a file is stopped at the end time.
+# The live progress line is redrawn on the console, if it is a terminal, at most every REFRESH_INTERVAL
+# seconds and shows the files done, bytes scanned, lines/s, MB/s, the ETA and the largest file not done yet
+############################################################################################################
+import os
+import sys
+import time
+
+# Minimum number of seconds between two redraws of the progress line
+REFRESH_INTERVAL = 0.5
+
+# Function to format a number of seconds as HH:MM:SS
+def formatDuration(seconds):
+    seconds = int(seconds)
+    return "{:02d}:{:02d}:{:02d}".format(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+class ProgressReporter:
+    def __init__(self, totalFiles, totalBytes, stream=sys.stderr):
+        self.totalFiles = totalFiles
+        self.totalBytes = totalBytes
+        self.stream = stream
+        self.isTerminal = hasattr(stream, "isatty") and stream.isatty()
+        self.startTime = time.time()
+        self.lastRefresh = 0
+        self.filesDone = 0
+        self.plannedBytesDone = 0
+        self.bytesScanned = 0
+        self.linesScanned = 0
+        self.largestPendingFile = None
+
+    # Function to add a finished task, plannedBytes is the size the task was planned for
+    def addTask(self, plannedBytes, bytesScanned, linesScanned):
+        self.plannedBytesDone += plannedBytes
+        self.bytesScanned += bytesScanned
+        self.linesScanned += linesScanned
+        self.refresh()
+
+    # Function to add a finished file, largestPendingFile is the largest file which is not done yet
+    def addFile(self, largestPendingFile=None):
+        self.filesDone += 1
+        self.largestPendingFile = largestPendingFile
+        self.refresh()
+
+    # Function to get the elapsed time, lines/s and MB/s
+    def getRates(self):
+        elapsedTime = max(time.time() - self.startTime, 0.001)
+        return elapsedTime, self.linesScanned / elapsedTime, self.bytesScanned / 1024 / 1024 / elapsedTime
+
+    # Function to get the progress line
+    def getProgressLine(self):
+        elapsedTime, linesPerSecond, megabytesPerSecond = self.getRates()
+        if self.plannedBytesDone and self.totalBytes:
+            eta = formatDuration(elapsedTime * (self.totalBytes - self.plannedBytesDone) / self.plannedBytesDone)
+        else:
+            eta = "--:--:--"
+        line = "Files {}/{} | {:.1f}/{:.1f} MB | {:,.0f} lines/s | {:.1f} MB/s | ETA {}".format(
+            self.filesDone, self.totalFiles, self.bytesScanned / 1024 / 1024, self.totalBytes / 1024 / 1024, linesPerSecond, megabytesPerSecond, eta)
+        if self.largestPendingFile:
+            line += " | Waiting for " + os.path.basename(self.largestPendingFile)
+        return line
+
+    # Function to redraw the progress line
+    def refresh(self, force=False):
+        if not self.isTerminal or not force and time.time() - self.lastRefresh < REFRESH_INTERVAL:
+            return
+        self.lastRefresh = time.time()
+        # The cursor is left at the start of the line, so log messages are written over the progress line
+        self.stream.write("\033[K" + self.getProgressLine() + "\r")
+        self.stream.flush()
+
+    # Function to end the progress line, returns the throughput summary
+    def finish(self):
+        if self.isTerminal:
+            self.refresh(force=True)
+            self.stream.write("\n")
+            self.stream.flush()
+        elapsedTime, linesPerSecond, megabytesPerSecond = self.getRates()
+        return "Analyzed {} files, scanned {:.1f} MB and {:,} lines in {:.1f} seconds ({:,.0f} lines/s, {:.1f} MB/s)".format(
+            self.filesDone, self.bytesScanned / 1024 / 1024, self.linesScanned, elapsedTime, linesPerSecond, megabytesPerSecond)
@@ -0,0 +1,154 @@
+############################################################################################################
+# Description: This file contains the helpers which look into the parsed form of the regex patterns
+# getSampleMessage builds a line which matches a pattern, to plant the messages in synthetic logs
+# getBacktrackingRisks finds the constructs which can make the search of a pattern superlinear:
+#   nested quantifier: a repeated group which has a repeat in it, like (a+)+, can backtrack exponentially
+#   multiple wildcards: every .* or .+ after the first one multiplies the positions tried when the rest of
+#                       the pattern doesn't match, like "failed.*memory.*exceeded" on a long line
+# getRequiredLiterals finds literals one of which is in every line the pattern matches, for the literal
+# prefilter of the pattern matcher. Like "memory consumption" for "Operation failed.*memory consumption"
+############################################################################################################
+try:
+    import re._parser as sre_parse
+except ImportError:
+    import sre_parse
+
+# Names of the repeat operators
+REPEAT_OPERATORS = ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+# Repeats with a larger maximum than this are unbounded
+UNBOUNDED_REPEAT = 1000
+
+# Function to get the items of a group, atomic groups have no group number or flags
+def getGroupItems(name, value):
+    return value if name == "ATOMIC_GROUP" else value[-1]
+
+# Function to get a line which matches the regex pattern, built from its parsed form
+def getSampleMessage(pattern):
+    return "".join(getSampleText(sre_parse.parse(pattern)))
+
+# Function to get the text matched by the items of a parsed regex pattern
+def getSampleText(items):
+    text = []
+    for op, value in items:
+        name = str(op)
+        if name == "LITERAL":
+            text.append(chr(value))
+        elif name == "NOT_LITERAL":
+            text.append("x" if value != ord("x") else "y")
+        elif name == "ANY":
+            text.append("x")
+        elif name == "IN":
+            text.append(getSampleSetCharacter(value))
+        elif name in REPEAT_OPERATORS:
+            minimum, maximum, subItems = value
+            text += getSampleText(subItems) * max(minimum, 1)
+        elif name in ("SUBPATTERN", "ATOMIC_GROUP"):
+            text += getSampleText(getGroupItems(name, value))
+        elif name == "BRANCH":
+            text += getSampleText(value[1][0])
+        elif name == "CATEGORY":
+            text.append(getSampleCategoryCharacter(value))
+    return text
+
+# Function to get a character of a character set
+def getSampleSetCharacter(items):
+    op, value = items[0]
+    name = str(op)
+    if name == "LITERAL":
+        return chr(value)
+    if name == "RANGE":
+        return chr(value[0])
+    if name == "CATEGORY":
+        return getSampleCategoryCharacter(value)
+    return "x"
+
+# Function to get a character of a category like \d
+def getSampleCategoryCharacter(category):
+    return {"CATEGORY_DIGIT": "0", "CATEGORY_SPACE": " ", "CATEGORY_WORD": "a"}.get(str(category), "x")
+
+# Function to get the lower cased literals one of which is in every match of the pattern, empty if there are none
+def getRequiredLiterals(pattern):
+    try:
+        return sorted(getRequiredLiteralsOfItems(sre_parse.parse(pattern)))
+    except Exception:
+        return []
+
+# Function to get the best set of required literals of a sequence of parsed items, the set whose shortest
+# literal is the longest. Runs of literal characters are required, and so are the required literals of
+# the groups and of the repeats which match at least once
+def getRequiredLiteralsOfItems(items):
+    candidates = []
+    run = ""
+    for op, value in items:
+        name = str(op)
+        if name == "LITERAL":
+            run += chr(value)
+            continue
+        candidates.append({run})
+        run = ""
+        if name in ("SUBPATTERN", "ATOMIC_GROUP"):
+            candidates.append(getRequiredLiteralsOfItems(getGroupItems(name, value)))
+        elif name in REPEAT_OPERATORS and value[0] >= 1:
+            candidates.append(getRequiredLiteralsOfItems(value[2]))
+        elif name == "BRANCH":
+            literals = set()
+            for branch in value[1]:
+                branchLiterals = getRequiredLiteralsOfItems(branch)
+                if not branchLiterals:
+                    literals = set()
+                    break
+                literals |= branchLiterals
+            candidates.append(literals)
+    candidates.append({run})
+    best = set()
+    for literals in candidates:
+        # Only ASCII literals can be compared with the lower cased line, and a literal can't span lines
+        if not literals or not all(literal and literal.isascii() and "\n" not in literal for literal in literals):
+            continue
+        literals = {literal.lower() for literal in literals}
+        if not best or min(map(len, literals)) > min(map(len, best)):
+            best = literals
+    return best
+
+# Function to get the backtracking risks of the regex pattern
+def getBacktrackingRisks(pattern):
+    risks = []
+    items = sre_parse.parse(pattern)
+    if hasNestedRepeat(items, False):
+        risks.append("nested quantifier")
+    numWildcards = countUnboundedWildcards(items)
+    if numWildcards > 1:
+        risks.append("{} unbounded wildcards".format(numWildcards))
+    return risks
+
+# Function to check if a repeat has a repeat in it
+def hasNestedRepeat(items, isInRepeat):
+    for op, value in items:
+        name = str(op)
+        if name in REPEAT_OPERATORS:
+            minimum, maximum, subItems = value
+            isRepeated = maximum > 1
+            if isInRepeat and isRepeated:
+                return True
+            if hasNestedRepeat(subItems, isInRepeat or isRepeated):
+                return True
+        elif name in ("SUBPATTERN", "ATOMIC_GROUP"):
+            if hasNestedRepeat(getGroupItems(name, value), isInRepeat):
+                return True
+        elif name == "BRANCH":
+            if any(hasNestedRepeat(branch, isInRepeat) for branch in value[1]):
+                return True
+    return False
+
+# Function to count the unbounded repeats of any character, like .* and .+, outside the groups
+def countUnboundedWildcards(items):
+    count = 0
+    for op, value in items:
+        name = str(op)
+        if name in REPEAT_OPERATORS:
+            minimum, maximum, subItems = value
+            if maximum >= UNBOUNDED_REPEAT and len(subItems) == 1 and str(subItems[0][0]) == "ANY":
+                count += 1
+        elif name == "SUBPATTERN":
+            count += countUnboundedWildcards(value[-1])
+    return count
@@ -0,0 +1,48 @@
+############################################################################################################
+# Description: This file contains the tables of the analysis results of the log files in the report
+# The table of a log file has a row per message found in it, with its number of occurrences and its first
+# and last occurrence times, sorted as asked with --sort-by. log_analyzer.py and the benchmark render the
+# tables with the same functions, so the benchmark times the rendering of the report
+############################################################################################################
+from collections import OrderedDict
+
+import tabulate
+
+RESULT_HEADERS = ["Occurrences", "Message", "First Occurrence", "Last Occurrence"]
+
+# Function to get the table rows of the analysis results of a log file
+# sortBy is NO for the number of occurrences, LO for the last occurrence and FO or None for the first occurrence
+def getResultsTable(results, sortBy=None):
+    if sortBy == 'NO':
+        sortedDict = OrderedDict(sorted(results.items(), key=lambda x: x[1]["numOccurrences"], reverse=True))
+    elif sortBy == 'LO':
+        sortedDict = OrderedDict(sorted(results.items(), key=lambda x: x[1]["lastOccurrenceTime"]))
+    else:
+        sortedDict = OrderedDict(sorted(results.items(), key=lambda x: x[1]["firstOccurrenceTime"]))
+    table = []
+    for message, info in sortedDict.items():
+        table.append(
+            [
+                info["numOccurrences"],
+                message,
+                info["firstOccurrenceTime"],
+                info["lastOccurrenceTime"],
+            ]
+        )
+    return table
+
+# Function to get the table of a log file as HTML
+def getResultsHTML(logFile, table):
+    formatLogFileForHTMLId = logFile.replace("/", "-").replace(".", "-").replace(" ", "-").replace(":", "-")
+    content = "<h4 id=" + formatLogFileForHTMLId + ">" + logFile + "</h4>"
+    content += tabulate.tabulate(table, headers=RESULT_HEADERS, tablefmt="html")
+    content = content.replace("$line-break$", "<br>").replace("$tab$", "&nbsp;&nbsp;&nbsp;&nbsp;").replace("$start-code$", "<code>").replace("$end-code$", "</code>").replace("$start-bold$", "<b>").replace("$end-bold$", "</b>").replace("$start-italic$", "<i>").replace("$end-italic$", "</i>").replace("<table>", "<table class='sortable' id='main-table'>")
+    return content
+
+# Function to get the table of a log file as markdown
+def getResultsMarkdown(logFile, table):
+    formatLogFileForMarkdown = logFile.replace("/", "-").replace(".", "-").replace(" ", "-").replace(":", "-")
+    content = "## " + formatLogFileForMarkdown + "\n\n"
+    content += tabulate.tabulate(table, headers=RESULT_HEADERS, tablefmt="simple_grid")
+    content = content.replace("$line-break$", "\n").replace("$tab$", "\t").replace("$start-code$", "`").replace("$end-code$", "`").replace("$start-bold$", "**").replace("$end-bold$", "**").replace("$start-italic$", "*").replace("$end-italic$", "*")
+    return content
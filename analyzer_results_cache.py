@@ -0,0 +1,113 @@
+############################################################################################################
+# Description: This file contains the SQLite cache of the scan results of the log files
+# The cache file is saved next to analyzer.log. The scan result of a log file is cached with:
+#   patternHash: hash of the regex patterns the file was scanned with, and of their severities with --severity_filter
+#   size, mtime: size and mtime of the file when it was scanned
+#   headHash: hash of the first bytes of the file, to find out that a bigger file was only appended to
+#   endOffset: offset of the end of the last complete line of an uncompressed file, the last line of a live
+#              log file may still be written when it is scanned, so it is left out of the cached counts
+#   coverageStart, coverageEnd: minute keys of the time range the file was scanned for, coverageEnd is
+#                               NULL if the file was scanned till the end
+#   status, stoppedAt, lastMinuteKey: as in the scan result, lastMinuteKey is the time of the lines without
+#                                     time at endOffset when the file is scanned again from there
+#   counts: number of occurrences of each message per minute key
+# A cached scan result is used for any time range within the covered one. An uncompressed file which
+# was appended to since it was scanned till the end, or whose last line had no line end, is scanned again
+# only from endOffset.
+############################################################################################################
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+
+from analyzer_scan import getScanResult, summarizeScanResult
+
+logger = logging.getLogger(__name__)
+
+# Name of the cache file of the scan results
+RESULTS_CACHE_FILE = "analyzer_cache.db"
+# Version of the scan results, change it when the scanner counts differently to drop the cached results
+SCAN_RESULTS_VERSION = 2
+# Number of bytes at the beginning of the file which are hashed
+HEAD_SIZE = 4096
+
+# Function to get the hash of the regex patterns, and of the severities the lines are filtered on
+def getPatternHash(regex_patterns, severities=None):
+    key = [SCAN_RESULTS_VERSION, list(regex_patterns.items())]
+    if severities:
+        key.append(sorted((message, sorted(levels)) for message, levels in severities.items()))
+    return hashlib.sha1(json.dumps(key).encode()).hexdigest()
+
+# Function to get the hash of the first bytes of the file
+def getHeadHash(logFile, size=HEAD_SIZE):
+    with open(logFile, "rb") as f:
+        return hashlib.sha1(f.read(size)).hexdigest()
+
+class ResultsCache:
+    def __init__(self, cacheFile):
+        self.cacheFile = cacheFile
+        self.connection = sqlite3.connect(cacheFile)
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS files (
+            path TEXT, patternHash TEXT, size INTEGER, mtime INTEGER, headHash TEXT, endOffset INTEGER,
+            coverageStart INTEGER, coverageEnd INTEGER, status TEXT, stoppedAt INTEGER, lastMinuteKey INTEGER,
+            PRIMARY KEY (path, patternHash))""")
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS counts (
+            path TEXT, patternHash TEXT, message TEXT, minuteKey INTEGER, count INTEGER)""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS countsByFile ON counts (path, patternHash)")
+
+    # Function to get the cached entry of the file, None if the file was not scanned with these patterns
+    def getEntry(self, logFile, patternHash):
+        cursor = self.connection.execute("""SELECT size, mtime, headHash, endOffset, coverageStart, coverageEnd, status, stoppedAt, lastMinuteKey
+            FROM files WHERE path = ? AND patternHash = ?""", (os.path.abspath(logFile), patternHash))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip(["size", "mtime", "headHash", "endOffset", "coverageStart", "coverageEnd", "status", "stoppedAt", "lastMinuteKey"], row))
+
+    # Function to get the cached scan result of the file
+    def getScanResult(self, logFile, patternHash, entry, regex_patterns):
+        scanResult = getScanResult(logFile, entry["status"])
+        scanResult["stoppedAt"] = entry["stoppedAt"]
+        scanResult["lastMinuteKey"] = entry["lastMinuteKey"]
+        cursor = self.connection.execute("SELECT message, minuteKey, count FROM counts WHERE path = ? AND patternHash = ?", (os.path.abspath(logFile), patternHash))
+        for message, minuteKey, count in cursor:
+            scanResult["counts"].setdefault(message, {})[minuteKey] = count
+        return summarizeScanResult(scanResult, regex_patterns)
+
+    # Function to cache the scan result of the file
+    def putScanResult(self, logFile, patternHash, stat, endOffset, coverageStart, coverageEnd, scanResult):
+        path = os.path.abspath(logFile)
+        self.connection.execute("DELETE FROM counts WHERE path = ? AND patternHash = ?", (path, patternHash))
+        self.connection.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, patternHash, stat.st_size, stat.st_mtime_ns, getHeadHash(logFile), endOffset, coverageStart, coverageEnd,
+             scanResult["status"], scanResult["stoppedAt"], scanResult["lastMinuteKey"]))
+        self.connection.executemany("INSERT INTO counts VALUES (?, ?, ?, ?, ?)",
+            ((path, patternHash, message, minuteKey, count) for message, minuteCounts in scanResult["counts"].items() for minuteKey, count in minuteCounts.items()))
+
+    # Function to save the cached scan results
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+# Function to check if the cached entry covers the time range
+def isCoveringTimeRange(entry, startMinuteKey, endMinuteKey):
+    return entry["coverageStart"] <= startMinuteKey and (entry["coverageEnd"] is None or endMinuteKey <= entry["coverageEnd"])
+
+# Function to check if the file is unchanged since it was cached, and all of it is in the cached scan result
+def isUnchanged(entry, stat):
+    if entry["endOffset"] is not None and entry["endOffset"] != stat.st_size:
+        return False
+    return entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns
+
+# Function to check if the uncompressed file was only appended to since it was scanned till the end
+# A file whose last line had no line end is scanned again from that line even if it was not appended to
+def isAppended(logFile, entry, stat):
+    if logFile.endswith(".gz") or entry["status"] != "complete" or entry["endOffset"] is None:
+        return False
+    if stat.st_size < entry["size"] or entry["endOffset"] >= stat.st_size:
+        return False
+    return getHeadHash(logFile) == entry["headHash"]
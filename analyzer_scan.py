@@ -0,0 +1,211 @@
+############################################################################################################
+# Description: This file contains the scanner which matches the regex patterns against a log file
+# scanLogFile scans a whole log file or a byte range of it and returns a scan result:
+#   status: "complete" if the file or range was read till the end
+#           "stopped" if a line after the end time was found, rest of the file is not analyzed
+#           "unreadable" if the file couldn't be read, error has the exception
+#   Lines before the start time are not analyzed. Uncompressed log files are not read before the start time,
+#   findStartOffset finds the first line at or after the start time with a binary search
+#   stoppedAt: minute key of the line after the end time
+#   lastMinuteKey: minute key of the last line read
+#   partialLine: bytes, minute key and messages of the last line if it has no line end yet, like the line being
+#                written to a live log file, None otherwise. The cache leaves it out, see analyzer_results_cache.py
+#   linesRead, bytesRead: number of lines and bytes read, for the throughput of the analysis and the offsets of the events
+#   patternStats: evaluations, matches and seconds of every pattern, only with an instrumented matcher
+#   events: the matched lines as events for the export, only if collectEvents is set, see analyzer_events.py
+#   counts: dictionary of message and its number of occurrences per minute key
+# The counts are summarized, in the order of the regex patterns, into:
+#   results: dictionary of message and its numOccurrences, firstOccurrenceTime and lastOccurrenceTime
+#   messageCounts: Counter of the number of occurrences of each message
+# The counts of all the log files are added up for the bar chart of the report, see analyzer_series.py
+# Scan results of consecutive byte ranges of a file are merged with mergeScanResults
+############################################################################################################
+from collections import Counter
+import io
+
+from analyzer_io import openLogFile, findFirstLineOffset, DEFAULT_BUFFER_SIZE_KB
+from analyzer_matcher import getPatternMatcher, mergePatternStats, getLineSeverity, InstrumentedPatternMatcher
+from analyzer_events import getEvents, extendEvents, getEventsInTimeRange, SEVERITY_INDEXES
+from analyzer_time import LogTimeParser, isLineWithTime, timeToMinuteKey, minuteKeyToTime
+
+# Number of characters of the lines read at a time
+LINE_BATCH_SIZE = 64 * 1024
+
+# Function to get an empty scan result
+def getScanResult(logFile, status="complete"):
+    return {
+        "logFile": logFile,
+        "status": status,
+        "error": None,
+        "stoppedAt": None,
+        "lastMinuteKey": None,
+        "partialLine": None,
+        "linesRead": 0,
+        "bytesRead": 0,
+        "patternStats": {},
+        "events": None,
+        "counts": {},
+        "results": {},
+        "messageCounts": Counter(),
+    }
+
+# Function to find the offset of the first line at or after the start time in the byte range startOffset
+# to endOffset of an uncompressed log file
+def findStartOffset(logFile, startMinuteKey, startOffset=0, endOffset=None):
+    isBefore = lambda line: LogTimeParser().getMinuteKey(line.decode(errors="replace")) < startMinuteKey
+    return findFirstLineOffset(logFile, isBefore, isLineWithTime, startOffset, endOffset)
+
+# Function to scan a log file, or the byte range startOffset to endOffset of it, for the regex patterns
+# previousMinuteKey is the minute key of the line before the range, for the lines without time at its start
+def scanLogFile(logFile, regex_patterns, startMinuteKey, endMinuteKey, startOffset=0, endOffset=None, bufferSizeKB=DEFAULT_BUFFER_SIZE_KB, collectEvents=False, previousMinuteKey=None):
+    try:
+        # The lines at the start of the range are not seeked over if the line before it is in the time range
+        if not logFile.endswith(".gz") and (previousMinuteKey is None or previousMinuteKey < startMinuteKey):
+            startOffset = findStartOffset(logFile, startMinuteKey, startOffset, endOffset)
+        logs = openLogFile(logFile, bufferSizeKB, startOffset, endOffset)
+    except Exception as e:
+        scanResult = getScanResult(logFile, "unreadable")
+        scanResult["error"] = e
+        return scanResult
+    return scanLogStream(logFile, logs, regex_patterns, startMinuteKey, endMinuteKey, collectEvents, startOffset, previousMinuteKey)
+
+# Function to scan a block of lines of a log file, the blocks of a file are merged with mergeScanResults
+# blockOffset is the offset of the block in the log file, for the offsets of the events
+def scanLogBlock(logFile, block, regex_patterns, startMinuteKey, endMinuteKey, collectEvents=False, blockOffset=0):
+    return scanLogStream(logFile, io.TextIOWrapper(io.BytesIO(block), newline=""), regex_patterns, startMinuteKey, endMinuteKey, collectEvents, blockOffset)
+
+# Function to scan the lines of an opened log file for the regex patterns, closes the log file
+# startOffset is the offset of the first line in the log file, for the offsets of the events
+# The bytes of a line are its characters in a batch of ASCII lines, other lines are encoded like they were decoded
+def scanLogStream(logFile, logs, regex_patterns, startMinuteKey, endMinuteKey, collectEvents=False, startOffset=0, previousMinuteKey=None):
+    scanResult = getScanResult(logFile)
+    counts = scanResult["counts"]
+    events = getEvents() if collectEvents else None
+    messageIndexes = {message: index for index, message in enumerate(regex_patterns)}
+    timeParser = LogTimeParser(timeToMinuteKey('0101 00:00') if previousMinuteKey is None else previousMinuteKey) # Default time
+    matcher = getPatternMatcher(regex_patterns)
+    linesRead = bytesRead = 0
+    line = ""
+    try:
+        # The literal prefilter of the matcher is searched over a batch of lines at a time
+        for lines in iter(lambda: logs.readlines(LINE_BATCH_SIZE), []):
+            candidates = matcher.getCandidates(lines)
+            isAscii = "".join(lines).isascii()
+            for line, isCandidate in zip(lines, candidates):
+                linesRead += 1
+                lineBytes = len(line) if isAscii else len(line.encode(logs.encoding, logs.errors))
+                bytesRead += lineBytes
+                minuteKey = timeParser.getMinuteKey(line)
+                # Stop if the time is outside the range
+                if minuteKey > endMinuteKey:
+                    scanResult["status"] = "stopped"
+                    scanResult["stoppedAt"] = minuteKey
+                    break
+                # Skip the lines before the start time, which can't be seeked over in compressed log files
+                if minuteKey < startMinuteKey or not isCandidate:
+                    continue
+                messages = matcher.matchCandidate(line)
+                for message in messages:
+                    minuteCounts = counts.get(message)
+                    if minuteCounts is None:
+                        minuteCounts = counts[message] = {}
+                    minuteCounts[minuteKey] = minuteCounts.get(minuteKey, 0) + 1
+                if events is not None and messages:
+                    severityIndex = SEVERITY_INDEXES.get(getLineSeverity(line), 0)
+                    for message in messages:
+                        events["minuteKeys"].append(minuteKey)
+                        events["messageIds"].append(messageIndexes[message])
+                        events["severities"].append(severityIndex)
+                        events["offsets"].append(startOffset + bytesRead - lineBytes)
+            if scanResult["status"] == "stopped":
+                break
+        if scanResult["status"] == "complete" and line and not line.endswith("\n"):
+            isCounted = isCandidate and minuteKey >= startMinuteKey
+            scanResult["partialLine"] = {"bytes": lineBytes, "minuteKey": minuteKey, "messages": matcher.matchCandidate(line) if isCounted else []}
+        scanResult["lastMinuteKey"] = timeParser.previousMinuteKey
+        scanResult["events"] = events
+    except Exception as e:
+        # UnicodeDecodeError means that this is not a text file
+        scanResult = getScanResult(logFile, "unreadable")
+        scanResult["error"] = e
+    finally:
+        scanResult["linesRead"] = linesRead
+        scanResult["bytesRead"] = bytesRead
+        if isinstance(matcher, InstrumentedPatternMatcher):
+            scanResult["patternStats"] = matcher.popStats()
+        logs.close()
+    return summarizeScanResult(scanResult, regex_patterns)
+
+# Function to fill the results and message counts of the scan result from its counts
+def summarizeScanResult(scanResult, regex_patterns):
+    counts = scanResult["counts"]
+    results = scanResult["results"] = {}
+    messageCounts = scanResult["messageCounts"] = Counter()
+    for message in [message for message in regex_patterns if message in counts]:
+        messageCounts[message] = sum(counts[message].values())
+        results[message] = {
+            "numOccurrences": messageCounts[message],
+            "firstOccurrenceTime": minuteKeyToTime(min(counts[message])),
+            "lastOccurrenceTime": minuteKeyToTime(max(counts[message])),
+        }
+    return scanResult
+
+# Function to merge the scan results of consecutive byte ranges of a log file, in the order of the ranges
+def mergeScanResults(scanResults, regex_patterns):
+    merged = getScanResult(scanResults[0]["logFile"])
+    for scanResult in scanResults:
+        if scanResult["status"] == "unreadable":
+            return scanResult
+        merged["linesRead"] += scanResult["linesRead"]
+        merged["bytesRead"] += scanResult["bytesRead"]
+        mergePatternStats(merged["patternStats"], scanResult["patternStats"])
+        if scanResult["events"] is not None:
+            merged["events"] = extendEvents(merged["events"] or getEvents(), scanResult["events"])
+        for message, minuteCounts in scanResult["counts"].items():
+            mergedCounts = merged["counts"].setdefault(message, {})
+            for minuteKey, count in minuteCounts.items():
+                mergedCounts[minuteKey] = mergedCounts.get(minuteKey, 0) + count
+        merged["lastMinuteKey"] = scanResult["lastMinuteKey"]
+        merged["partialLine"] = scanResult["partialLine"]
+        # Ranges after the one which reached the end time are not part of the analysis
+        if scanResult["status"] == "stopped":
+            merged["status"] = "stopped"
+            merged["stoppedAt"] = scanResult["stoppedAt"]
+            break
+    return summarizeScanResult(merged, regex_patterns)
+
+# Function to get the scan result without its partial last line, and the number of bytes of that line
+def getScanResultWithoutPartialLine(scanResult, regex_patterns):
+    partialLine = scanResult["partialLine"]
+    if partialLine is None:
+        return scanResult, 0
+    complete = dict(scanResult)
+    complete["partialLine"] = None
+    complete["counts"] = {message: dict(minuteCounts) for message, minuteCounts in scanResult["counts"].items()}
+    for message in partialLine["messages"]:
+        minuteCounts = complete["counts"][message]
+        minuteCounts[partialLine["minuteKey"]] -= 1
+        if not minuteCounts[partialLine["minuteKey"]]:
+            del minuteCounts[partialLine["minuteKey"]]
+            if not minuteCounts:
+                del complete["counts"][message]
+    return summarizeScanResult(complete, regex_patterns), partialLine["bytes"]
+
+# Function to get the scan result of the lines between the start and end time from a scan result
+# which covers them, like a cached one. Log lines are expected to be in the order of time, so the scan
+# is stopped if the last line read is after the end time
+def getScanResultInTimeRange(scanResult, regex_patterns, startMinuteKey, endMinuteKey):
+    if scanResult["status"] == "unreadable":
+        return scanResult
+    windowed = getScanResult(scanResult["logFile"], scanResult["status"])
+    windowed["stoppedAt"] = scanResult["stoppedAt"]
+    windowed["lastMinuteKey"] = scanResult["lastMinuteKey"]
+    if scanResult["events"] is not None:
+        windowed["events"] = getEventsInTimeRange(scanResult["events"], startMinuteKey, endMinuteKey)
+    for message, minuteCounts in scanResult["counts"].items():
+        windowCounts = {minuteKey: count for minuteKey, count in minuteCounts.items() if startMinuteKey <= minuteKey <= endMinuteKey}
+        if windowCounts:
+            windowed["counts"][message] = windowCounts
+    if windowed["status"] == "complete" and windowed["lastMinuteKey"] is not None and windowed["lastMinuteKey"] > endMinuteKey:
+        windowed["status"] = "stopped"
+    return summarizeScanResult(windowed, regex_patterns)
@@ -0,0 +1,55 @@
+############################################################################################################
+# Description: This file contains the scheduling of the analysis tasks on the pool
+# The pool gets one task at a time, largest first, so the large files are started early and the small
+# ones fill the workers which finish first, instead of one worker analyzing a large file found last while
+# the others are idle. The size of a task is the number of bytes it decompresses and scans, so compressed
+# files which are not indexed are weighted by their uncompressed size from the gzip trailer, or by
+# GZIP_EXPANSION_RATIO if the trailer can't be trusted
+# The default number of workers is the number of CPUs, limited by the available memory per WORKER_MEMORY_MB
+############################################################################################################
+import logging
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+# Estimated ratio of the uncompressed to the compressed size of a gzip compressed log file
+GZIP_EXPANSION_RATIO = 10
+# Estimated memory used by a worker in MB
+WORKER_MEMORY_MB = 256
+
+# Function to estimate the uncompressed size of a gzip compressed file
+# The gzip trailer has the uncompressed size modulo 4 GB, a size smaller than the compressed one means it wrapped
+def getEstimatedUncompressedSize(logFile):
+    compressedSize = os.path.getsize(logFile)
+    try:
+        with open(logFile, "rb") as f:
+            f.seek(-4, os.SEEK_END)
+            uncompressedSize = struct.unpack("<I", f.read(4))[0]
+    except Exception:
+        uncompressedSize = 0
+    if uncompressedSize < compressedSize:
+        return compressedSize * GZIP_EXPANSION_RATIO
+    return uncompressedSize
+
+# Function to get the available memory in MB, None if it is not known
+def getAvailableMemoryMB():
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except Exception:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 1024 // 1024
+    except (ValueError, OSError, AttributeError):
+        return None
+
+# Function to get the default number of workers from the number of CPUs and the available memory
+def getDefaultWorkerCount():
+    numWorkers = os.cpu_count() or 1
+    availableMemoryMB = getAvailableMemoryMB()
+    if availableMemoryMB is not None:
+        numWorkers = min(numWorkers, availableMemoryMB // WORKER_MEMORY_MB)
+    return max(numWorkers, 1)
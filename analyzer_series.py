@@ -0,0 +1,92 @@
+############################################################################################################
+# Description: This file contains the time series of the message counts drawn in the bar chart of the report
+# MinuteSeries adds up the per minute counts of the scan results of all the log files. The counts of each
+# message are kept in an array indexed by the minute offset from the start of the series, the first minute
+# with a match, so the series takes 4 bytes a minute per message found
+# The report carries the series pre-rolled into minutes, 10 minutes, hours and days, so the chart can switch
+# between them without adding up the counts in the browser. Each resolution has, for every message:
+#   [buckets, counts]: the buckets with a count, as the difference from the previous one (the first one from
+#                      the bucket of the start of the series), and their counts
+# A bucket is the minute key divided by the minutes of the resolution, so hours and days start on the clock
+# The resolutions finer than an hour are left out if they have more than MAX_SERIES_POINTS buckets with a count
+############################################################################################################
+from array import array
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Names and minutes of the resolutions of the chart, the hour one is shown first
+RESOLUTIONS = [("Minute", 1), ("10 Minutes", 10), ("Hour", 60), ("Day", 1440)]
+DEFAULT_RESOLUTION = "Hour"
+# Maximum number of buckets with a count of the resolutions finer than an hour, a few MB of report
+MAX_SERIES_POINTS = 250000
+
+class MinuteSeries:
+    def __init__(self):
+        self.startMinuteKey = None
+        self.counts = {}
+
+    # Function to add the counts of a scan result, a dictionary of message and its count per minute key
+    def addCounts(self, counts):
+        for message, minuteCounts in counts.items():
+            if not minuteCounts:
+                continue
+            firstMinuteKey = min(minuteCounts)
+            if self.startMinuteKey is None:
+                self.startMinuteKey = firstMinuteKey
+            elif firstMinuteKey < self.startMinuteKey:
+                self.moveStart(firstMinuteKey)
+            messageCounts = self.counts.get(message)
+            if messageCounts is None:
+                messageCounts = self.counts[message] = array("I")
+            length = max(minuteCounts) - self.startMinuteKey + 1
+            if len(messageCounts) < length:
+                messageCounts.frombytes(bytes(messageCounts.itemsize * (length - len(messageCounts))))
+            for minuteKey, count in minuteCounts.items():
+                messageCounts[minuteKey - self.startMinuteKey] += count
+
+    # Function to move the start of the series to an earlier minute, log files are not added in the order of time
+    def moveStart(self, startMinuteKey):
+        padding = self.startMinuteKey - startMinuteKey
+        for message, messageCounts in self.counts.items():
+            self.counts[message] = array("I", bytes(messageCounts.itemsize * padding)) + messageCounts
+        self.startMinuteKey = startMinuteKey
+
+    # Function to get the minute keys with a count and their counts of each message
+    def getMinuteCounts(self):
+        minuteCounts = {}
+        for message, messageCounts in self.counts.items():
+            minuteCounts[message] = [(self.startMinuteKey + offset, count) for offset, count in enumerate(messageCounts) if count]
+        return minuteCounts
+
+    # Function to get the counts of each message rolled up into buckets of the minutes, as [buckets, counts]
+    def getRolledUpSeries(self, minuteCounts, minutes):
+        startBucket = self.startMinuteKey // minutes
+        series = {}
+        for message, messageMinuteCounts in minuteCounts.items():
+            bucketCounts = {}
+            for minuteKey, count in messageMinuteCounts:
+                bucket = minuteKey // minutes
+                bucketCounts[bucket] = bucketCounts.get(bucket, 0) + count
+            buckets = []
+            previousBucket = startBucket
+            for bucket in bucketCounts:
+                buckets.append(bucket - previousBucket)
+                previousBucket = bucket
+            series[message] = [buckets, list(bucketCounts.values())]
+        return series
+
+    # Function to get the series of all the resolutions for the chart of the report
+    def getJSON(self):
+        if self.startMinuteKey is None:
+            return {"start": 0, "defaultResolution": DEFAULT_RESOLUTION, "resolutions": []}
+        minuteCounts = self.getMinuteCounts()
+        resolutions = []
+        for name, minutes in RESOLUTIONS:
+            series = self.getRolledUpSeries(minuteCounts, minutes)
+            numPoints = sum(len(buckets) for buckets, counts in series.values())
+            if minutes < 60 and numPoints > MAX_SERIES_POINTS:
+                logger.info("Leaving the {} resolution out of the chart, it has {:,} points".format(name, numPoints))
+                continue
+            resolutions.append({"name": name, "minutes": minutes, "series": series})
+        return {"start": self.startMinuteKey, "defaultResolution": DEFAULT_RESOLUTION, "resolutions": resolutions}
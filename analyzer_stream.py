@@ -0,0 +1,55 @@
+############################################################################################################
+# Description: This file contains the helpers to analyze a support bundle without extracting it
+# The members of the tar archive, and of the tar archives nested in it, are read in the order they are
+# stored. Log files are handed to the caller as streams, gzip compressed logs are decompressed on the fly.
+# Only the directories and the metadata files needed for the node details and the GFlags, like instance,
+# server.conf and tablet-meta, are written to the place they would be extracted to
+############################################################################################################
+import gzip
+import logging
+import os
+import shutil
+import tarfile
+
+from analyzer_extract import isArchiveFile
+from analyzer_io import isLogFileName
+
+logger = logging.getLogger(__name__)
+
+# Size of the blocks in MB in which the streamed log files are handed to the workers
+STREAM_BLOCK_SIZE_MB = 16
+
+# Function to check if the member of the archive is needed for the node details or the GFlags
+def isMetadataFile(memberName):
+    fileName = os.path.basename(memberName)
+    return fileName in ["instance", "server.conf"] or "tablet-meta" in memberName.split("/")
+
+# Function to write the current member of the archive to the disk
+def materializeMember(tar, member, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tar.extractfile(member) as source, open(path, "wb") as destination:
+        shutil.copyfileobj(source, destination)
+
+# Function to get the log files in the archive and in the archives nested in it
+# Yields the path the log file would be extracted to and a binary stream of its content. The stream has
+# to be read before asking for the next log file, as the archive is read only once from the start to end
+def iterArchiveLogFiles(archive, destination, fileobj=None):
+    logger.info("Reading file {}".format(archive))
+    with tarfile.open(archive if fileobj is None else None, "r|gz", fileobj=fileobj) as tar:
+        for member in tar:
+            path = os.path.join(destination, member.name)
+            fileName = os.path.basename(member.name)
+            if member.isdir():
+                os.makedirs(path, exist_ok=True)
+            elif not member.isfile():
+                continue
+            elif isArchiveFile(fileName):
+                # Nested archives are extracted next to them
+                yield from iterArchiveLogFiles(path, os.path.dirname(path), tar.extractfile(member))
+            elif isMetadataFile(member.name):
+                materializeMember(tar, member, path)
+            elif isLogFileName(fileName):
+                logs = tar.extractfile(member)
+                if fileName.endswith(".gz"):
+                    logs = gzip.GzipFile(fileobj=logs)
+                yield path, logs
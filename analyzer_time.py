@@ -0,0 +1,138 @@
+############################################################################################################
+# Description: This file contains the helpers to get the time from the log lines
+# Time of a log line is carried as an integer minute key, the number of minutes since 0101 00:00 of 1900,
+# which is the year datetime.strptime uses for the "MMDD HH:MM" format
+# Where:
+#   glog lines look like: I0623 14:45:05.379797  1234 file.cc:12] message
+#   postgres lines look like: 2023-06-23 14:45:05.123 UTC [1234] LOG:  message
+# LogTimeParser reads the minute from fixed offsets of the line and remembers the last parsed prefix, so
+# consecutive lines of the same minute are not parsed again. Lines which are not in the expected format
+# go through the strptime based parsing, which decides the same way getTimeFromLog always did.
+############################################################################################################
+import datetime
+import functools
+
+MINUTE_KEY_EPOCH = datetime.datetime(1900, 1, 1)
+
+# Number of days before each month in a non leap year, like 1900
+daysBeforeMonth = [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334, 365]
+
+# Function to get the time from the log line
+def getTimeFromLog(line,previousTime):
+    timestamp = parseTimeFromLog(line)
+    if timestamp is None:
+        timestamp = datetime.datetime.strptime(previousTime, "%m%d %H:%M")
+    return timestamp
+
+# Function to parse the time from the log line with strptime, None if the line has no time
+def parseTimeFromLog(line):
+    if line[0] in ['I','W','E','F']:
+        try:
+            timeFromLogStr = line.split(" ")[0][1:] + " " + line.split(" ")[1][:5]
+            return datetime.datetime.strptime(timeFromLogStr, "%m%d %H:%M")
+        except Exception as e:
+            return None
+    else:
+        try:
+            timeFromLogStr = line.split(" ")[0] + " " + line.split(" ")[1]
+            timestamp = datetime.datetime.strptime(timeFromLogStr, "%Y-%m-%d %H:%M:%S.%f")
+            timestamp = timestamp.strftime("%m%d %H:%M")
+            return datetime.datetime.strptime(timestamp, "%m%d %H:%M")
+        except Exception as e:
+            return None
+
+# Function to check if the log line, in bytes, starts with a time
+def isLineWithTime(line):
+    return parseTimeFromLog(line.decode(errors="replace")) is not None
+
+# Function to convert a datetime to minute key
+def datetimeToMinuteKey(timestamp):
+    return int((timestamp - MINUTE_KEY_EPOCH).total_seconds() // 60)
+
+# Function to convert "MMDD HH:MM" to minute key
+def timeToMinuteKey(time):
+    return datetimeToMinuteKey(datetime.datetime.strptime(time, "%m%d %H:%M"))
+
+# Function to convert a minute key to "MMDD HH:MM"
+@functools.lru_cache(maxsize=65536)
+def minuteKeyToTime(minuteKey):
+    return (MINUTE_KEY_EPOCH + datetime.timedelta(minutes=minuteKey)).strftime("%m%d %H:%M")
+
+# Function to check that all the characters are ASCII digits
+def isDigits(text):
+    return text.isdigit() and text.isascii()
+
+# Function to get the minute key from month, day, hour and minute, None if they are out of range
+def getMinuteKey(month, day, hour, minute):
+    if not 1 <= month <= 12 or not 1 <= day <= daysBeforeMonth[month] - daysBeforeMonth[month - 1]:
+        return None
+    if hour > 23 or minute > 59:
+        return None
+    return ((daysBeforeMonth[month - 1] + day - 1) * 24 + hour) * 60 + minute
+
+# Function to parse "MMDD HH:MM"
+def parseGlogPrefix(prefix):
+    if len(prefix) != 10 or prefix[4] != " " or prefix[7] != ":":
+        return None
+    if not isDigits(prefix[0:4]) or not isDigits(prefix[5:7]) or not isDigits(prefix[8:10]):
+        return None
+    return getMinuteKey(int(prefix[0:2]), int(prefix[2:4]), int(prefix[5:7]), int(prefix[8:10]))
+
+# Function to parse "YYYY-MM-DD HH:MM"
+def parsePostgresPrefix(prefix):
+    if len(prefix) != 16 or prefix[4] != "-" or prefix[7] != "-" or prefix[10] != " " or prefix[13] != ":":
+        return None
+    if not isDigits(prefix[0:4]) or not isDigits(prefix[5:7]) or not isDigits(prefix[8:10]) or not isDigits(prefix[11:13]) or not isDigits(prefix[14:16]):
+        return None
+    if int(prefix[0:4]) == 0:
+        return None
+    return getMinuteKey(int(prefix[5:7]), int(prefix[8:10]), int(prefix[11:13]), int(prefix[14:16]))
+
+# Function to check the ":SS.ffffff " part of a postgres line which follows the minute
+def isPostgresSeconds(line):
+    if line[16:17] != ":" or line[19:20] != "." or not isDigits(line[17:19]) or int(line[17:19]) > 59:
+        return False
+    end = line.find(" ", 20)
+    return 21 <= end <= 26 and isDigits(line[20:end])
+
+class LogTimeParser:
+    def __init__(self, defaultMinuteKey=0):
+        # Lines without time, like the continuation lines of a multi line message, get the time of the last line with time
+        self.previousMinuteKey = defaultMinuteKey
+        self.lastGlogPrefix = None
+        self.lastGlogMinuteKey = None
+        self.lastPostgresPrefix = None
+        self.lastPostgresMinuteKey = None
+
+    # Function to get the minute key of the log line
+    def getMinuteKey(self, line):
+        if line[0] in "IWEF":
+            prefix = line[1:11]
+            if prefix == self.lastGlogPrefix:
+                self.previousMinuteKey = self.lastGlogMinuteKey
+                return self.previousMinuteKey
+            minuteKey = parseGlogPrefix(prefix)
+            if minuteKey is not None:
+                self.lastGlogPrefix = prefix
+                self.lastGlogMinuteKey = minuteKey
+                self.previousMinuteKey = minuteKey
+                return minuteKey
+        else:
+            prefix = line[:16]
+            if prefix == self.lastPostgresPrefix and isPostgresSeconds(line):
+                self.previousMinuteKey = self.lastPostgresMinuteKey
+                return self.previousMinuteKey
+            minuteKey = parsePostgresPrefix(prefix)
+            if minuteKey is not None and isPostgresSeconds(line):
+                self.lastPostgresPrefix = prefix
+                self.lastPostgresMinuteKey = minuteKey
+                self.previousMinuteKey = minuteKey
+                return minuteKey
+        # strptime can't find a month or a year in the line if it doesn't start with a digit
+        if not line[1 if line[0] in "IWEF" else 0:][:1].isdigit():
+            return self.previousMinuteKey
+        # Line is not in the expected format, let strptime decide
+        timestamp = parseTimeFromLog(line)
+        if timestamp is not None:
+            self.previousMinuteKey = datetimeToMinuteKey(timestamp)
+        return self.previousMinuteKey
@@ -0,0 +1,166 @@
+############################################################################################################
+# Description: This file contains the cross node timeline of the messages
+# NodeTimeline keeps the per minute counts of the log files of each node in a MinuteSeries, the node of a log
+# file is the node whose directory in the bundle it is in. The counts of a node are read as a stream of
+#   (minuteKey, node, count of each message in the minute)
+# in the order of time, gathered from the counts of its messages a day at a time, and the streams of all the
+# nodes are merged with a k-way heap merge into one stream in the order of time. The merged stream is grouped by minute and only
+# the MAX_TIMELINE_ROWS minutes with messages on the most nodes are kept, so the timeline takes bounded memory
+# however long the time range is. Minutes with messages on one node only are not part of the timeline
+# The heatmap has the number of messages of each node per bucket of time, the buckets are the finest
+# resolution of the chart with at most MAX_HEATMAP_COLUMNS buckets
+############################################################################################################
+import heapq
+import html
+import itertools
+import os
+
+import tabulate
+
+from analyzer_series import MinuteSeries, RESOLUTIONS
+from analyzer_time import minuteKeyToTime
+
+# Number of minutes in the timeline
+MAX_TIMELINE_ROWS = 200
+# Number of buckets of time in the heatmap
+MAX_HEATMAP_COLUMNS = 96
+# Number of messages of a node shown in a minute of the timeline, the most frequent ones
+MAX_TIMELINE_MESSAGES = 5
+# Number of minutes of the counts of a node gathered at a time for its stream
+NODE_STREAM_CHUNK_MINUTES = 1440
+
+# Function to get the node of a log file, from the node directories of the bundle
+# The longest directory which has the log file wins, so a node named like the prefix of another one is found right
+def getLogFileNode(logFile, nodeDirectories):
+    logFilePath = os.path.abspath(logFile)
+    node = None
+    nodeDirectoryLength = 0
+    for name, nodeDirectory in nodeDirectories.items():
+        nodeDirectory = os.path.abspath(nodeDirectory) + os.sep
+        if logFilePath.startswith(nodeDirectory) and len(nodeDirectory) > nodeDirectoryLength:
+            node = name
+            nodeDirectoryLength = len(nodeDirectory)
+    return node
+
+class NodeTimeline:
+    def __init__(self):
+        self.nodeSeries = {}
+
+    # Function to add the counts of a scan result of a log file of the node
+    def addCounts(self, node, counts):
+        if not counts:
+            return
+        if node not in self.nodeSeries:
+            self.nodeSeries[node] = MinuteSeries()
+        self.nodeSeries[node].addCounts(counts)
+
+    # Function to get the stream of the counts of a node in the order of time, one entry per minute with messages
+    def getNodeStream(self, node):
+        series = self.nodeSeries[node]
+        length = max(map(len, series.counts.values()))
+        for chunkStart in range(0, length, NODE_STREAM_CHUNK_MINUTES):
+            minuteCounts = {}
+            for message, messageCounts in series.counts.items():
+                chunk = messageCounts[chunkStart:chunkStart + NODE_STREAM_CHUNK_MINUTES]
+                for offset, count in zip(itertools.compress(itertools.count(chunkStart), chunk), filter(None, chunk)):
+                    minuteCounts.setdefault(offset, {})[message] = count
+            for offset in sorted(minuteCounts):
+                yield series.startMinuteKey + offset, node, minuteCounts[offset]
+
+    # Function to get the counts of all the nodes in the order of time
+    def getMergedStream(self):
+        return heapq.merge(*[self.getNodeStream(node) for node in sorted(self.nodeSeries)])
+
+    # Function to get the timeline rows, the minutes with messages on more than one node in the order of time
+    # Each row is the minute key and the counts of each node's messages in that minute
+    def getTimeline(self, limit=MAX_TIMELINE_ROWS):
+        minutes = []
+        for minuteKey, minuteEvents in itertools.groupby(self.getMergedStream(), key=lambda event: event[0]):
+            nodeCounts = {}
+            for eventMinuteKey, node, messageCounts in minuteEvents:
+                nodeCounts[node] = messageCounts
+            if len(nodeCounts) > 1:
+                minutes.append((getTimelineScore(nodeCounts), minuteKey, nodeCounts))
+                # Keep the minutes on the most nodes with the most messages, without keeping every minute
+                if len(minutes) > 2 * limit:
+                    minutes = heapq.nlargest(limit, minutes, key=lambda minute: minute[0])
+        return sorted((minuteKey, nodeCounts) for score, minuteKey, nodeCounts in heapq.nlargest(limit, minutes, key=lambda minute: minute[0]))
+
+    # Function to get the minutes of a heatmap bucket, the finest resolution which covers the time range in the columns
+    def getHeatmapMinutes(self):
+        startMinuteKey = min(series.startMinuteKey for series in self.nodeSeries.values())
+        endMinuteKey = max(series.startMinuteKey + max(map(len, series.counts.values())) for series in self.nodeSeries.values())
+        for name, minutes in RESOLUTIONS:
+            if endMinuteKey // minutes - startMinuteKey // minutes < MAX_HEATMAP_COLUMNS:
+                return minutes
+        return RESOLUTIONS[-1][1]
+
+    # Function to get the heatmap, the buckets and the number of messages of each node per bucket
+    def getHeatmap(self):
+        minutes = self.getHeatmapMinutes()
+        nodeBucketCounts = {}
+        for node, series in self.nodeSeries.items():
+            bucketCounts = nodeBucketCounts[node] = {}
+            for messageCounts in series.counts.values():
+                minuteKeys = itertools.compress(itertools.count(series.startMinuteKey), messageCounts)
+                for minuteKey, count in zip(minuteKeys, filter(None, messageCounts)):
+                    bucket = minuteKey // minutes * minutes
+                    bucketCounts[bucket] = bucketCounts.get(bucket, 0) + count
+        buckets = list(range(min(min(counts) for counts in nodeBucketCounts.values()), max(max(counts) for counts in nodeBucketCounts.values()) + 1, minutes))
+        return minutes, buckets, nodeBucketCounts
+
+    # Function to check if the timeline has more than one node to correlate
+    def isCrossNode(self):
+        return len(self.nodeSeries) > 1
+
+# Function to get the score of a timeline minute, the number of nodes and then the number of messages
+def getTimelineScore(nodeCounts):
+    return len(nodeCounts), sum(sum(counts.values()) for counts in nodeCounts.values())
+
+# Function to get the text of the most frequent messages of a node in a minute
+def getNodeMinuteMessages(counts):
+    messages = ["{} ({})".format(message, count) for message, count in heapq.nlargest(MAX_TIMELINE_MESSAGES, counts.items(), key=lambda item: item[1])]
+    if len(counts) > MAX_TIMELINE_MESSAGES:
+        messages.append("and {} more messages".format(len(counts) - MAX_TIMELINE_MESSAGES))
+    return messages
+
+# Function to get the timeline and the heatmap as HTML
+def getTimelineHTML(timeline):
+    nodes = sorted(timeline.nodeSeries)
+    content = "<h2 id=timeline> Cross Node Timeline </h2>"
+    content += "<p> Minutes with messages on more than one node, the {} with messages on the most nodes </p>".format(MAX_TIMELINE_ROWS)
+    content += "<div style='overflow-x: auto'><table class='sortable' id='timeline-table'><tr><th>Time</th>"
+    content += "".join("<th>" + html.escape(node) + "</th>" for node in nodes) + "</tr>"
+    for minuteKey, nodeCounts in timeline.getTimeline():
+        content += "<tr><td>" + minuteKeyToTime(minuteKey) + "</td>"
+        for node in nodes:
+            content += "<td>" + "<br>".join(html.escape(message) for message in getNodeMinuteMessages(nodeCounts.get(node, {}))) + "</td>"
+        content += "</tr>"
+    content += "</table></div>"
+    minutes, buckets, nodeBucketCounts = timeline.getHeatmap()
+    resolution = dict((bucketMinutes, name) for name, bucketMinutes in RESOLUTIONS)[minutes]
+    maxCount = max(max(counts.values()) for counts in nodeBucketCounts.values())
+    content += "<h2 id=heatmap> Node Heatmap </h2>"
+    content += "<p> Number of messages of each node per {}, darker is more. Hover over a cell for its time and count </p>".format(resolution.lower())
+    content += "<div style='overflow-x: auto'><table id='heatmap-table' style='border-collapse: collapse'><tr><th>Node</th>"
+    content += "<th colspan={}>{} to {}</th></tr>".format(len(buckets), minuteKeyToTime(buckets[0]), minuteKeyToTime(buckets[-1] + minutes - 1))
+    for node in nodes:
+        content += "<tr><td>" + html.escape(node) + "</td>"
+        counts = nodeBucketCounts.get(node, {})
+        for bucket in buckets:
+            count = counts.get(bucket, 0)
+            content += "<td title='{}: {} messages' style='min-width: 8px; padding: 0; background-color: rgba(200, 0, 0, {:.2f})'></td>".format(minuteKeyToTime(bucket), count, count / maxCount)
+        content += "</tr>"
+    content += "</table></div>"
+    return content
+
+# Function to get the timeline as markdown
+def getTimelineMarkdown(timeline):
+    nodes = sorted(timeline.nodeSeries)
+    table = []
+    for minuteKey, nodeCounts in timeline.getTimeline():
+        table.append([minuteKeyToTime(minuteKey)] + ["\n".join(getNodeMinuteMessages(nodeCounts.get(node, {}))) for node in nodes])
+    content = "\n\n\n# Cross Node Timeline\n\n"
+    content += "Minutes with messages on more than one node, the {} with messages on the most nodes\n\n".format(MAX_TIMELINE_ROWS)
+    content += tabulate.tabulate(table, headers=["Time"] + nodes, tablefmt="simple_grid") + "\n"
+    return content
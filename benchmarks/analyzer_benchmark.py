@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# Benchmark of the analysis stages on a synthetic support bundle
+# Writes reproducible glog format master/tserver logs and postgres logs with the messages of universe_regex_patterns
+# and pg_regex_patterns planted in them, tars the bundle, then times extraction, discovery, time skip, scanning and
+# rendering separately. The results are printed as JSON so runs can be compared
+# Usage: python benchmarks/analyzer_benchmark.py [-s MB] [--density FRACTION] [--span HOURS] [--compression plain|gz|both] [-o FILE]
+import argparse
+import datetime
+import gzip
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analyzer_dict import universe_regex_patterns, pg_regex_patterns
+from analyzer_extract import extractAllTarFiles
+from analyzer_gzip import getGzipIndexes, getGzipStartOffset
+from analyzer_inventory import BundleInventory
+from analyzer_regex import getSampleMessage
+from analyzer_report import getResultsTable, getResultsHTML
+from analyzer_scan import scanLogFile, findStartOffset
+from analyzer_time import timeToMinuteKey
+
+parser = argparse.ArgumentParser(description="Benchmark the analysis stages on a synthetic support bundle")
+parser.add_argument("-n", "--nodes", dest="numNodes", default=3, type=int, help="Number of nodes in the bundle")
+parser.add_argument("-s", "--size", metavar="MB", dest="sizeMB", default=16, type=int, help="Size of the logs of each master, tserver and postgres in MB")
+parser.add_argument("--density", metavar="FRACTION", default=0.01, type=float, help="Fraction of the lines with a planted message")
+parser.add_argument("--span", metavar="HOURS", default=24, type=int, help="Time span of the logs in hours")
+parser.add_argument("--compression", choices=["plain", "gz", "both"], default="both", help="Write plain logs, gzip compressed logs, or the first half of the time span compressed")
+parser.add_argument("--seed", default=42, type=int, help="Seed of the generator, the same seed writes the same bundle")
+parser.add_argument("-p", "--parallel", metavar="N", dest="numThreads", default=os.cpu_count() or 1, type=int, help="Number of workers")
+parser.add_argument("-d", "--directory", help="Directory to write the bundle in, a temporary directory is used and removed by default")
+parser.add_argument("-o", "--output", metavar="FILE", help="Write the JSON results to FILE instead of the standard output")
+args = parser.parse_args()
+
+START_TIME = datetime.datetime(2023, 6, 23)
+FILLER_MESSAGES = [
+    "tablet_service.cc:{}] Processing write request for tablet {}",
+    "consensus_queue.cc:{}] T {} P 1234abcd: Leader lease check passed",
+    "log.cc:{}] T {} P 1234abcd: Max segment size reached. Starting new segment allocation",
+    "maintenance_manager.cc:{}] Scheduling FlushMRSOp(tablet {}): perf score=0.014",
+]
+PG_FILLER_MESSAGES = [
+    "LOG:  statement: SELECT * FROM orders WHERE id = {} AND shard = {}",
+    "LOG:  duration: {}.{} ms",
+    "LOG:  connection received: host=10.0.{}.{} port=5433",
+]
+
+# Function to write a log file with lines from startTime to endTime, every density fraction of the lines is a planted message
+def writeLogFile(logFile, sizeBytes, startTime, endTime, plantedMessages, isPostgres, generator):
+    opener = gzip.open if logFile.endswith(".gz") else open
+    written = 0
+    lines = 0
+    with opener(logFile, "wt") as logs:
+        # Lines are written till sizeBytes, their time is spread over the span based on the bytes written
+        while written < sizeBytes:
+            timestamp = startTime + (endTime - startTime) * written / sizeBytes
+            if generator.random() < args.density:
+                message = generator.choice(plantedMessages)
+            else:
+                message = generator.choice(PG_FILLER_MESSAGES if isPostgres else FILLER_MESSAGES).format(generator.randint(1, 999), generator.randint(1, 99999))
+            if isPostgres:
+                line = "{} UTC [{}] {}\n".format(timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3], generator.randint(1000, 9999), message)
+            else:
+                line = "{}{} {:>6} {}\n".format(generator.choice("IIIW"), timestamp.strftime("%m%d %H:%M:%S.%f"), generator.randint(1000, 9999), message)
+            logs.write(line)
+            written += len(line)
+            lines += 1
+    return lines
+
+# Function to write the synthetic bundle, returns the number of lines of the logs
+def writeBundle(bundleDirectory):
+    generator = random.Random(args.seed)
+    universeMessages = ["{}] {}".format("benchmark.cc:1", getSampleMessage(pattern)) for pattern in universe_regex_patterns.values()]
+    pgMessages = ["ERROR:  " + getSampleMessage(pattern) for pattern in pg_regex_patterns.values()]
+    endTime = START_TIME + datetime.timedelta(hours=args.span)
+    middleTime = START_TIME + (endTime - START_TIME) / 2
+    sizeBytes = args.sizeMB * 1024 * 1024
+    if args.compression == "both":
+        parts = [(START_TIME, middleTime, ".gz", sizeBytes // 2), (middleTime, endTime, "", sizeBytes - sizeBytes // 2)]
+    else:
+        parts = [(START_TIME, endTime, ".gz" if args.compression == "gz" else "", sizeBytes)]
+    totalLines = 0
+    for node in range(1, args.numNodes + 1):
+        nodeName = "yb-bench-n{}".format(node)
+        for server in ["master", "tserver"]:
+            logDirectory = os.path.join(bundleDirectory, nodeName, server, "logs")
+            os.makedirs(logDirectory)
+            for partStart, partEnd, suffix, partSize in parts:
+                logFile = "yb-{}.{}.yugabyte.log.INFO.{}.{}{}".format(server, nodeName, partStart.strftime("%Y%m%d-%H%M%S"), node, suffix)
+                totalLines += writeLogFile(os.path.join(logDirectory, logFile), partSize, partStart, partEnd, universeMessages, False, generator)
+                if server == "tserver":
+                    logFile = "postgresql-{}{}".format(partStart.strftime("%Y-%m-%d_%H%M%S.log"), suffix)
+                    totalLines += writeLogFile(os.path.join(logDirectory, logFile), partSize, partStart, partEnd, pgMessages, True, generator)
+    return totalLines
+
+# Function to get the regex patterns of the log file
+def getRegexPatterns(logFile):
+    return pg_regex_patterns if "postgresql" in logFile else universe_regex_patterns
+
+# Function to render the scan results as the HTML tables of the report, with the functions of the report writer
+def renderScanResults(scanResults):
+    content = ""
+    for scanResult in scanResults:
+        table = getResultsTable(scanResult["results"])
+        if table:
+            content += getResultsHTML(scanResult["logFile"], table)
+    return content
+
+# Function to run the function and add its time to the stages
+def timeStage(stages, name, function, *arguments):
+    startedAt = time.perf_counter()
+    result = function(*arguments)
+    stages[name] = round(time.perf_counter() - startedAt, 3)
+    return result
+
+workDirectory = args.directory or tempfile.mkdtemp(prefix="yb-log-analyzer-benchmark-")
+try:
+    stages = {}
+    sourceDirectory = os.path.join(workDirectory, "source")
+    bundleDirectory = os.path.join(workDirectory, "bundle")
+    os.makedirs(sourceDirectory)
+    os.makedirs(bundleDirectory)
+    generatedLines = timeStage(stages, "generate", writeBundle, os.path.join(sourceDirectory, "yb-support-bundle-benchmark"))
+    bundleFile = os.path.join(bundleDirectory, "yb-support-bundle-benchmark.tar.gz")
+    with tarfile.open(bundleFile, "w:gz") as tar:
+        tar.add(os.path.join(sourceDirectory, "yb-support-bundle-benchmark"), arcname="yb-support-bundle-benchmark")
+    shutil.rmtree(sourceDirectory)
+
+    with Pool(processes=args.numThreads) as pool:
+        timeStage(stages, "extraction", extractAllTarFiles, [bundleFile], args.numThreads)
+        inventory = timeStage(stages, "discovery", BundleInventory, [bundleDirectory])
+        logFiles = sorted(inventory.logFiles)
+        # Analyze the second half of the time span, so the time skip has lines to skip
+        # Log lines have no year, so the minute keys are from the month, day and time
+        startMinuteKey = timeToMinuteKey((START_TIME + datetime.timedelta(hours=args.span) / 2).strftime("%m%d %H:%M"))
+        endMinuteKey = timeToMinuteKey((START_TIME + datetime.timedelta(hours=args.span)).strftime("%m%d %H:%M"))
+        def findStartOffsets():
+            gzipIndexes = getGzipIndexes(logFiles, None, pool)
+            startOffsets = {}
+            for logFile in logFiles:
+                if logFile.endswith(".gz"):
+                    startOffsets[logFile] = getGzipStartOffset(gzipIndexes[logFile], startMinuteKey) if logFile in gzipIndexes else 0
+                else:
+                    startOffsets[logFile] = findStartOffset(logFile, startMinuteKey)
+            return startOffsets
+        startOffsets = timeStage(stages, "timeSkip", findStartOffsets)
+        tasks = [(logFile, getRegexPatterns(logFile), startMinuteKey, endMinuteKey, startOffsets[logFile]) for logFile in logFiles]
+        scanResults = timeStage(stages, "scanning", pool.starmap, scanLogFile, tasks, 1)
+    report = timeStage(stages, "rendering", renderScanResults, scanResults)
+
+    linesRead = sum(scanResult["linesRead"] for scanResult in scanResults)
+    bytesRead = sum(scanResult["bytesRead"] for scanResult in scanResults)
+    # ru_maxrss is in KB on Linux
+    results = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("directory", "output")},
+        "generatedLines": generatedLines,
+        "logFiles": len(logFiles),
+        "stages": stages,
+        "scanning": {
+            "lines": linesRead,
+            "MB": round(bytesRead / 1024 / 1024, 1),
+            "linesPerSecond": round(linesRead / max(stages["scanning"], 0.001)),
+            "MBPerSecond": round(bytesRead / 1024 / 1024 / max(stages["scanning"], 0.001), 1),
+            "matches": sum(sum(scanResult["messageCounts"].values()) for scanResult in scanResults),
+            "unreadableFiles": sum(1 for scanResult in scanResults if scanResult["status"] == "unreadable"),
+        },
+        "reportBytes": len(report),
+        "peakRSSMB": {
+            "main": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "workers": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        },
+    }
+finally:
+    if not args.directory:
+        shutil.rmtree(workDirectory, ignore_errors=True)
+
+output = json.dumps(results, indent=2)
+if args.output:
+    with open(args.output, "w") as f:
+        f.write(output + "\n")
+else:
+    print(output)
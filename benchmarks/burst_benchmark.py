@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# Benchmark of the burst detection on synthetic per minute counts
+# Fills the MinuteSeries of every node with Poisson counts of every message of universe_regex_patterns and
+# pg_regex_patterns, plants bursts of a few messages on a few nodes, then times the detection of the bursts and
+# the ranking of the incident windows. The results are printed as JSON, with the planted bursts that were found
+# Usage: python benchmarks/burst_benchmark.py [-n NODES] [--days DAYS] [--bursts N] [-o FILE]
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy
+from analyzer_dict import universe_regex_patterns, pg_regex_patterns
+from analyzer_bursts import detectBursts, getIncidentWindows
+from analyzer_series import MinuteSeries
+from analyzer_time import timeToMinuteKey
+
+parser = argparse.ArgumentParser(description="Benchmark the burst detection on synthetic per minute counts")
+parser.add_argument("-n", "--nodes", dest="numNodes", default=30, type=int, help="Number of nodes")
+parser.add_argument("--days", default=7, type=int, help="Number of days of counts")
+parser.add_argument("--rate", default=1.0, type=float, help="Largest mean count per minute of a message")
+parser.add_argument("--bursts", dest="numBursts", default=5, type=int, help="Number of bursts to plant")
+parser.add_argument("--seed", default=42, type=int, help="Seed of the generator")
+parser.add_argument("-o", "--output", metavar="FILE", help="Write the JSON results to FILE instead of the standard output")
+args = parser.parse_args()
+
+generator = numpy.random.default_rng(args.seed)
+messages = list(universe_regex_patterns) + list(pg_regex_patterns)
+numMinutes = args.days * 1440
+startMinuteKey = timeToMinuteKey("0623 00:00")
+nodes = ["yb-bench-n{}".format(node) for node in range(1, args.numNodes + 1)]
+# A burst is a message on a few nodes for a few minutes, at 50 times the largest mean count
+plantedBursts = []
+for burst in range(args.numBursts):
+    plantedBursts.append({
+        "minuteKey": startMinuteKey + int(generator.integers(120, numMinutes - 10)),
+        "message": messages[int(generator.integers(len(messages)))],
+        "nodes": sorted(set(generator.choice(nodes, size=min(3, len(nodes))).tolist())),
+    })
+
+nodeSeries = {}
+for node in nodes:
+    nodeSeries[node] = series = MinuteSeries()
+    series.startMinuteKey = startMinuteKey
+    for message in messages:
+        counts = generator.poisson(generator.uniform(0, args.rate), numMinutes).astype(numpy.uint32)
+        for burst in plantedBursts:
+            if burst["message"] == message and node in burst["nodes"]:
+                offset = burst["minuteKey"] - startMinuteKey
+                counts[offset:offset + 3] += int(50 * max(args.rate, 1))
+        # The detection reads the counts as buffers, so NumPy arrays can stand in for the arrays of a MinuteSeries
+        series.counts[message] = counts
+
+startedAt = time.perf_counter()
+rows, bursts = detectBursts(nodeSeries)
+detectionSeconds = time.perf_counter() - startedAt
+startedAt = time.perf_counter()
+windows = getIncidentWindows(rows, bursts)
+rankingSeconds = time.perf_counter() - startedAt
+
+found = 0
+for burst in plantedBursts:
+    if any(window["startMinuteKey"] <= burst["minuteKey"] <= window["endMinuteKey"] and any(message == burst["message"] for message, excess, windowNodes in window["messages"]) for window in windows):
+        found += 1
+results = {
+    "config": {key: value for key, value in vars(args).items() if key != "output"},
+    "series": len(rows),
+    "cells": len(rows) * numMinutes,
+    "seconds": {"detection": round(detectionSeconds, 4), "ranking": round(rankingSeconds, 4)},
+    "bursts": 0 if bursts is None else len(bursts[0]),
+    "incidentWindows": len(windows),
+    "plantedBurstsFound": "{}/{}".format(found, len(plantedBursts)),
+}
+
+output = json.dumps(results, indent=2)
+if args.output:
+    with open(args.output, "w") as f:
+        f.write(output + "\n")
+else:
+    print(output)
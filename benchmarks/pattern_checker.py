@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# Checker of the cost of the regex patterns in analyzer_dict.py
+# Benchmarks every pattern of universe_regex_patterns and pg_regex_patterns against a corpus of log lines and
+# flags the patterns which:
+#   have a construct with backtracking risk, like nested quantifiers or several .* in a row
+#   take more than quadratic time on a long line which almost matches the pattern. Search tries the pattern at
+#   every start of a partial match and a .* runs to the end of the line from there, so a pattern with a .* is
+#   already quadratic on such a line. A higher exponent means the pattern backtracks into itself
+#   cost more per line than --outlier_factor times the median pattern
+# The corpus is read from the log files given with -l, plain or gzip compressed. Without log files a synthetic
+# corpus of glog and postgres lines with every message planted in it is used
+# Exits with 1 if a pattern is flagged, so it can be run on a new pattern before it's added to analyzer_dict.py
+# Usage: python benchmarks/pattern_checker.py [-l LOG_FILE ...] [-n LINES]
+import argparse
+import gzip
+import math
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tabulate
+from analyzer_dict import universe_regex_patterns, pg_regex_patterns
+from analyzer_regex import getSampleMessage, getBacktrackingRisks
+
+parser = argparse.ArgumentParser(description="Benchmark the regex patterns and flag the expensive ones")
+parser.add_argument("-l", "--log_files", nargs="+", default=[], help="Log files to use as the corpus")
+parser.add_argument("-n", "--lines", dest="numLines", default=100000, type=int, help="Number of corpus lines, per log file with -l")
+parser.add_argument("--outlier_factor", default=10, type=float, help="Flag patterns which cost more per line than this many times the median pattern")
+parser.add_argument("--max_exponent", default=2.5, type=float, help="Flag patterns whose time grows faster than the line length to this power")
+args = parser.parse_args()
+
+# Lengths of the lines the scaling of the time is measured on
+SHORT_LINE_LENGTH = 1000
+LONG_LINE_LENGTH = 16000
+
+# Function to read the corpus lines of the log files
+def readCorpus(logFiles, numLines):
+    lines = []
+    for logFile in logFiles:
+        opener = gzip.open if logFile.endswith(".gz") else open
+        with opener(logFile, "rt", errors="replace") as logs:
+            for lineNumber, line in enumerate(logs):
+                if lineNumber >= numLines:
+                    break
+                lines.append(line)
+    return lines
+
+# Function to generate a corpus of glog and postgres lines, one in a hundred lines is a planted message
+def generateCorpus(numLines):
+    generator = random.Random(42)
+    messages = [getSampleMessage(pattern) for pattern in list(universe_regex_patterns.values()) + list(pg_regex_patterns.values())]
+    lines = []
+    for i in range(numLines):
+        if generator.random() < 0.01:
+            message = generator.choice(messages)
+        else:
+            message = "tablet_service.cc:{}] Processing write request for tablet {}".format(generator.randint(1, 999), generator.randint(1, 99999))
+        if i % 5 == 0:
+            lines.append("2023-06-23 14:45:{:02d}.123 UTC [1234] LOG:  {}\n".format(i % 60, message))
+        else:
+            lines.append("I0623 14:45:{:02d}.123456  1234 {}\n".format(i % 60, message))
+    return lines
+
+# Function to time the search of the compiled pattern in the lines, returns the seconds and the number of matches
+def timeSearch(compiled, lines):
+    search = compiled.search
+    startedAt = time.perf_counter()
+    matches = sum(1 for line in lines if search(line))
+    return time.perf_counter() - startedAt, matches
+
+# Function to get the exponent of the growth of the search time with the length of a line which almost matches
+# The line repeats the sample message without its last character, so every repeat is a partial match
+def getScalingExponent(compiled, pattern):
+    sample = getSampleMessage(pattern)[:-1] or "x"
+    times = []
+    for length in [SHORT_LINE_LENGTH, LONG_LINE_LENGTH]:
+        line = (sample + " ") * (length // (len(sample) + 1) + 1)
+        repeats = max(1, 20 * SHORT_LINE_LENGTH // length)
+        startedAt = time.perf_counter()
+        for i in range(repeats):
+            compiled.search(line)
+        times.append(max((time.perf_counter() - startedAt) / repeats, 0.0000001))
+    return math.log(times[1] / times[0]) / math.log(LONG_LINE_LENGTH / SHORT_LINE_LENGTH)
+
+corpus = readCorpus(args.log_files, args.numLines) if args.log_files else generateCorpus(args.numLines)
+print("Corpus: {} lines from {}".format(len(corpus), ", ".join(args.log_files) if args.log_files else "the synthetic generator"))
+numFlagged = 0
+for name, regex_patterns in [("universe_regex_patterns", universe_regex_patterns), ("pg_regex_patterns", pg_regex_patterns)]:
+    rows = []
+    for message, pattern in regex_patterns.items():
+        # Patterns are searched case insensitively, as the analyzer does
+        compiled = re.compile(pattern, re.IGNORECASE)
+        seconds, matches = timeSearch(compiled, corpus)
+        rows.append([message, matches, seconds * 1000000 / max(len(corpus), 1), getScalingExponent(compiled, pattern), getBacktrackingRisks(pattern)])
+    medianCost = statistics.median(row[2] for row in rows) if rows else 0
+    table = []
+    for message, matches, costPerLine, exponent, risks in sorted(rows, key=lambda row: row[2], reverse=True):
+        flags = list(risks)
+        if exponent > args.max_exponent:
+            flags.append("time grows with n^{:.1f}".format(exponent))
+        if medianCost and costPerLine > args.outlier_factor * medianCost:
+            flags.append("{:.0f}x the median cost".format(costPerLine / medianCost))
+        if flags:
+            numFlagged += 1
+        table.append([message, matches, round(costPerLine, 3), round(exponent, 2), ", ".join(flags)])
+    print("\n" + name)
+    print(tabulate.tabulate(table, headers=["Message", "Matches", "Microseconds per Line", "Scaling Exponent", "Flags"]))
+if numFlagged:
+    print("\n{} patterns flagged".format(numFlagged))
+    exit(1)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# Microbenchmark of getTimeFromLog against LogTimeParser
+# Usage: python benchmarks/timestamp_benchmark.py [-n NUMBER_OF_LINES]
+import argparse
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analyzer_time import getTimeFromLog, LogTimeParser, datetimeToMinuteKey
+
+parser = argparse.ArgumentParser(description="Compare getTimeFromLog with LogTimeParser")
+parser.add_argument("-n", "--lines", dest="numLines", default=200000, type=int, help="Number of log lines of each format")
+args = parser.parse_args()
+
+# Function to generate glog and postgres lines, about 1000 lines per minute
+def generateLines(numLines):
+    start = datetime.datetime(2023, 6, 23, 14, 45)
+    glogLines = []
+    postgresLines = []
+    for i in range(numLines):
+        timestamp = start + datetime.timedelta(milliseconds=60 * i)
+        glogLines.append("{}{} 1234 tablet_service.cc:123] Rejecting Write request: Soft memory limit exceeded\n".format("IWEF"[i % 4], timestamp.strftime("%m%d %H:%M:%S.%f")))
+        postgresLines.append("{} UTC [1234] LOG:  statement: select {}\n".format(timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3], i))
+    return glogLines, postgresLines
+
+# Function to time a function over the lines
+def timeIt(function, lines):
+    startedAt = time.perf_counter()
+    results = [function(line) for line in lines]
+    return time.perf_counter() - startedAt, results
+
+glogLines, postgresLines = generateLines(args.numLines)
+print("{:<10} {:>16} {:>16} {:>10}".format("Format", "getTimeFromLog/s", "LogTimeParser/s", "Speedup"))
+for name, lines in [("glog", glogLines), ("postgres", postgresLines)]:
+    oldTime, oldResults = timeIt(lambda line: getTimeFromLog(line, '0101 00:00'), lines)
+    timeParser = LogTimeParser()
+    newTime, newResults = timeIt(timeParser.getMinuteKey, lines)
+    if [datetimeToMinuteKey(timestamp) for timestamp in oldResults] != newResults:
+        print("LogTimeParser doesn't agree with getTimeFromLog for {} lines".format(name))
+        exit(1)
+    print("{:<10} {:>16,.0f} {:>16,.0f} {:>9.1f}x".format(name, len(lines) / oldTime, len(lines) / newTime, oldTime / newTime))
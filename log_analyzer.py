@@ -1,18 +1,37 @@
 #!/usr/bin/env python3
-from multiprocessing import Pool, Lock
+from multiprocessing import Pool
 from colorama import Fore, Style
-from analyzer_dict import universe_regex_patterns, universe_solutions, pg_regex_patterns, pg_solutions
+from analyzer_dict import universe_regex_patterns, universe_solutions, pg_regex_patterns, pg_solutions, pattern_severities
 from analyzer_lib import *
-from collections import OrderedDict
+from analyzer_matcher import enableInstrumentation, enableSeverityFilter, mergePatternStats
+from analyzer_io import getLineAlignedRanges, iterLogBlocks, DEFAULT_BUFFER_SIZE_KB
+from analyzer_time import LogTimeParser, isLineWithTime, datetimeToMinuteKey, timeToMinuteKey, minuteKeyToTime
+from analyzer_scan import scanLogFile, scanLogBlock, mergeScanResults, getScanResultInTimeRange, getScanResultWithoutPartialLine
+from analyzer_results_cache import ResultsCache, getPatternHash, isCoveringTimeRange, isUnchanged, isAppended, RESULTS_CACHE_FILE
+from analyzer_extract import getArchiveFiles, extractAllTarFiles
+from analyzer_stream import iterArchiveLogFiles, STREAM_BLOCK_SIZE_MB
+from analyzer_inventory import BundleInventory
+from analyzer_pbc import InstanceFileDecoder, INSTANCE_CACHE_FILE
+from analyzer_gzip import getGzipIndexes, getGzipStartOffset, getGzipRanges, GZIP_INDEX_CACHE_FILE, MAX_GZIP_RANGES
+from analyzer_progress import ProgressReporter
+from analyzer_schedule import getEstimatedUncompressedSize, getDefaultWorkerCount
+from analyzer_events import EventStore, isEventsFile
+from analyzer_series import MinuteSeries
+from analyzer_timeline import NodeTimeline, getLogFileNode, getTimelineHTML, getTimelineMarkdown
+from analyzer_bursts import isBurstDetectionAvailable, detectBursts, getIncidentWindows, getIncidentWindowsHTML, getIncidentWindowsMarkdown
+from analyzer_lazy_report import LazyReport, lazyHtmlHeader, lazyFilesSection, lazyTipsSection, lazyReportScript
+from analyzer_report import getResultsTable, getResultsHTML, getResultsMarkdown
+from analyzer_profile import StageTimer, runProfiled, getHotFunctions, getPatternCosts, getProfileText, getProfileHTML
+from collections import Counter
 import logging
 import datetime
 import argparse
 import re
 import os
-import tabulate
-import tarfile
 import gzip
 import json
+import shutil
+import tempfile
 
 class ColoredHelpFormatter(argparse.RawTextHelpFormatter):
     def _get_help_string(self, action):
@@ -51,8 +70,18 @@ parser = argparse.ArgumentParser(description="Log Analyzer for YugabyteDB logs",
 parser.add_argument("-l", "--log_files", nargs='+', help="List of log file[s] \n Examples:\n\t -l /path/to/logfile1 \n\t -l /path/to/logfile1 /path/to/logfile2 \n\t -l /path/to/log* \n\t -l /path/to/support_bundle.tar.gz")
 parser.add_argument("-d", "--directory", help="Directory containing log files")
 parser.add_argument("-o", "--output", metavar="FILE", dest="output_file", help="Output file name")
-parser.add_argument("-p", "--parallel", metavar="N", dest='numThreads', default=5, type=int, help="Run in parallel mode with N threads")
+parser.add_argument("-p", "--parallel", metavar="N", dest='numThreads', default=getDefaultWorkerCount(), type=int, help="Run in parallel mode with N threads. Default is the number of CPUs, limited by the available memory")
+parser.add_argument("--buffer_size", metavar="KB", dest="buffer_size", default=DEFAULT_BUFFER_SIZE_KB, type=int, help="Size of the read buffer used to stream each log file in KB")
+parser.add_argument("--split_size", metavar="MB", dest="split_size", default=256, type=int, help="Split uncompressed log files larger than MB into ranges of MB analyzed in parallel, 0 to disable. Compressed log files are only split when there are fewer log files than workers, into at most {} ranges, since each range decompresses all the data before it".format(MAX_GZIP_RANGES))
 parser.add_argument("--skip_tar", action="store_true", help="Skip tar file")
+parser.add_argument("--no_cache", action="store_true", help="Don't use the cached analysis of the log files, or cache the analysis")
+parser.add_argument("--profile", action="store_true", help="Time the stages of the analysis and add the timings to analyzer.log and the report")
+parser.add_argument("--profile_workers", action="store_true", help="Also profile the analysis tasks in the workers with cProfile and report the hot functions. Implies --profile")
+parser.add_argument("--pattern_stats", action="store_true", help="Record the evaluations, matches and time of every regex pattern and report the pattern costs. Slower than a normal run. Implies --profile and --no_cache")
+parser.add_argument("--severity_filter", action="store_true", help="Match each line only with the messages which can appear at its glog severity or postgres level, from pattern_severities in analyzer_dict.py. Ignored with --pattern_stats")
+parser.add_argument("--export_events", metavar="FILE", help="Export every matched line as an event (node, file, process type, minute, message, severity and offset) into the SQLite FILE, which can be queried with query_events.py. An existing FILE is only replaced if it is an events file. Implies --no_cache")
+parser.add_argument("--lazy_report", action="store_true", help="Write a small HTML report which loads the log file tables, the bar chart and the troubleshooting tips from a compressed data file next to it. The tables are rendered as they are expanded, for bundles with many log files")
+parser.add_argument("--stream_tar", action="store_true", help="Analyze tar files in place without extracting them. Only the files needed for node details and GFlags are extracted")
 parser.add_argument("-t", "--from_time", metavar= "MMDD HH:MM", dest="start_time", help="Specify start time in quotes")
 parser.add_argument("-T", "--to_time", metavar= "MMDD HH:MM", dest="end_time", help="Specify end time in quotes")
 parser.add_argument("-s", "--sort-by", dest="sort_by", choices=['NO','LO','FO'], help="Sort by: \n\t NO = Number of occurrences, \n\t LO = Last Occurrence,\n\t FO = First Occurrence(Default)")
@@ -64,6 +93,20 @@ args = parser.parse_args()
 
 if args.markdown:
     args.html = False
+if args.profile_workers:
+    args.profile = True
+# Cached files are not scanned, so they would have no pattern stats
+if args.pattern_stats:
+    args.profile = True
+    args.no_cache = True
+# Cached files are not scanned, so they would have no events
+if args.export_events:
+    args.no_cache = True
+
+# The export file is replaced, so it can only be an events file of an earlier export
+if args.export_events and os.path.exists(args.export_events) and not isEventsFile(args.export_events):
+    print("Not overwriting {}, it is not an events file written by --export_events".format(args.export_events))
+    exit(1)
 
 # Validated start and end time format
 if args.start_time:
@@ -86,26 +129,26 @@ seven_days_ago = seven_days_ago.strftime("%m%d %H:%M")
 start_time = datetime.datetime.strptime(args.start_time, "%m%d %H:%M") if args.start_time else datetime.datetime.strptime(seven_days_ago, "%m%d %H:%M")
 end_time = datetime.datetime.strptime(args.end_time, "%m%d %H:%M") if args.end_time else datetime.datetime.now()
 
-# Define the lists to store the results
-listOfErrorsInAllFiles = []
-listOfErrorsInFile = []
-listOfFilesWithNoErrors = []
-listOfAllFilesWithNoErrors = []
+# Counts of the messages per minute of all the log files, for the bar chart
+minuteSeries = MinuteSeries()
+# Counts of the messages per minute of each node, for the cross node timeline
+nodeTimeline = NodeTimeline()
+# Data of the lazy HTML report, set with --lazy_report
+lazyReport = None
+# Directory the workers dump the cProfile stats of the analysis tasks into, set with --profile_workers
+profileDirectory = None
 
-# Define Barchart varz
-histogramJSON = {}
-barChartJSONLock = Lock()
 
 
-
-# Setup a logger
+# Setup a logger, handlers are set on the root logger so that the helper modules log to the same places
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+rootLogger = logging.getLogger()
+rootLogger.setLevel(logging.DEBUG)
 formatter = logging.Formatter('%(asctime)s:%(levelname)s:- %(message)s')
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+rootLogger.addHandler(console_handler)
 
 if args.directory:
     log_file = os.path.join(args.directory, 'analyzer.log')
@@ -114,71 +157,56 @@ else:
 file_handler = logging.FileHandler(log_file)
 file_handler.setLevel(logging.DEBUG)
 file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
-
-# Define lock for writing to file
-lock = Lock()
+rootLogger.addHandler(file_handler)
 
-# Function to write to file
-def writeToFile(file, content):
-    lock.acquire()
-    with open(file, "a") as f:
-        f.write(content)
-    lock.release()
+# Size of the write buffer of the report in bytes, the report is written only by the main process
+REPORT_BUFFER_SIZE = 1024 * 1024
 
 # Get the node list
-def getTserversMastersList(dirPaths):
+def getTserversMastersList(inventory):
     tserverList = []
     masterList = []
-    for dirPath in dirPaths:
-        for root, dirs, files in os.walk(dirPath):
-            if "instance" in files:
-                instancePath = os.path.join(root, "instance")
-                if instancePath.__contains__("tserver"):
-                    tserverList.append(instancePath.split("/")[-3])
-                elif instancePath.__contains__("master"):
-                    masterList.append(instancePath.split("/")[-3])
+    for instancePath in inventory.instanceFiles:
+        if instancePath.__contains__("tserver"):
+            tserverList.append(instancePath.split("/")[-3])
+        elif instancePath.__contains__("master"):
+            masterList.append(instancePath.split("/")[-3])
     return tserverList, masterList
 
 # Function to get the deployment type
-def getDeploymentType(dirPaths):
-    for dirPath in dirPaths:
-        for root, dirs, files in os.walk(dirPath):
-            if "server.conf" in files:
-                return "vm"
-            elif "gflags" in dirs:
-                return "k8s"
-    return "Unknown"
+def getDeploymentType(inventory):
+    return inventory.deploymentType
 
 # Function to get the node directory
 def getNodeDirectory(node):
-    for dirPath in dirPaths:
-        for root, dirs, files in os.walk(dirPath):
-            if dirs.__contains__(node):
-                nodeDir = os.path.join(root, node)
-                return nodeDir
-    return None
+    return bundleInventory.getNodeDirectory(node)
 
 # Function to get the node details
 def getNodeDetails():
     nodeDetails = {}
-    tserverList, masterList = getTserversMastersList(dirPaths)
-    nodeList = set(tserverList + masterList)
+    tserverList, masterList = getTserversMastersList(bundleInventory)
+    nodeList = sorted(set(tserverList + masterList))
+    # Decode all the instance files together, yb-pbc-dump runs in parallel for the ones not in the cache
+    instanceFiles = []
+    for node in nodeList:
+        nodeDir = getNodeDirectory(node)
+        for server in ["tserver", "master"]:
+            instanceFile = os.path.join(nodeDir, server, "instance")
+            if bundleInventory.isFile(instanceFile):
+                instanceFiles.append(instanceFile)
+    decodedInstanceFiles = instanceDecoder.decode(instanceFiles)
     for node in nodeList:
         nodeDir= getNodeDirectory(node)
-        if os.path.exists(nodeDir):
+        if bundleInventory.isDirectory(nodeDir):
             # Get the number of tablets
             tabletMeta = os.path.join(nodeDir,"tserver", "tablet-meta")
-            if os.path.exists(tabletMeta):
-                numTablets = len(os.listdir(tabletMeta))
-            else:
-                numTablets = 0
+            numTablets = bundleInventory.getNumTablets(tabletMeta)
             
             # Get the tserver UUID
-            if os.path.exists(os.path.join(nodeDir, "tserver")):
+            if bundleInventory.isDirectory(os.path.join(nodeDir, "tserver")):
                 tserverInstanceFile = os.path.join(nodeDir, "tserver", "instance")
-                if os.path.exists(tserverInstanceFile):
-                    raw_data = os.popen("yb-pbc-dump " + tserverInstanceFile).readlines()
+                if bundleInventory.isFile(tserverInstanceFile):
+                    raw_data = decodedInstanceFiles[tserverInstanceFile]
                     for line in raw_data:
                         if line.startswith("uuid"):
                             tserverUUID = line.split(":")[1].strip().replace('"','')
@@ -192,10 +220,10 @@ def getNodeDetails():
                 tserverRunningOnMachine = "-"
             
             # Get the master UUID
-            if os.path.exists(os.path.join(nodeDir, "master")):
+            if bundleInventory.isDirectory(os.path.join(nodeDir, "master")):
                 masterInstanceFile = os.path.join(nodeDir, "master", "instance")
-                if os.path.exists(masterInstanceFile):
-                    raw_data = os.popen("yb-pbc-dump " + masterInstanceFile).readlines()
+                if bundleInventory.isFile(masterInstanceFile):
+                    raw_data = decodedInstanceFiles[masterInstanceFile]
                     for line in raw_data:
                         if line.startswith("uuid"):
                             masterUUID = line.split(":")[1].strip().replace('"','')
@@ -218,7 +246,7 @@ def getNodeDetails():
                 
             # Get Placement Details
             gflagFile = os.path.join(nodeDir, "tserver", "conf", "server.conf")
-            if os.path.exists(gflagFile):
+            if bundleInventory.isFile(gflagFile):
                 with open(gflagFile, "r") as f:
                     for line in f:
                         if line.__contains__("placement_cloud"):
@@ -261,83 +289,20 @@ def getLogFilesFromCommandLine():
             logFiles.append(file)
     return logFiles
 
-# Function to get the log files from the directory
-def getLogFilesFromDirectory(logDirectory):
-    logFiles = []
-    for root, dirs, files in os.walk(logDirectory):
-        for file in files:
-            if file.__contains__("INFO") or file.__contains__("postgres") and file[0] != ".":
-                logFiles.append(os.path.join(root, file))
-    return logFiles
-
-# Function to get the time from the log line
-def getTimeFromLog(line,previousTime):
-    if line[0] in ['I','W','E','F']:
-        try:
-            timeFromLogStr = line.split(" ")[0][1:] + " " + line.split(" ")[1][:5]
-            timestamp = datetime.datetime.strptime(timeFromLogStr, "%m%d %H:%M")
-        except Exception as e:
-            timestamp = datetime.datetime.strptime(previousTime, "%m%d %H:%M")
-    else:
-        try:
-            timeFromLogStr = line.split(" ")[0] + " " + line.split(" ")[1]
-            timestamp = datetime.datetime.strptime(timeFromLogStr, "%Y-%m-%d %H:%M:%S.%f")
-            timestamp = timestamp.strftime("%m%d %H:%M")
-            timestamp = datetime.datetime.strptime(timestamp, "%m%d %H:%M")
-        except Exception as e:
-            timestamp = datetime.datetime.strptime(previousTime, "%m%d %H:%M")
-    return timestamp
-
-# Function to get all the tar files
-def getArchiveFiles(logDirectory):
-    archievedFiles = []
-    for root, dirs, files in os.walk(logDirectory):
-        for file in files:
-            if file.endswith(".tar.gz") or file.endswith(".tgz"):
-                archievedFiles.append(os.path.join(root,file))
-    return archievedFiles
-
-# Function to extract the tar file
-def extractTarFile(file):
-    with tarfile.open(file, "r:gz") as tar:
-        # extract to filename directory
-        tar.extractall(os.path.dirname(file))
-
-# Function to extract all the tar files    
-def extractAllTarFiles(logDirectory):
-    extractedFiles = []
-    extractedAll = False
-    while not extractedAll:
-        extractedAll = True
-        for file in getArchiveFiles(logDirectory):
-            extractedAll = False
-            if file not in extractedFiles:
-                logger.info("Extracting file {}".format(file))
-                with tarfile.open(file, "r:gz") as tar:
-                    try:
-                        tar.extractall(os.path.dirname(file))
-                    except EOFError:
-                        logger.warning("Got EOF Exception while extracting file {}, File might have still extracted. Please check {} for more information ".format(file, log_file))
-                        logger.error("EOF Exception while extracting file {}".format(file))
-                extractedFiles.append(file)
-        if len(extractedFiles) >= len(getArchiveFiles(logDirectory)):
-            extractedAll = True
-
 # Function to skip the files based on the time
 def skipFileBasedOnTime(logFile, start_time, end_time):
     logger.debug("Checking file {} for time range".format(logFile))
     if logFile.endswith(".gz"):
-        logs = gzip.open(logFile, "rt")
-    else:
-        logs = open(logFile, "r")
+        return skipGzipFileBasedOnTime(logFile, start_time, end_time)
+    logs = open(logFile, "r")
     try:
         # Read first 10 lines
         for i in range(10):
             line = logs.readline()
             if not line:
                 break
-            logStartsAt = getTimeFromLog(line,'0101 00:00')
-            logger.debug("Log starts at: {}".format(logStartsAt))
+            logStartsAt = LogTimeParser(timeToMinuteKey('0101 00:00')).getMinuteKey(line)
+            logger.debug("Log starts at: {}".format(minuteKeyToTime(logStartsAt)))
             break
         # Read last 10 lines
         logs.seek(0, 2)
@@ -348,23 +313,45 @@ def skipFileBasedOnTime(logFile, start_time, end_time):
         logs.seek(logs.tell() - 4096, 0) 
         lines = logs.readlines()
         for line in reversed(lines):
-            logEndsAt = getTimeFromLog(line, '1231 23:59')
-            logger.debug("Log ends at: {}".format(logEndsAt))
+            logEndsAt = LogTimeParser(timeToMinuteKey('1231 23:59')).getMinuteKey(line)
+            logger.debug("Log ends at: {}".format(minuteKeyToTime(logEndsAt)))
             break
         logs.close()
-        if logStartsAt > end_time or logEndsAt < start_time:
+        if logStartsAt > datetimeToMinuteKey(end_time) or logEndsAt < datetimeToMinuteKey(start_time):
             logger.info("Skipping file {} as it is outside the time range".format(logFile))
             return True
         else:
-            logger.debug("file {} is within the time range, starting at {} and ending at {}".format(logFile, logStartsAt, logEndsAt))
+            logger.debug("file {} is within the time range, starting at {} and ending at {}".format(logFile, minuteKeyToTime(logStartsAt), minuteKeyToTime(logEndsAt)))
             return False
     except UnicodeDecodeError as e:
         logger.warning("Skipping file {} as it is not a text file".format(logFile))
         return True
     
 
-# Function to analyze the log files                
-def analyzeLogFiles(logFile, outputFile, start_time=None, end_time=None):
+# Function to skip the gzip compressed files based on the time, the first and last lines are read from the index
+def skipGzipFileBasedOnTime(logFile, start_time, end_time):
+    index = gzipIndexes.get(logFile)
+    if index is None:
+        # File couldn't be decompressed, the analysis reports it
+        return False
+    if not index["isText"]:
+        logger.warning("Skipping file {} as it is not a text file".format(logFile))
+        return True
+    if index["uncompressedSize"] < 4096:
+        logger.debug("File {} is less than 4096 bytes. No need to skip".format(logFile))
+        return False
+    logStartsAt = index["firstMinuteKey"]
+    logEndsAt = index["lastMinuteKey"]
+    logger.debug("Log starts at: {}".format(minuteKeyToTime(logStartsAt)))
+    logger.debug("Log ends at: {}".format(minuteKeyToTime(logEndsAt)))
+    if logStartsAt > datetimeToMinuteKey(end_time) or logEndsAt < datetimeToMinuteKey(start_time):
+        logger.info("Skipping file {} as it is outside the time range".format(logFile))
+        return True
+    logger.debug("file {} is within the time range, starting at {} and ending at {}".format(logFile, minuteKeyToTime(logStartsAt), minuteKeyToTime(logEndsAt)))
+    return False
+
+# Function to get the regex patterns to analyze the log file with
+def getRegexPatterns(logFile):
     if logFile.__contains__("postgresql"):
         regex_patterns = pg_regex_patterns
     else:
@@ -376,92 +363,162 @@ def analyzeLogFiles(logFile, outputFile, start_time=None, end_time=None):
         patternsToAnalyze = args.histogram_mode.split(",")
         for pattern in patternsToAnalyze:
             regex_patterns[pattern] = pattern
+    return regex_patterns
+
+# Function to write the results of a log file to the output file
+# Returns False if there is nothing to write
+def writeAnalysisResults(logFile, report, results):
+    table = getResultsTable(results, args.sort_by)
+    if not table:
+        return False
+    if lazyReport:
+        lazyReport.addFile(logFile, table)
+    elif args.html:
+        report.write(getResultsHTML(logFile, table))
+    else:
+        report.write(getResultsMarkdown(logFile, table))
+    return True
+
+# Function to report the scan result of a log file
+# Adds the message counts to errorCounts and the file with no errors to filesWithNoErrors
+def reportScanResult(scanResult, report, errorCounts, filesWithNoErrors):
+    logFile = scanResult["logFile"]
+    if scanResult["status"] == "unreadable":
+        if isinstance(scanResult["error"], UnicodeDecodeError):
+            logger.warning("Skipping file {} as it is not a text file".format(logFile))
+        else:
+            logger.warning("Problem occured while reading the file: {}".format(logFile))
+            logger.error(scanResult["error"])
+        return
+    errorCounts.update(scanResult["messageCounts"])
+    if scanResult["status"] == "stopped":
+        logger.debug("Skipping further analysis of file {} as it is outside the time range{}".format(logFile, "" if scanResult["stoppedAt"] is None else " at " + minuteKeyToTime(scanResult["stoppedAt"])))
+        return
+    if not writeAnalysisResults(logFile, report, scanResult["results"]):
+        filesWithNoErrors.add(logFile)
+    logger.info("Finished analyzing file {}".format(logFile))
 
-    previousTime = '0101 00:00' # Default time
-    logger.info("Analyzing file {}".format(logFile))
-    barChartJSON = {}
+# Function to analyze a log file, or the byte range startOffset to endOffset of it, returns the scan result
+# endOffset is None for the end of the file, previousMinuteKey is the time of the lines without time at startOffset
+def analyzeLogTask(logFile, startMinuteKey, endMinuteKey, startOffset, endOffset, previousMinuteKey):
+    if startOffset == 0 and endOffset in (None, os.path.getsize(logFile)):
+        logger.info("Analyzing file {}".format(logFile))
+    else:
+        logger.info("Analyzing bytes {} to {} of file {}".format(startOffset, "end" if endOffset is None else endOffset, logFile))
+    return scanLogFile(logFile, getRegexPatterns(logFile), startMinuteKey, endMinuteKey, startOffset, endOffset, args.buffer_size, bool(args.export_events), previousMinuteKey)
+
+# Function to set the profile directory and the pattern matchers of the main process and of each worker
+def initWorker(workerProfileDirectory, isPatternStats, isSeverityFilter):
+    global profileDirectory
+    profileDirectory = workerProfileDirectory
+    if isPatternStats:
+        enableInstrumentation()
+    elif isSeverityFilter:
+        enableSeverityFilter(pattern_severities)
+
+# Function to run an analysis task with its index, for imap_unordered
+def analyzeIndexedTask(indexedTask):
+    taskIndex, task = indexedTask
+    if profileDirectory:
+        return taskIndex, runProfiled(os.path.join(profileDirectory, "task-{}.prof".format(taskIndex)), analyzeLogTask, *task)
+    return taskIndex, analyzeLogTask(*task)
+
+# Function to get the number of bytes an analysis task reads, the size of the decompressed data for gzip compressed
+# files, estimated if the file is not indexed
+def getTaskSize(task):
+    logFile, startMinuteKey, endMinuteKey, startOffset, endOffset, previousMinuteKey = task
+    if endOffset is None:
+        index = gzipIndexes.get(logFile)
+        endOffset = index["uncompressedSize"] if index else getEstimatedUncompressedSize(logFile)
+    return max(endOffset - startOffset, 0)
+
+# Function to get the ranges of a gzip compressed log file from its index, the ranges before the start time are dropped
+# The file is split into at most maxRanges ranges
+def getGzipAnalysisRanges(logFile, startMinuteKey, maxRanges):
+    index = gzipIndexes.get(logFile)
+    if index is None:
+        return [(0, None)]
+    ranges = [(0, index["uncompressedSize"])]
+    if args.split_size and maxRanges > 1 and index["uncompressedSize"] > args.split_size * 1024 * 1024:
+        ranges = getGzipRanges(index, args.split_size, maxRanges)
+    startOffset = getGzipStartOffset(index, startMinuteKey)
+    if startOffset > 0:
+        logger.debug("Skipping the first {} bytes of file {}, which are before the start time".format(startOffset, logFile))
+        ranges = [(max(rangeStart, startOffset), rangeEnd) for rangeStart, rangeEnd in ranges if rangeEnd > startOffset]
+    # The last range is read till the end of the file
+    return ranges[:-1] + [(ranges[-1][0], None)]
+
+# Function to get the analysis plan of a log file:
+#   cachedScanResult: scan result of the file from the results cache, None if the file is not cached
+#   coverageStart: minute key from which the file is scanned, the cached scan result may start before the start time
+#   tasks: analysis tasks of the file, files larger than args.split_size are split into byte ranges. Ranges of
+#          gzip compressed files are ranges of the decompressed data, they also skip the data before the start time.
+#          Gzip compressed files are split into at most maxGzipRanges ranges
+def getAnalysisPlan(logFile, startMinuteKey, endMinuteKey, maxGzipRanges=1):
+    plan = {
+        "logFile": logFile,
+        "stat": os.stat(logFile),
+        "patternHash": getPatternHash(getRegexPatterns(logFile), pattern_severities if args.severity_filter and not args.pattern_stats else None),
+        "cachedScanResult": None,
+        "coverageStart": startMinuteKey,
+        "tasks": [],
+    }
+    if resultsCache:
+        entry = resultsCache.getEntry(logFile, plan["patternHash"])
+        if entry and isUnchanged(entry, plan["stat"]) and isCoveringTimeRange(entry, startMinuteKey, endMinuteKey):
+            logger.info("Using the cached analysis of file {}".format(logFile))
+            plan["cachedScanResult"] = resultsCache.getScanResult(logFile, plan["patternHash"], entry, getRegexPatterns(logFile))
+            return plan
+        if entry and isAppended(logFile, entry, plan["stat"]) and isCoveringTimeRange(entry, startMinuteKey, endMinuteKey):
+            # Scan only the appended lines, for the same time range as the cached lines and from the time of the last cached line
+            logger.info("Using the cached analysis of the first {} bytes of file {}".format(entry["endOffset"], logFile))
+            plan["cachedScanResult"] = resultsCache.getScanResult(logFile, plan["patternHash"], entry, getRegexPatterns(logFile))
+            plan["coverageStart"] = entry["coverageStart"]
+            plan["tasks"].append((logFile, entry["coverageStart"], endMinuteKey, entry["endOffset"], plan["stat"].st_size, entry["lastMinuteKey"]))
+            return plan
     if logFile.endswith(".gz"):
-        logs = gzip.open(logFile, "rt")
+        ranges = getGzipAnalysisRanges(logFile, startMinuteKey, maxGzipRanges)
+    elif args.split_size and plan["stat"].st_size > args.split_size * 1024 * 1024:
+        ranges = getLineAlignedRanges(logFile, args.split_size, isLineWithTime)
     else:
-        logs = open(logFile, "r")
-    try:
-        lines = logs.readlines()
-    except UnicodeDecodeError as e:
-        logger.warning("Skipping file {} as it is not a text file".format(logFile))
-        return listOfErrorsInFile, listOfFilesWithNoErrors, barChartJSON
-    except Exception as e:
-        logger.warning("Problem occured while reading the file: {}".format(logFile))
-        logger.error(e)
-        return listOfErrorsInFile, listOfFilesWithNoErrors, barChartJSON
-    results = {}
+        # Uncompressed files are read till the size they had when the plan was made, which is cached
+        ranges = [(0, plan["stat"].st_size)]
+    if len(ranges) > 1:
+        logger.info("Splitting file {} into {} ranges".format(logFile, len(ranges)))
+    for startOffset, endOffset in ranges:
+        plan["tasks"].append((logFile, startMinuteKey, endMinuteKey, startOffset, endOffset, None))
+    return plan
+
+# Function to get the scan result of the log file from the cached scan result and the results of its tasks
+# The scan results of the analyzed files are added to the results cache, without the last line of an uncompressed
+# file if it has no line end yet, as it may still be written to
+def getPlanScanResult(plan, taskResults, startMinuteKey, endMinuteKey):
+    logFile = plan["logFile"]
+    regex_patterns = getRegexPatterns(logFile)
+    scanResults = [plan["cachedScanResult"]] if plan["cachedScanResult"] else []
+    scanResult = mergeScanResults(scanResults + taskResults, regex_patterns)
+    if resultsCache and taskResults and scanResult["status"] != "unreadable":
+        cacheScanResult, endOffset = scanResult, None
+        if not logFile.endswith(".gz"):
+            cacheScanResult, partialLineBytes = getScanResultWithoutPartialLine(scanResult, regex_patterns)
+            endOffset = plan["stat"].st_size - partialLineBytes
+        coverageEnd = endMinuteKey if scanResult["status"] == "stopped" else None
+        resultsCache.putScanResult(logFile, plan["patternHash"], plan["stat"], endOffset, plan["coverageStart"], coverageEnd, cacheScanResult)
+    return getScanResultInTimeRange(scanResult, regex_patterns, startMinuteKey, endMinuteKey)
+
+# Function to find the version in the log lines
+def findVersion(lines):
     for line in lines:
-        timeFromLog = getTimeFromLog(line,previousTime)
-        # Continue with next file if the time is outside the range
-        if timeFromLog > end_time:
-            logger.debug("Skipping further analysis of file {} as it is outside the time range at {}".format(logFile, timeFromLog.strftime('%m%d %H:%M')))
-            return listOfErrorsInFile, listOfFilesWithNoErrors, barChartJSON
-        for message, pattern in regex_patterns.items():
-            match = re.search(pattern, line, re.IGNORECASE)
-            if match:
-                # Populate results
-                if message not in results:
-                    results[message] = {
-                        "numOccurrences": 0,
-                        "firstOccurrenceTime": None,
-                        "lastOccurrenceTime": None,
-                    }
-                results[message]["numOccurrences"] += 1
-                time = timeFromLog.strftime('%m%d %H:%M')
-                if not results[message]["firstOccurrenceTime"]:
-                    results[message]["firstOccurrenceTime"] = time
-                results[message]["lastOccurrenceTime"] = time
-                listOfErrorsInFile.append(message)
-                
-                # Create JSON for bar chart
-                hour = time[:-3]
-                barChartJSON.setdefault(message, {})
-                barChartJSON[message].setdefault(hour, 0)
-                barChartJSON[message][hour] += 1                              
-    if args.sort_by == 'NO':
-        sortedDict = OrderedDict(sorted(results.items(), key=lambda x: x[1]["numOccurrences"], reverse=True))
-    elif args.sort_by == 'LO':
-        sortedDict = OrderedDict(sorted(results.items(), key=lambda x: x[1]["lastOccurrenceTime"]))
-    elif args.sort_by == 'FO' or True:
-        sortedDict = OrderedDict(sorted(results.items(), key=lambda x: x[1]["firstOccurrenceTime"]))
-    table = []
-    for message, info in sortedDict.items():
-        table.append(
-            [
-                info["numOccurrences"],
-                message,
-                info["firstOccurrenceTime"],
-                info["lastOccurrenceTime"],
-            ]
-        )
-    if table:
-        if args.html:
-            formatLogFileForHTMLId = logFile.replace("/", "-").replace(".", "-").replace(" ", "-").replace(":", "-")
-            content = "<h4 id=" + formatLogFileForHTMLId + ">" + logFile + "</h4>"
-            content += tabulate.tabulate(table, headers=["Occurrences", "Message", "First Occurrence", "Last Occurrence"], tablefmt="html")
-            content = content.replace("$line-break$", "<br>").replace("$tab$", "&nbsp;&nbsp;&nbsp;&nbsp;").replace("$start-code$", "<code>").replace("$end-code$", "</code>").replace("$start-bold$", "<b>").replace("$end-bold$", "</b>").replace("$start-italic$", "<i>").replace("$end-italic$", "</i>").replace("<table>", "<table class='sortable' id='main-table'>")
-            writeToFile(outputFile, content)
-        else:
-            formatLogFileForMarkdown = logFile.replace("/", "-").replace(".", "-").replace(" ", "-").replace(":", "-")
-            content = "## " + formatLogFileForMarkdown + "\n\n"
-            content += tabulate.tabulate(table, headers=["Occurrences", "Message", "First Occurrence", "Last Occurrence"], tablefmt="simple_grid")
-            content = content.replace("$line-break$", "\n").replace("$tab$", "\t").replace("$start-code$", "`").replace("$end-code$", "`").replace("$start-bold$", "**").replace("$end-bold$", "**").replace("$start-italic$", "*").replace("$end-italic$", "*")
-            writeToFile(outputFile, content)
-    else:
-        listOfFilesWithNoErrors.append(logFile)
-    logs.close()
-    logger.info("Finished analyzing file {}".format(logFile))
-    return listOfErrorsInFile, listOfFilesWithNoErrors, barChartJSON
+        match = re.search(r'version\s+(\d+\.\d+\.\d+\.\d+)', line)
+        if match:
+            return match.group(1)
+    return None
 
 def getVersion():
     if args.log_files:
         files = getLogFilesFromCommandLine()
     elif args.directory:
-        files = getLogFilesFromDirectory(args.directory)
+        files = bundleInventory.logFilesByDirPath[args.directory]
     version = "Unknown"
     for file in files:
         if file.endswith('.gz'):
@@ -479,17 +536,47 @@ def getVersion():
         except UnicodeDecodeError as e:
             logger.warning("Skipping file {} as it is not a text file".format(file))
             continue
-        for line in lines:
-            match = re.search(r'version\s+(\d+\.\d+\.\d+\.\d+)', line)
-            if match:
-                logger.info("Found version in file: {}".format(file))
-                version = match.group(1)
-                break
+        foundVersion = findVersion(lines)
+        if foundVersion:
+            logger.info("Found version in file: {}".format(file))
+            version = foundVersion
         logs.close()
         if version != "Unknown":
             break
     return version
-   
+
+# Function to analyze a block of lines of a log file streamed from a tar file
+def analyzeLogBlock(logFile, start_time, end_time, block, blockOffset):
+    return scanLogBlock(logFile, block, getRegexPatterns(logFile), datetimeToMinuteKey(start_time), datetimeToMinuteKey(end_time), bool(args.export_events), blockOffset)
+
+# Function to analyze the log files in a tar file without extracting it
+# The log files are read from the tar file in blocks which are analyzed by the pool
+# Returns the scan results of the log files and the version found in them
+def analyzeTarFileInPlace(tarFile, start_time, end_time, pool):
+    version = "Unknown"
+    fileBlocks = []
+    pendingBlocks = []
+    for logFile, logs in iterArchiveLogFiles(tarFile, os.path.dirname(tarFile)):
+        logger.info("Analyzing file {}".format(logFile))
+        blocks = []
+        blockOffset = 0
+        for block in iterLogBlocks(logs, STREAM_BLOCK_SIZE_MB, isLineWithTime):
+            if version == "Unknown" and not blocks:
+                version = findVersion(block[:4096].decode(errors="replace").splitlines()[:10]) or "Unknown"
+            # Limit the number of blocks waiting for a worker
+            while len(pendingBlocks) >= 2 * args.numThreads:
+                pendingBlocks.pop(0).wait()
+            blocks.append(pool.apply_async(analyzeLogBlock, (logFile, start_time, end_time, block, blockOffset)))
+            pendingBlocks.append(blocks[-1])
+            blockOffset += len(block)
+        logs.close()
+        if blocks:
+            fileBlocks.append((logFile, blocks))
+    scanResults = []
+    for logFile, blocks in fileBlocks:
+        scanResults.append(mergeScanResults([block.get() for block in blocks], getRegexPatterns(logFile)))
+    return scanResults, version
+
 def getSolution(message):
     if args.histogram_mode:
         return "No solution available for custom patterns"
@@ -497,41 +584,74 @@ def getSolution(message):
     
 if __name__ == "__main__":        
     dirPaths = []
+    extractedDirPaths = []
     outputFilePrefix = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
     # Create output file
     if not args.output_file:
         if args.html:
             outputFile = outputFilePrefix + "_analysis.html"
-            writeToFile(outputFile, htmlHeader)
         else:
             outputFile = outputFilePrefix + "_analysis.md"
     else:
         outputFile = args.output_file
-        if args.html:
-            writeToFile(outputFile, htmlHeader)
-            
+    stageTimer = StageTimer()
+    stageTimer.start("Setup")
+    report = open(outputFile, "a", buffering=REPORT_BUFFER_SIZE)
+    if args.html:
+        report.write(lazyHtmlHeader if args.lazy_report else htmlHeader)
+
+    # The worker settings are passed to the pool initializer, so the workers get them with the spawn start method too
+    workerSettings = (tempfile.mkdtemp(prefix="analyzer_profile_") if args.profile_workers else None, args.pattern_stats, args.severity_filter)
+    initWorker(*workerSettings)
+    pool = Pool(processes=args.numThreads, initializer=initWorker, initargs=workerSettings)
+    streamedScanResults = []
+    streamedVersion = "Unknown"
     # Get log files
     if args.log_files:
         logFileList = getLogFilesFromCommandLine()
         # if files are tar files, extract them
         if not args.skip_tar:
+            # The streamed tar files are removed from the list after the loop, removing them in it would skip the next file
+            streamedTarFiles = []
             for file in logFileList:
-                if file.endswith(".tar.gz") or file.endswith(".tgz"):
-                    logger.info("Extracting file {}".format(file))
-                    extractTarFile(file)
+                if (file.endswith(".tar.gz") or file.endswith(".tgz")) and args.stream_tar:
+                    # Analyze the tar file in place, the results are written with the results of the other files
+                    with stageTimer.stage("Streaming tar analysis"):
+                        scanResults, version = analyzeTarFileInPlace(file, start_time, end_time, pool)
+                    streamedScanResults += scanResults
+                    if version != "Unknown":
+                        streamedVersion = version
+                    dirPaths.append(file.replace(".tar.gz", "").replace(".tgz", ""))
+                    streamedTarFiles.append(file)
+                elif file.endswith(".tar.gz") or file.endswith(".tgz"):
+                    # Extract the tar file and the tar files in it
+                    with stageTimer.stage("Extraction"):
+                        extractAllTarFiles([file], args.numThreads)
                     extractedDir = file.replace(".tar.gz", "").replace(".tgz", "")
-                    # Exctract the tar files in extracted directory
-                    extractAllTarFiles(extractedDir)
                     dirPaths.append(extractedDir)
-                    logFileList += getLogFilesFromDirectory(extractedDir)
+                    extractedDirPaths.append(extractedDir)
+            logFileList = [file for file in logFileList if file not in streamedTarFiles]
     elif args.directory:
         if not args.skip_tar:
-            extractAllTarFiles(args.directory)
-        logFileList = getLogFilesFromDirectory(args.directory)
+            with stageTimer.stage("Extraction"):
+                extractAllTarFiles(getArchiveFiles(args.directory), args.numThreads)
         dirPaths.append(args.directory)
     else:
         logger.info("Please specify a log file, or directory")
         exit(1)
+
+    # Walk the directories once, the node details, GFlags and log files are looked up in the inventory
+    stageTimer.start("Discovery")
+    bundleInventory = BundleInventory(dirPaths)
+    instanceDecoder = InstanceFileDecoder(os.path.join(os.path.dirname(os.path.abspath(log_file)), INSTANCE_CACHE_FILE), args.numThreads)
+    if args.log_files:
+        for extractedDir in extractedDirPaths:
+            logFileList += bundleInventory.logFilesByDirPath[extractedDir]
+    else:
+        logFileList = bundleInventory.logFiles
+    # Directories of the nodes, the log files in them are tagged with the node in the cross node timeline
+    tserverList, masterList = getTserversMastersList(bundleInventory)
+    nodeDirectories = {node: getNodeDirectory(node) for node in set(tserverList + masterList) if getNodeDirectory(node)}
     
     # Check if log files were found
     if type(logFileList) is not list:
@@ -540,28 +660,33 @@ if __name__ == "__main__":
 
     # Get the version of the software
     logger.info("Getting the version of the software")
+    stageTimer.start("Version")
     version= getVersion()
+    if version == "Unknown":
+        version = streamedVersion
     if version != "Unknown":
         if args.html:
             content = "<h2> YugabyteDB Version: " + version + "</h2>"
-            writeToFile(outputFile, content)
+            report.write(content)
         else:
             content = "# YugabyteDB Version: " + version + "\n"
-            writeToFile(outputFile, content)
+            report.write(content)
 
     # Add node details to the output file in table format
     logger.info("Getting the node details")
-    if len(getNodeDetails()) > 0:
+    stageTimer.start("Node details")
+    nodeDetails = getNodeDetails()
+    if len(nodeDetails) > 0:
         # Sum of all tablets
         totalTablets = 0
-        for key, value in getNodeDetails().items():
+        for key, value in nodeDetails.items():
             totalTablets += value["NumTablets"]
         
         if args.html:
             content = "<h2 id=node-details> Node Details </h2>"
             content += "<table class='sortable' id='node-table'>"
             content += "<tr><th>Node</th><th>Master UUID</th><th>TServer UUID</th><th>Placement Info</th><th>Running on Machine</th><th>Number of Tablets</th></tr>"
-            for key, value in getNodeDetails().items():
+            for key, value in nodeDetails.items():
                 # Calculate the percentage of tablets
                 try:
                     percentage = round((value["NumTablets"] / totalTablets) * 100, 2)
@@ -569,30 +694,29 @@ if __name__ == "__main__":
                     percentage = str("N/A")
                 content += "<tr><td>" + key + "</td><td>" + value["masterUUID"] + "</td><td>" + value["tserverUUID"] + "</td><td>" + value["placement"] + "</td><td>"  + value["runningOnMachine"] + "</td><td>" + str(value["NumTablets"]) + " (" + str(percentage) + "%) </td></tr>"
             content += "</table>"
-            writeToFile(outputFile, content)
+            report.write(content)
         else:
             content = "\n\n\n# Node Details\n\n"
-            for key, value in getNodeDetails().items():
+            for key, value in nodeDetails.items():
                 content += "- " + key + "\n"
                 content += "  - Master UUID: " + value["masterUUID"] + "\n"
                 content += "  - TServer UUID: " + value["tserverUUID"] + "\n"
                 content += "  - Placement Info: " + value["placement"] + "\n"
                 content += "  - Running on Machine: " + value["runningOnMachine"] + "\n"
                 content += "  - Number of Tablets: " + str(value["NumTablets"]) + "\n"
-            writeToFile(outputFile, content)
+            report.write(content)
 
     # Get the configuration details
     logger.info("Getting the GFlags")
+    stageTimer.start("GFlags")
     masterConfFile = None
     tserverConfFile = None
-    for path in dirPaths:
-        for root, dirs, files in os.walk(path):
-            for file in files:
-                if file == "server.conf":
-                    if root.__contains__("master"):
-                        masterConfFile = os.path.join(root, file)
-                    elif root.__contains__("tserver"):
-                        tserverConfFile = os.path.join(root, file)
+    for confFile in bundleInventory.confFiles:
+        root = os.path.dirname(confFile)
+        if root.__contains__("master"):
+            masterConfFile = confFile
+        elif root.__contains__("tserver"):
+            tserverConfFile = confFile
 
     gflags = {}
     if masterConfFile:
@@ -602,11 +726,11 @@ if __name__ == "__main__":
     
     allGFlags = {}
     if masterConfFile and tserverConfFile:
-        allGFlags = set(list(gflags["master"].keys()) + list(gflags["tserver"].keys()))
+        allGFlags = sorted(set(list(gflags["master"].keys()) + list(gflags["tserver"].keys())))
     elif not masterConfFile and tserverConfFile:
-        allGFlags = set(list(gflags["tserver"].keys()))
+        allGFlags = sorted(set(list(gflags["tserver"].keys())))
     elif not tserverConfFile and masterConfFile:
-        allGFlags = set(list(gflags["master"].keys()))
+        allGFlags = sorted(set(list(gflags["master"].keys())))
         
     # Remove flags that are placement related
     allGFlags = [flag for flag in allGFlags if not flag.startswith("placement_")]
@@ -629,7 +753,7 @@ if __name__ == "__main__":
                     content += "<td>" + gflags["tserver"].get(flag, "-") + "</td></tr>"
             content += "</table>"
             content += "<p> Note: The GFlags listed above are from only one of the nodes. Also, This doesn't list the flags with default values and flags that are set runtime. </p>"
-            writeToFile(outputFile, content)
+            report.write(content)
         else:
             content = "\n\n\n# GFlags\n\n"
             for flag in allGFlags:
@@ -641,30 +765,118 @@ if __name__ == "__main__":
                     content += "  - Master: " + gflags["master"].get(flag, "-") + "\n"
                 elif tserverConfFile:
                     content += "  - TServer: " + gflags["tserver"].get(flag, "-") + "\n"
-            writeToFile(outputFile, content)
+            report.write(content)
     
     logger.info("Number of files to analyze:" + str(len(logFileList)))
+    # Index the compressed files, the index is used to skip them and to split them into ranges
+    stageTimer.start("Gzip indexing")
+    gzipIndexes = getGzipIndexes(logFileList, os.path.join(os.path.dirname(os.path.abspath(log_file)), GZIP_INDEX_CACHE_FILE), pool)
     # Remove files that are outside the time range
+    stageTimer.start("Time skip")
     logFileList = [file for file in logFileList if not skipFileBasedOnTime(file, start_time, end_time)]
     # Analyze log files
-    pool = Pool(processes=args.numThreads)
-    for listOfErrorsInFile, listOfFilesWithNoErrors, barChartJSON in pool.starmap(analyzeLogFiles, [(file, outputFile, start_time, end_time) for file in logFileList]):
-        listOfErrorsInAllFiles = list(set(listOfErrorsInAllFiles + listOfErrorsInFile))
-        listOfAllFilesWithNoErrors = list(set(listOfAllFilesWithNoErrors + listOfFilesWithNoErrors))
-        for key, value in barChartJSON.items():
-            if key in histogramJSON:
-                for subkey, subvalue in value.items():
-                    if subkey in histogramJSON[key]:
-                        histogramJSON[key][subkey] += subvalue
-                    else:
-                        histogramJSON[key][subkey] = subvalue
-            else:
-                histogramJSON[key] = value
+    stageTimer.start("Planning")
+    startMinuteKey = datetimeToMinuteKey(start_time)
+    endMinuteKey = datetimeToMinuteKey(end_time)
+    resultsCache = None if args.no_cache else ResultsCache(os.path.join(os.path.dirname(os.path.abspath(log_file)), RESULTS_CACHE_FILE))
+    # Every range of a compressed file decompresses the data before it, so they are only split to use idle workers
+    maxGzipRanges = min(MAX_GZIP_RANGES, args.numThreads // max(len(logFileList), 1))
+    analysisPlans = [getAnalysisPlan(logFile, startMinuteKey, endMinuteKey, maxGzipRanges) for logFile in logFileList]
+    # Write the results in the order of the log file paths, so the report doesn't depend on the order the workers
+    # finish in. Files which finish early wait in the reorder buffer till the files before them are written
+    reportOrder = sorted([scanResult["logFile"] for scanResult in streamedScanResults] + [plan["logFile"] for plan in analysisPlans])
+    reorderBuffer = {scanResult["logFile"]: scanResult for scanResult in streamedScanResults}
+    errorCounts = Counter()
+    filesWithNoErrors = set()
+    eventStore = EventStore(args.export_events) if args.export_events else None
+    if args.html and args.lazy_report:
+        lazyReport = LazyReport(outputFile)
+        report.write(lazyFilesSection)
+    patternStats = {}
+    for scanResult in streamedScanResults:
+        mergePatternStats(patternStats, scanResult["patternStats"])
+    # Function to write the scan results which are next in the report order
+    def writeReadyScanResults():
+        while reportOrder and reportOrder[0] in reorderBuffer:
+            scanResult = reorderBuffer.pop(reportOrder.pop(0))
+            if eventStore:
+                with stageTimer.stage("Event export"):
+                    eventStore.addScanResult(scanResult, getRegexPatterns(scanResult["logFile"]))
+            with stageTimer.stage("Report writing"):
+                reportScanResult(scanResult, report, errorCounts, filesWithNoErrors)
+            minuteSeries.addCounts(scanResult["counts"])
+            node = getLogFileNode(scanResult["logFile"], nodeDirectories)
+            if node:
+                nodeTimeline.addCounts(node, scanResult["counts"])
+    # Merge the scan results of the ranges of a file as soon as all of them are analyzed
+    tasks = []
+    pendingTaskResults = {}
+    planSizes = {}
+    for plan in analysisPlans:
+        planSizes[plan["logFile"]] = sum(getTaskSize(task) for task in plan["tasks"])
+        if plan["tasks"]:
+            pendingTaskResults[plan["logFile"]] = [None] * len(plan["tasks"])
+        tasks += [(plan, rangeIndex, task) for rangeIndex, task in enumerate(plan["tasks"])]
+    # Dispatch the largest tasks first, one at a time, so no worker is left with a large file at the end
+    tasks.sort(key=lambda planTask: getTaskSize(planTask[2]), reverse=True)
+    # The progress line counts the files and bytes done against the files and bytes to analyze
+    progress = ProgressReporter(len(analysisPlans), sum(planSizes.values()))
+    for plan in analysisPlans:
+        if not plan["tasks"]:
+            reorderBuffer[plan["logFile"]] = getPlanScanResult(plan, [], startMinuteKey, endMinuteKey)
+            progress.addFile()
+    writeReadyScanResults()
+    stageTimer.start("Analysis")
+    for taskIndex, taskResult in pool.imap_unordered(analyzeIndexedTask, enumerate(task for plan, rangeIndex, task in tasks), chunksize=1):
+        plan, rangeIndex, task = tasks[taskIndex]
+        taskResults = pendingTaskResults[plan["logFile"]]
+        taskResults[rangeIndex] = taskResult
+        progress.addTask(getTaskSize(task), taskResult["bytesRead"], taskResult["linesRead"])
+        mergePatternStats(patternStats, taskResult["patternStats"])
+        if all(taskResults):
+            with stageTimer.stage("Merging and caching"):
+                reorderBuffer[plan["logFile"]] = getPlanScanResult(plan, taskResults, startMinuteKey, endMinuteKey)
+            del pendingTaskResults[plan["logFile"]]
+            progress.addFile(max(pendingTaskResults, key=planSizes.get, default=None))
+            writeReadyScanResults()
+    logger.info(progress.finish())
+    stageTimer.start("Merging and caching")
+    if resultsCache:
+        resultsCache.close()
+    if eventStore:
+        stageTimer.start("Event export")
+        eventStore.close()
+    # Sort the messages and files, so the troubleshooting tips and the files with no issues are in the same order in every run
+    listOfErrorsInAllFiles = sorted(errorCounts)
+    listOfAllFilesWithNoErrors = sorted(filesWithNoErrors)
+    stageTimer.start("Report writing")
     
+    # Write the incident windows, the bursts of the messages on any node. The HTML report shows them above the bar chart
+    if isBurstDetectionAvailable():
+        stageTimer.start("Burst detection")
+        # Log files which are not in a node directory, like the ones given with -l, are one node
+        burstRows, bursts = detectBursts(nodeTimeline.nodeSeries or {"-": minuteSeries})
+        incidentWindows = getIncidentWindows(burstRows, bursts)
+        logger.info("Found {} bursts of messages in {} incident windows".format(0 if bursts is None else len(bursts[0]), len(incidentWindows)))
+        if incidentWindows:
+            report.write(getIncidentWindowsHTML(incidentWindows) if args.html else getIncidentWindowsMarkdown(incidentWindows))
+        stageTimer.start("Report writing")
+    else:
+        logger.info("NumPy is not installed, skipping the detection of bursts of messages")
+    # Write the cross node timeline and the heatmap of the nodes
+    if nodeTimeline.isCrossNode():
+        stageTimer.start("Timeline")
+        report.write(getTimelineHTML(nodeTimeline) if args.html else getTimelineMarkdown(nodeTimeline))
+        stageTimer.start("Report writing")
+    lazyTips = []
     if listOfErrorsInAllFiles:
-        if args.html:
+        if lazyReport:
+            # The bar chart and the troubleshooting tips are rendered from the data file
+            report.write(lazyTipsSection)
+            lazyTips = [[error, getSolution(error)] for error in listOfErrorsInAllFiles]
+        elif args.html:
             # Write bar chart
-            content = barChart1 + json.dumps(histogramJSON) + barChart2
+            content = barChart1 + json.dumps(minuteSeries.getJSON()) + barChart2
             content += "<h2 id=troubleshooting-tips> Troubleshooting Tips </h2>\n"
             solutionMarkdown = "`"
             for error in listOfErrorsInAllFiles:
@@ -675,7 +887,7 @@ if __name__ == "__main__":
             content += """solutionsHTML = htmlGenerator.makeHtml({})\n""".format(solutionMarkdown)
             content += """document.write(solutionsHTML);"""
             content += """</script>"""
-            writeToFile(outputFile, content)
+            report.write(content)
         else:
             # Write troubleshooting tips
             content = "\n\n\n# Troubleshooting Tips\n\n"
@@ -685,7 +897,7 @@ if __name__ == "__main__":
                 content += solution.replace("$line-break$", "\n").replace("$tab$", "\t").replace("$start-code$", "`").replace("$end-code$", "`")
                 content += content.replace("$start-bold$", "**").replace("$end-bold$", "**").replace("$start-italic$", "*").replace("$end-italic$", "*")
                 content += content.replace("$start-link$", "").replace("$end-link$", "").replace("$end-link-text$", "")
-                writeToFile(outputFile, content)
+                report.write(content)
     # Write list of files with no errors
     if listOfAllFilesWithNoErrors:
         if args.html:
@@ -695,7 +907,7 @@ if __name__ == "__main__":
             for file in listOfAllFilesWithNoErrors:
                 content += "<li>" + file + "</li>"
             content += "</ul>"
-            writeToFile(outputFile, content)
+            report.write(content)
 
         else:
             content = "\n\n\n# Files with no issues\n\n"
@@ -704,9 +916,28 @@ if __name__ == "__main__":
             content += "\n"
             for file in listOfAllFilesWithNoErrors:
                 content += "- " + file + "\n"
-            writeToFile(outputFile, content)
+            report.write(content)
+    # Write the stage timings and the hot functions of the workers
+    if args.profile:
+        stageTimer.stop()
+        hotFunctionTable = []
+        if profileDirectory:
+            hotFunctionTable = getHotFunctions(profileDirectory)
+            shutil.rmtree(profileDirectory, ignore_errors=True)
+        stageTable = stageTimer.getTable()
+        patternCostTable = getPatternCosts(patternStats)
+        logger.info("Profile of the analysis\n" + getProfileText(stageTable, hotFunctionTable, patternCostTable))
+        if args.html:
+            report.write(getProfileHTML(stageTable, hotFunctionTable, patternCostTable))
+        else:
+            report.write("\n\n\n# Profile\n\n" + getProfileText(stageTable, hotFunctionTable, patternCostTable, "simple_grid") + "\n")
+    if lazyReport:
+        dataSize = lazyReport.writeData(minuteSeries.getJSON(), lazyTips)
+        report.write(lazyReportScript)
+        logger.info("Wrote the data of the report to {} ({:,} bytes)".format(lazyReport.dataFile, dataSize))
     if args.html:
-        writeToFile(outputFile, htmlFooter)
+        report.write(htmlFooter)
+    report.close()
     logger.info("Analysis complete. Results are in " + outputFile)
 
     # if hostname == "lincoln" then copy file to directory /tmp
@@ -715,6 +946,9 @@ if __name__ == "__main__":
         logDir = os.path.abspath(args.directory) if args.directory else os.path.abspath(args.log_files[0])
         caseNumber = logDir.split("/")[2]
         os.system("cp " + outputFile + " /home/support/logs_analyzer_dump/" + caseNumber + "-" + outputFile)
+        # The report finds its data file by its own name
+        if lazyReport:
+            os.system("cp " + lazyReport.dataFile + " /home/support/logs_analyzer_dump/" + caseNumber + "-" + os.path.basename(lazyReport.dataFile))
         logger.info("⌘+Click 👉👉 http://lincoln:7777/" + caseNumber + "-" + outputFile)
         listOfFiles = os.listdir("/home/support/logs_analyzer_dump/")
         content = "<table style='border-collapse: collapse; border: 1px solid black;'>"
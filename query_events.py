@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Query of the events exported by log_analyzer.py --export_events
+# Counts the events of the messages matching -m by --by (node, process type, file or severity) per --interval,
+# without scanning the logs again. Without -m, lists the messages with their number of events
+# Usage: python query_events.py -e EVENTS_FILE [-m MESSAGE] [--by node] [--interval hour] [--node NODE] [-t "MMDD HH:MM"] [-T "MMDD HH:MM"]
+import argparse
+import sqlite3
+import sys
+
+import tabulate
+from analyzer_events import SEVERITIES
+from analyzer_time import timeToMinuteKey, minuteKeyToTime
+
+# Columns the events can be counted by
+GROUP_COLUMNS = {
+    "node": "files.node",
+    "process": "files.processType",
+    "file": "files.path",
+    "severity": "events.severity",
+}
+# Minutes in each interval the counts are bucketed by
+INTERVAL_MINUTES = {
+    "minute": 1,
+    "hour": 60,
+    "day": 1440,
+}
+
+parser = argparse.ArgumentParser(description="Count the exported events of log_analyzer.py without rescanning the logs")
+parser.add_argument("-e", "--events", metavar="FILE", required=True, help="Events file written by log_analyzer.py --export_events")
+parser.add_argument("-m", "--message", help="Count the events of the messages containing this text, all the messages are listed without it")
+parser.add_argument("--by", choices=sorted(GROUP_COLUMNS), default="node", help="Count the events by this column")
+parser.add_argument("--interval", choices=["minute", "hour", "day", "none"], default="hour", help="Count the events per interval, none for the total")
+parser.add_argument("--node", help="Only count the events of the nodes containing this text")
+parser.add_argument("-t", "--from_time", metavar="MMDD HH:MM", help="Only count the events from this time")
+parser.add_argument("-T", "--to_time", metavar="MMDD HH:MM", help="Only count the events till this time")
+args = parser.parse_args()
+
+# Function to get the where clause and parameters of the filters given in the arguments
+def getFilters():
+    conditions = []
+    parameters = []
+    if args.message:
+        conditions.append("messages.message LIKE ?")
+        parameters.append("%" + args.message + "%")
+    if args.node:
+        conditions.append("files.node LIKE ?")
+        parameters.append("%" + args.node + "%")
+    if args.from_time:
+        conditions.append("events.minuteKey >= ?")
+        parameters.append(timeToMinuteKey(args.from_time))
+    if args.to_time:
+        conditions.append("events.minuteKey <= ?")
+        parameters.append(timeToMinuteKey(args.to_time))
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), parameters
+
+# Function to list the messages with their number of events
+def listMessages(connection, where, parameters):
+    rows = connection.execute("SELECT messages.message, COUNT(*) FROM events JOIN messages ON messages.id = events.messageId "
+                              "JOIN files ON files.id = events.fileId" + where + " GROUP BY messages.id ORDER BY COUNT(*) DESC", parameters).fetchall()
+    print(tabulate.tabulate(rows, headers=["Message", "Events"]))
+
+# Function to print the counts of the events by the group column per interval, one row per interval and one column per group
+def printCounts(connection, where, parameters):
+    groupColumn = GROUP_COLUMNS[args.by]
+    if args.interval == "none":
+        bucket = "0"
+    else:
+        bucket = "events.minuteKey / {}".format(INTERVAL_MINUTES[args.interval])
+    rows = connection.execute("SELECT " + bucket + ", " + groupColumn + ", COUNT(*) FROM events JOIN messages ON messages.id = events.messageId "
+                              "JOIN files ON files.id = events.fileId" + where + " GROUP BY 1, 2 ORDER BY 1", parameters).fetchall()
+    # The severities are stored as their index in SEVERITIES
+    if args.by == "severity":
+        rows = [(bucketKey, SEVERITIES[group] or "-", count) for bucketKey, group, count in rows]
+    groups = sorted({str(group) for bucketKey, group, count in rows})
+    counts = {}
+    for bucketKey, group, count in rows:
+        counts.setdefault(bucketKey, {})[str(group)] = count
+    table = []
+    for bucketKey, groupCounts in counts.items():
+        label = "Total" if args.interval == "none" else minuteKeyToTime(bucketKey * INTERVAL_MINUTES[args.interval])
+        table.append([label] + [groupCounts.get(group, 0) for group in groups] + [sum(groupCounts.values())])
+    print(tabulate.tabulate(table, headers=[args.interval.capitalize() if args.interval != "none" else ""] + groups + ["Total"]))
+
+try:
+    connection = sqlite3.connect("file:{}?mode=ro".format(args.events), uri=True)
+    where, parameters = getFilters()
+    if args.message:
+        messages = connection.execute("SELECT message FROM messages WHERE message LIKE ?", ("%" + args.message + "%",)).fetchall()
+        if not messages:
+            print("No exported message contains '{}'".format(args.message))
+            sys.exit(1)
+        print("Messages: " + ", ".join(message for (message,) in messages) + "\n")
+        printCounts(connection, where, parameters)
+    else:
+        listMessages(connection, where, parameters)
+except sqlite3.Error as e:
+    print("Can't query {}: {}".format(args.events, e))
+    sys.exit(1)
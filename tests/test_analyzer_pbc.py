@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Tests of the decoding of the instance files with a stand-in yb-pbc-dump on the PATH
+# The stand-in appends the instance file to a calls file, sleeps FAKE_PBC_DUMP_SLEEP seconds, prints the name
+# and the content of the instance file, and fails for the instance files with "fail" in their content
+# Usage: python -m pytest tests or python -m unittest discover tests
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analyzer_pbc import InstanceFileDecoder
+
+FAKE_PBC_DUMP = """#!/bin/sh
+echo "$1" >> "$FAKE_PBC_DUMP_CALLS"
+sleep "${FAKE_PBC_DUMP_SLEEP:-0}"
+case "$(cat "$1")" in
+    *fail*) exit 1 ;;
+esac
+echo "uuid: \\"$(basename "$1")\\""
+echo "content: \\"$(cat "$1")\\""
+"""
+
+@unittest.skipIf(os.name != "posix", "the stand-in yb-pbc-dump is a shell script")
+class InstanceFileDecoderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="analyzer_pbc_test_")
+        binDirectory = os.path.join(self.directory, "bin")
+        os.makedirs(binDirectory)
+        fakePbcDump = os.path.join(binDirectory, "yb-pbc-dump")
+        with open(fakePbcDump, "w") as f:
+            f.write(FAKE_PBC_DUMP)
+        os.chmod(fakePbcDump, 0o755)
+        self.callsFile = os.path.join(self.directory, "calls")
+        self.cacheFile = os.path.join(self.directory, "analyzer_instance_cache.json")
+        self.environment = dict(os.environ)
+        os.environ["PATH"] = binDirectory + os.pathsep + os.environ.get("PATH", "")
+        os.environ["FAKE_PBC_DUMP_CALLS"] = self.callsFile
+        os.environ["FAKE_PBC_DUMP_SLEEP"] = "0"
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environment)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    # Function to write instance files of the nodes, returns their paths
+    def writeInstanceFiles(self, nodes, content="ok"):
+        instanceFiles = []
+        for node in nodes:
+            instanceFile = os.path.join(self.directory, node, "instance")
+            os.makedirs(os.path.dirname(instanceFile), exist_ok=True)
+            with open(instanceFile, "w") as f:
+                f.write(content)
+            instanceFiles.append(instanceFile)
+        return instanceFiles
+
+    # Function to get the instance files yb-pbc-dump was called on so far
+    def getCalls(self):
+        if not os.path.isfile(self.callsFile):
+            return []
+        with open(self.callsFile) as f:
+            return f.read().splitlines()
+
+    def testDecodesInParallel(self):
+        instanceFiles = self.writeInstanceFiles(["n1", "n2", "n3", "n4"])
+        os.environ["FAKE_PBC_DUMP_SLEEP"] = "1"
+        startedAt = time.perf_counter()
+        decoded = InstanceFileDecoder(self.cacheFile, numWorkers=4).decode(instanceFiles)
+        elapsed = time.perf_counter() - startedAt
+        # One at a time the four calls would take four seconds
+        self.assertLess(elapsed, 3)
+        self.assertEqual(sorted(self.getCalls()), sorted(instanceFiles))
+        for instanceFile in instanceFiles:
+            self.assertEqual(decoded[instanceFile], ['uuid: "instance"\n', 'content: "ok"\n'])
+
+    def testRerunUsesCache(self):
+        instanceFiles = self.writeInstanceFiles(["n1", "n2", "n3"])
+        decoded = InstanceFileDecoder(self.cacheFile).decode(instanceFiles)
+        self.assertEqual(len(self.getCalls()), 3)
+        self.assertTrue(os.path.isfile(self.cacheFile))
+        # A new decoder is a rerun of the analyzer, it reads the cache file
+        self.assertEqual(InstanceFileDecoder(self.cacheFile).decode(instanceFiles), decoded)
+        self.assertEqual(len(self.getCalls()), 3)
+
+    def testChangedInstanceFileIsDecodedAgain(self):
+        instanceFiles = self.writeInstanceFiles(["n1", "n2"])
+        InstanceFileDecoder(self.cacheFile).decode(instanceFiles)
+        # Same size and a new mtime, so only the mtime tells the file changed
+        with open(instanceFiles[0], "w") as f:
+            f.write("ko")
+        stat = os.stat(instanceFiles[0])
+        os.utime(instanceFiles[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        decoded = InstanceFileDecoder(self.cacheFile).decode(instanceFiles)
+        # The first decoding calls yb-pbc-dump in parallel, in any order
+        calls = self.getCalls()
+        self.assertEqual(sorted(calls[:2]), sorted(instanceFiles))
+        self.assertEqual(calls[2:], [instanceFiles[0]])
+        self.assertEqual(decoded[instanceFiles[0]], ['uuid: "instance"\n', 'content: "ko"\n'])
+        self.assertEqual(decoded[instanceFiles[1]], ['uuid: "instance"\n', 'content: "ok"\n'])
+
+    def testFailureIsNotCached(self):
+        instanceFiles = self.writeInstanceFiles(["n1"], "fail")
+        self.assertEqual(InstanceFileDecoder(self.cacheFile).decode(instanceFiles), {instanceFiles[0]: []})
+        InstanceFileDecoder(self.cacheFile).decode(instanceFiles)
+        self.assertEqual(len(self.getCalls()), 2)
+
+    def testMissingInstanceFileIsNotDecoded(self):
+        instanceFile = os.path.join(self.directory, "n1", "instance")
+        self.assertEqual(InstanceFileDecoder(self.cacheFile).decode([instanceFile]), {instanceFile: []})
+        self.assertEqual(self.getCalls(), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# Tests of the results cache on a live log file, whose last line is still being written when it is scanned
+# The file is scanned and cached like log_analyzer.py does, then the rest of the line and lines without time
+# are appended, and the scan from the cached endOffset merged with the cached result has to match a full scan
+# The head of the file is longer than the hashed head, so appending to the file does not change its hash
+# Usage: python -m pytest tests or python -m unittest discover tests
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analyzer_results_cache import ResultsCache, getPatternHash, isUnchanged, isAppended
+from analyzer_scan import scanLogFile, mergeScanResults, getScanResultWithoutPartialLine
+from analyzer_time import timeToMinuteKey
+
+REGEX_PATTERNS = {"Soft memory limit exceeded": "Soft memory limit exceeded", "Stack trace": "Stack trace"}
+START_MINUTE_KEY = timeToMinuteKey("0101 00:00")
+END_MINUTE_KEY = timeToMinuteKey("1231 23:59")
+HEAD = b"".join("I1010 00:00:{:02d}.000000  1234 tablet.cc:1] Soft memory limit exceeded\n".format(second % 60).encode() for second in range(120))
+LAST_LINE = b"W1010 00:05:00.000000  1234 tablet.cc:1] Soft memory limit exceeded\n"
+CONTINUATION = b"    Stack trace of the warning\n    Stack trace of the warning\n"
+TAIL = b"I1010 00:06:00.000000  1234 tablet.cc:1] Soft memory limit exceeded\n"
+
+class LiveLogFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="analyzer_results_cache_test_")
+        self.logFile = os.path.join(self.directory, "yb-tserver.INFO")
+        self.resultsCache = ResultsCache(os.path.join(self.directory, "analyzer_cache.db"))
+        self.patternHash = getPatternHash(REGEX_PATTERNS)
+
+    def tearDown(self):
+        self.resultsCache.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, data, mode="ab"):
+        with open(self.logFile, mode) as f:
+            f.write(data)
+
+    # Function to scan the log file and cache the scan result, like getPlanScanResult
+    def scanAndCache(self, startOffset=0, previousMinuteKey=None, cachedScanResult=None):
+        stat = os.stat(self.logFile)
+        scanResults = [cachedScanResult] if cachedScanResult else []
+        scanResults.append(scanLogFile(self.logFile, REGEX_PATTERNS, START_MINUTE_KEY, END_MINUTE_KEY, startOffset, stat.st_size, previousMinuteKey=previousMinuteKey))
+        scanResult = mergeScanResults(scanResults, REGEX_PATTERNS)
+        cacheScanResult, partialLineBytes = getScanResultWithoutPartialLine(scanResult, REGEX_PATTERNS)
+        self.resultsCache.putScanResult(self.logFile, self.patternHash, stat, stat.st_size - partialLineBytes, START_MINUTE_KEY, None, cacheScanResult)
+        return scanResult
+
+    # Function to scan the log file again from the cached entry, like getAnalysisPlan does for an appended file
+    def scanAppended(self):
+        entry = self.resultsCache.getEntry(self.logFile, self.patternHash)
+        stat = os.stat(self.logFile)
+        self.assertFalse(isUnchanged(entry, stat))
+        self.assertTrue(isAppended(self.logFile, entry, stat))
+        cachedScanResult = self.resultsCache.getScanResult(self.logFile, self.patternHash, entry, REGEX_PATTERNS)
+        return self.scanAndCache(entry["endOffset"], entry["lastMinuteKey"], cachedScanResult)
+
+    def fullScan(self):
+        return scanLogFile(self.logFile, REGEX_PATTERNS, START_MINUTE_KEY, END_MINUTE_KEY)
+
+    def testPartialLineIsNotCached(self):
+        splitAt = 30
+        self.write(HEAD + LAST_LINE[:splitAt], "wb")
+        scanResult = self.scanAndCache()
+        # The report counts the partial line, the cache ends before it
+        self.assertEqual(scanResult["counts"], self.fullScan()["counts"])
+        entry = self.resultsCache.getEntry(self.logFile, self.patternHash)
+        self.assertEqual(entry["endOffset"], len(HEAD))
+        self.assertEqual(sum(self.resultsCache.getScanResult(self.logFile, self.patternHash, entry, REGEX_PATTERNS)["counts"]["Soft memory limit exceeded"].values()), 120)
+
+    def testAppendedScanMatchesFullScan(self):
+        for splitAt in [5, 30, len(LAST_LINE) - 1]:
+            self.write(HEAD + LAST_LINE[:splitAt], "wb")
+            self.scanAndCache()
+            self.write(LAST_LINE[splitAt:] + CONTINUATION + TAIL)
+            scanResult = self.scanAppended()
+            fullScanResult = self.fullScan()
+            self.assertEqual(scanResult["counts"], fullScanResult["counts"])
+            self.assertEqual(scanResult["results"], fullScanResult["results"])
+            # The lines without time belong to the minute of the line before them
+            self.assertEqual(scanResult["counts"]["Stack trace"], {timeToMinuteKey("1010 00:05"): 2})
+
+    def testLinesWithoutTimeAtEndOffset(self):
+        self.write(HEAD + LAST_LINE, "wb")
+        self.scanAndCache()
+        self.write(CONTINUATION + TAIL)
+        scanResult = self.scanAppended()
+        self.assertEqual(scanResult["counts"], self.fullScan()["counts"])
+        self.assertEqual(scanResult["counts"]["Stack trace"], {timeToMinuteKey("1010 00:05"): 2})
+
+    def testUnchangedPartialLineIsScannedAgain(self):
+        self.write(HEAD + LAST_LINE[:-1], "wb")
+        self.scanAndCache()
+        scanResult = self.scanAppended()
+        self.assertEqual(scanResult["counts"], self.fullScan()["counts"])
+
+if __name__ == "__main__":
+    unittest.main()
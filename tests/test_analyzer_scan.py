@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Tests of the offsets of the events exported by the scanner, on a log file with UTF-8 text and CRLF line endings
+# Every offset is seeked to in the log file and has to be the start of the matched line
+# Usage: python -m pytest tests or python -m unittest discover tests
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analyzer_scan import scanLogFile, scanLogBlock, mergeScanResults
+from analyzer_time import timeToMinuteKey
+
+REGEX_PATTERNS = {"Soft memory limit exceeded": "Soft memory limit exceeded"}
+MATCHED_LINE = b"I1010 00:01:00.000000  1234 tablet.cc:1] Soft memory limit exceeded\r\n"
+
+class EventOffsetTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="analyzer_scan_test_")
+        lines = []
+        for index in range(200):
+            lines.append("I1010 00:00:{:02d}.000000  1234 tablet.cc:1] héllo wörld ünïcode\r\n".format(index % 60).encode())
+            if index % 50 == 49:
+                lines.append(MATCHED_LINE)
+        self.data = b"".join(lines)
+        self.lineOffsets = [offset for offset in range(len(self.data)) if self.data.startswith(MATCHED_LINE, offset)]
+        self.logFile = os.path.join(self.directory, "yb-tserver.host.yugabyte.log.INFO.20261010-000000.1")
+        with open(self.logFile, "wb") as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    # Function to scan the byte range of the log file with the events collected
+    def scan(self, logFile, startOffset=0, endOffset=None):
+        return scanLogFile(logFile, REGEX_PATTERNS, timeToMinuteKey("0101 00:00"), timeToMinuteKey("1231 23:59"), startOffset, endOffset, collectEvents=True)
+
+    # Function to check that every event offset is the start of a matched line in the data
+    def assertOffsetsOnMatchedLines(self, scanResult, data):
+        offsets = list(scanResult["events"]["offsets"])
+        self.assertEqual(offsets, self.lineOffsets)
+        for offset in offsets:
+            self.assertEqual(data[offset:offset + len(MATCHED_LINE)], MATCHED_LINE)
+
+    def testOffsetsOfWholeFile(self):
+        scanResult = self.scan(self.logFile)
+        self.assertEqual(scanResult["bytesRead"], len(self.data))
+        self.assertOffsetsOnMatchedLines(scanResult, self.data)
+        with open(self.logFile, "rb") as f:
+            f.seek(scanResult["events"]["offsets"][0])
+            self.assertEqual(f.readline(), MATCHED_LINE)
+
+    def testOffsetsOfSplitRanges(self):
+        # The second range starts at the line after the second matched line
+        splitOffset = self.lineOffsets[1] + len(MATCHED_LINE)
+        scanResults = [self.scan(self.logFile, 0, splitOffset), self.scan(self.logFile, splitOffset, len(self.data))]
+        self.assertOffsetsOnMatchedLines(mergeScanResults(scanResults, REGEX_PATTERNS), self.data)
+
+    def testOffsetsOfGzipFile(self):
+        gzipFile = self.logFile + ".gz"
+        with open(gzipFile, "wb") as f:
+            f.write(gzip.compress(self.data))
+        self.assertOffsetsOnMatchedLines(self.scan(gzipFile), self.data)
+
+    def testOffsetsOfBlocks(self):
+        splitOffset = self.lineOffsets[2] + len(MATCHED_LINE)
+        scanResults = []
+        for blockOffset, block in [(0, self.data[:splitOffset]), (splitOffset, self.data[splitOffset:])]:
+            scanResults.append(scanLogBlock(self.logFile, block, REGEX_PATTERNS, timeToMinuteKey("0101 00:00"), timeToMinuteKey("1231 23:59"), True, blockOffset))
+        self.assertOffsetsOnMatchedLines(mergeScanResults(scanResults, REGEX_PATTERNS), self.data)
+
+if __name__ == "__main__":
+    unittest.main()